@@ -0,0 +1,151 @@
+# =============================
+# 📊 Stay or Skip — Dataset 탭 사전 집계
+# =============================
+# 월 × 요금제 단위의 부분 집계만 보관하고, 탭에서 쓰는 표(월별 매출, 요금제별 매출,
+# 최신월 이용자 구성, 결측치)는 여기서 파생한다. 새 월이 추가되면 그 월의 행만 집계해 붙인다.
+# (기존 월은 내용 해시로 비교 — 한 달이라도 정정됐으면 전체 재계산)
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from loader import CACHE_DIR, Dataset, read_store, write_store
+
+STORE = CACHE_DIR / "aggregates.pkl"
+VERSION = 3  # 저장 형식(클래스 구조)을 바꾸면 올려서 예전 pickle을 무시
+MAX_OPTIONS = 64  # 값 종류가 이보다 많은 컬럼은 필터 보기 목록을 만들지 않음
+
+
+class Aggregates:
+    """데이터셋 fingerprint 하나에 대응하는 집계 결과 (탭은 읽기만 한다)"""
+
+    def __init__(self, fingerprint: str, by_month_plan: pd.DataFrame,
+                 na_by_month: pd.DataFrame, user_ids: np.ndarray, options: dict = None):
+        self.fingerprint = fingerprint
+        self.by_month_plan = by_month_plan  # month, subscription_plan, revenue, users, rows
+        self.na_by_month = na_by_month      # index=month, columns=원본 컬럼, 값=결측 수
+        self.user_ids = user_ids            # 전체 기간 고유 userid (정렬됨)
+        self.options = options or {}        # 범주형 컬럼 → 나온 값 목록 (사이드바 필터 보기)
+        self.month_hashes = None            # materialize가 채움 — 다음 갱신 때 월별 변경 확인용
+        self.version = VERSION
+
+        self.months = sorted(by_month_plan["month"].unique())
+        self.latest = self.months[-1]
+        self.rows_by_month = by_month_plan.groupby("month")["rows"].sum()
+        self.monthly_revenue = (by_month_plan.groupby("month", as_index=False)["revenue"].sum())
+        self.plan_revenue = (by_month_plan.groupby("subscription_plan", as_index=False)["revenue"].sum())
+        self.users_mix = (by_month_plan[by_month_plan["month"] == self.latest]
+                          [["subscription_plan", "users"]]
+                          .sort_values("users", ascending=False).reset_index(drop=True))
+        self.na_counts = na_by_month.sum().sort_values(ascending=False)
+        self.n_rows = int(self.rows_by_month.sum())
+        self.n_users = len(user_ids)
+
+
+# ---------- 한 번의 벡터 연산으로 부분 집계 ----------
+def partials(frame: pd.DataFrame):
+    m, months = pd.factorize(frame["month"], sort=True)
+    p, plans = pd.factorize(frame["subscription_plan"], sort=True)
+    n_m, n_p = len(months), len(plans)
+    key = m.astype(np.int64) * n_p + p
+    size = n_m * n_p
+
+    revenue = np.bincount(key, weights=frame["revenue"].to_numpy(), minlength=size)
+    rows = np.bincount(key, minlength=size)
+    # (key, userid) 쌍의 고유값 → key별 고유 이용자 수
+    uid = frame["userid"].to_numpy().astype(np.int64)
+    pairs = np.unique((key << 32) | uid)
+    users = np.bincount(pairs >> 32, minlength=size)
+
+    by_month_plan = pd.DataFrame({
+        "month": np.repeat(np.asarray(months, dtype=object), n_p),
+        "subscription_plan": np.tile(np.asarray(plans, dtype=object), n_m),
+        "revenue": revenue.round().astype(np.int64),
+        "users": users,
+        "rows": rows,
+    })
+    by_month_plan = by_month_plan[by_month_plan["rows"] > 0].reset_index(drop=True)
+
+    na = np.stack([np.bincount(m, weights=frame[c].isna().to_numpy(), minlength=n_m)
+                   for c in frame.columns], axis=1).astype(np.int64)
+    na_by_month = pd.DataFrame(na, index=pd.Index(np.asarray(months, dtype=object), name="month"),
+                               columns=frame.columns)
+    return by_month_plan, na_by_month, np.unique(uid), options(frame)
+
+
+def options(frame: pd.DataFrame) -> dict:
+    """범주형 컬럼별 실제로 나온 값 (categories 순서) — 필터 위젯이 데이터를 다시 열지 않도록 집계에 같이 둔다"""
+    out = {}
+    for col in frame.columns:
+        s = frame[col]
+        if isinstance(s.dtype, pd.CategoricalDtype) and len(s.cat.categories) <= MAX_OPTIONS:
+            codes = s.cat.codes.to_numpy()
+            seen = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories)) > 0
+            out[col] = [v for v, ok in zip(s.cat.categories, seen) if ok]
+    return out
+
+
+def merge_options(a: dict, b: dict) -> dict:
+    return {c: sorted(set(a.get(c, [])) | set(b.get(c, []))) for c in {**a, **b}}
+
+
+def compute(frame: pd.DataFrame, fingerprint: str = "") -> Aggregates:
+    return Aggregates(fingerprint, *partials(frame))
+
+
+def extend(prev: Aggregates, new_rows: pd.DataFrame, fingerprint: str) -> Aggregates:
+    """기존 집계에 새 월의 행만 집계해서 붙이기"""
+    bmp, na, uids, opts = partials(new_rows)
+    return Aggregates(fingerprint,
+                      pd.concat([prev.by_month_plan, bmp], ignore_index=True),
+                      pd.concat([prev.na_by_month, na]),
+                      np.union1d(prev.user_ids, uids),
+                      merge_options(prev.options, opts))
+
+
+# ---------- fingerprint 기준 저장/증분 갱신 ----------
+def rows_by_month(frame: pd.DataFrame) -> pd.Series:
+    m, months = pd.factorize(frame["month"], sort=True)
+    return pd.Series(np.bincount(m), index=np.asarray(months, dtype=object))
+
+
+def month_hashes(frame: pd.DataFrame, columns=None) -> pd.Series:
+    """월별 내용 해시 (행 해시의 합 → 행 순서와 무관, merge._rows_hash와 같은 방식)"""
+    cols = list(frame.columns if columns is None else columns)
+    h = pd.util.hash_pandas_object(frame[cols], index=False).to_numpy()
+    m, months = pd.factorize(frame["month"], sort=True)
+    counts = np.bincount(m, minlength=len(months))
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    sums = np.add.reduceat(h[np.argsort(m, kind="stable")], starts) if len(h) else []
+    return pd.Series([f"{int(s):x}:{int(c)}" for s, c in zip(sums, counts)],
+                     index=np.asarray(months, dtype=object), dtype=object)
+
+
+def appended_months(prev_hashes, hashes: pd.Series):
+    """이전 월들의 내용이 모두 그대로이고 그 뒤로 새 월만 붙었으면 새 월 목록, 아니면 None"""
+    if prev_hashes is None or len(prev_hashes) == 0:
+        return None
+    new = [mo for mo in hashes.index if mo not in prev_hashes.index]
+    if not new or min(new) <= max(prev_hashes.index):
+        return None
+    if not hashes.reindex(prev_hashes.index).equals(prev_hashes):  # 정정·삭제된 월이 있음
+        return None
+    return new
+
+
+def materialize(dataset: Dataset, store: Path = STORE) -> Aggregates:
+    """저장된 집계가 같은 fingerprint면 그대로, 뒤에 월만 추가됐으면 증분, 아니면 전체 재계산"""
+    prev = read_store(store, VERSION) if store.exists() else None
+    if prev is not None and prev.fingerprint == dataset.fingerprint:
+        return prev
+    frame = dataset.frame
+    hashes = month_hashes(frame)
+    same_cols = prev is not None and list(prev.na_by_month.columns) == list(frame.columns)
+    new = appended_months(prev.month_hashes, hashes) if same_cols else None
+    if new is not None:
+        agg = extend(prev, frame[frame["month"].isin(new)], dataset.fingerprint)
+    else:
+        agg = compute(frame, dataset.fingerprint)
+    agg.month_hashes = hashes
+    write_store(agg, store)
+    return agg
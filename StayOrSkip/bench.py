@@ -0,0 +1,469 @@
+# =============================
+# ⏱️ Stay or Skip — 성능 측정 스크립트
+# =============================
+# 사용법: python StayOrSkip/bench.py {load,sessions,figures,funnel,ltv,segments,churn,ingest,tabs,filters,suite}
+# 각 측정은 새 파이썬 프로세스에서 실행해 캐시/메모리 상태가 섞이지 않게 한다.
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent
+
+
+def peak_rss_mb() -> float:
+    # 리눅스 ru_maxrss는 exec 전 부모 프로세스의 최대값을 물려받으므로 VmHWM(이 프로세스 최대 RSS)을 먼저 본다
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # 단위 KB
+
+
+def run_isolated(code: str) -> dict:
+    """코드 조각을 별도 프로세스에서 실행하고 마지막 줄의 JSON 결과를 받기"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _timed(setup: str, stmt: str) -> str:
+    return f"""
+import json, time
+from bench import peak_rss_mb
+{setup}
+base = peak_rss_mb()
+t0 = time.perf_counter()
+{stmt}
+sec = time.perf_counter() - t0
+frame_mb = df.memory_usage(deep=True).sum() / 2**20 if "df" in dir() else 0.0
+print(json.dumps({{"sec": sec, "rss_mb": peak_rss_mb(), "rss_delta_mb": peak_rss_mb() - base, "frame_mb": frame_mb}}))
+"""
+
+
+# ---------- load: xlsx 직접 파싱 vs 스냅샷 ----------
+def bench_load(args):
+    if args.source:
+        src = BASE / args.source
+    else:  # 앱 기본 원본 = 병합 결과 폴더 (최신으로 맞춘 뒤 측정)
+        import merge
+        merge.update()
+        src = merge.OUT
+    setup = "import loader"
+    cases = {
+        "source_parse": "df = loader.read_source(loader.Path(%r))" % str(src),
+        "snapshot_build": "loader.build_snapshot(loader.Path(%r)); df = loader.load_frame(loader.Path(%r))" % (str(src), str(src)),
+        "snapshot_mmap": "df = loader.load_frame(loader.Path(%r))" % str(src),
+    }
+    for name, stmt in cases.items():
+        r = run_isolated(_timed(setup, stmt))
+        print(f"{name:16s} {r['sec']*1000:9.1f} ms   peak RSS {r['rss_mb']:7.1f} MB  (+{r['rss_delta_mb']:.1f} MB)   frame {r['frame_mb']:.2f} MB")
+
+
+# ---------- sessions: 세션 N개가 데이터셋을 잡고 있을 때 RSS ----------
+def _tiled_source(scale: int) -> Path:
+    """실데이터를 scale배로 복제한 csv (세션당 메모리 차이를 보기 위한 크기 확대용)"""
+    path = BASE / ".cache" / f"bench_tiled_x{scale}.csv"
+    if not path.exists():
+        import pandas as pd
+        import loader
+        raw = loader.read_source(BASE / "spotify_merged.csv")
+        path.parent.mkdir(exist_ok=True)
+        pd.concat([raw] * scale, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def bench_sessions(args):
+    src = _tiled_source(args.scale)
+    setup = f"""
+import logging, warnings
+warnings.filterwarnings("ignore"); logging.disable(logging.WARNING)
+import streamlit as st, loader
+src = loader.Path({str(src)!r})
+loader.load_table(src)  # 스냅샷 미리 생성
+
+@st.cache_data
+def per_call_copy():
+    return loader.load_frame(src)
+
+@st.cache_resource
+def shared():
+    return loader.Dataset(loader.load_table(src))
+"""
+    for mode, call in [("cache_data", "per_call_copy()"), ("cache_resource", "shared().frame")]:
+        stmt = f"sessions = [{call} for _ in range({args.sessions})]; df = sessions[0]"
+        r = run_isolated(_timed(setup, stmt))
+        print(f"{mode:16s} x{args.sessions:<4d} {r['sec']*1000:9.1f} ms   peak RSS {r['rss_mb']:7.1f} MB  "
+              f"(+{r['rss_delta_mb']:.1f} MB)   frame {r['frame_mb']:.2f} MB")
+
+
+# ---------- figures: 차트 렌더링 (캐시 미스 vs 히트) ----------
+def bench_figures(args):
+    import warnings
+    import matplotlib
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore", message="Glyph")  # 한글 폰트 미설치 경고
+    import aggregates, charts, figcache, merge
+    ds = merge.load_dataset()
+    agg = aggregates.materialize(ds)
+    specs = {
+        "monthly_revenue": lambda: charts.monthly_revenue(agg.monthly_revenue),
+        "plan_revenue_share": lambda: charts.plan_revenue_share(agg.plan_revenue),
+        "users_by_plan": lambda: charts.users_by_plan(agg.users_mix, agg.latest),
+        "top_missing": lambda: charts.top_missing(agg.na_counts),
+    }
+    cache = figcache.FigureCache()
+    for rerun in range(args.reruns):
+        t0 = time.perf_counter()
+        for spec, build in specs.items():
+            cache.get_or_render((ds.fingerprint, spec, "bench"), build)
+        label = "cold (miss)" if rerun == 0 else "warm (hit)"
+        print(f"rerun {rerun}  {label:12s} {(time.perf_counter() - t0)*1000:8.1f} ms")
+    print(cache.stats())
+
+
+# ---------- funnel: 순서 퍼널 엔진 처리량 ----------
+def _event_chunks(n_events: int, chunk: int, n_users: int, seed: int = 0):
+    """시간순 합성 이벤트 로그를 청크 단위로 생성"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-01-01", "ns").astype(np.int64)
+    step = np.int64(60 * 60 * 24 * 180 * 10**9 // max(n_events, 1))  # 180일에 고르게
+    stages = np.array(["visit", "signup", "first_play", "subscribe"])
+    for lo in range(0, n_events, chunk):
+        n = min(chunk, n_events - lo)
+        yield pd.DataFrame({
+            "user": rng.integers(0, n_users, n),
+            "timestamp": (start + (lo + np.arange(n)) * step).view("datetime64[ns]"),
+            "event": pd.Categorical.from_codes(rng.choice(4, n, p=[0.45, 0.25, 0.20, 0.10]), stages),
+        })
+
+
+def bench_funnel(args):
+    import funnel
+    steps = funnel.STAGES
+    first = next(_event_chunks(min(args.events, args.chunk), args.chunk, args.users))
+    t0 = time.perf_counter()
+    [first.query("event==@s").shape[0] for s in steps]
+    print(f"query per step  {len(first):>12,d} events  {(time.perf_counter() - t0)*1000:9.1f} ms  (순서/유저 무시)")
+
+    engine = funnel.FunnelEngine(window=args.window)
+    sec = 0.0
+    for chunk in _event_chunks(args.events, args.chunk, args.users):
+        t0 = time.perf_counter()
+        engine.update(chunk)
+        sec += time.perf_counter() - t0
+    print(f"FunnelEngine    {engine.n_events:>12,d} events  {sec*1000:9.1f} ms  "
+          f"({engine.n_events / sec / 1e6:.1f} M events/s)  peak RSS {peak_rss_mb():.0f} MB")
+    print(engine.result().to_string(index=False))
+
+
+# ---------- ltv: 유저-월 수백만 행에서 LTV 계산 ----------
+def _tiled_frame(scale: int):
+    """실데이터를 userid만 바꿔 scale배 복제 (범주형 dtype 유지)"""
+    import pandas as pd
+    import merge
+    t = merge.load_dataset().frame
+    step = int(t["userid"].max()) + 1
+    return pd.concat([t.assign(userid=t["userid"] + step * k) for k in range(scale)], ignore_index=True)
+
+
+def bench_ltv(args):
+    import ltv
+    big = _tiled_frame(args.scale)
+    for by in [None] + args.by:
+        t0 = time.perf_counter()
+        ltv.compute(big, by=by)
+        sec = time.perf_counter() - t0
+        print(f"ltv by={str(by):24s} {len(big):>12,d} user-months  {sec*1000:8.1f} ms  ({len(big) / sec / 1e6:.1f} M rows/s)")
+
+
+# ---------- segments: 유저 수백만 명 세그먼트 (k를 바꿔 재실행) ----------
+def bench_segments(args):
+    import segments
+    big = _tiled_frame(args.scale)
+    t0 = time.perf_counter()
+    base = segments.UserBase(big)
+    sec = time.perf_counter() - t0
+    print(f"base (유저 합계 + 인코딩) {len(base):>10,d} users  {len(big):>12,d} rows  {sec*1000:8.1f} ms  "
+          f"(조합 {len(base.X):,}개 × {base.X.shape[1]}차원)")
+    runs = [("kmeans", k) for k in args.k] + [("rfm", 0)]
+    for method, k in runs:
+        t0 = time.perf_counter()
+        seg = segments.compute(None, method, k, base=base)
+        sec = time.perf_counter() - t0
+        label = f"{method} k={k}" if method == "kmeans" else method
+        print(f"{label:12s} {len(seg.summary):>3d} segments  {sec*1000:8.1f} ms  ({len(base) / sec / 1e6:.1f} M users/s)")
+    print(f"peak RSS {peak_rss_mb():,.0f} MB")
+
+
+# ---------- churn: 100만 유저 이탈 점수 처리량 ----------
+def bench_churn(args):
+    import tempfile
+    import churn
+    big = _tiled_frame(args.scale)
+    t0 = time.perf_counter()
+    hist = churn.History(big)
+    print(f"history    {len(hist):>10,d} users  {len(big):>12,d} rows  {(time.perf_counter() - t0)*1000:8.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Path(tmp) / "churn_model.pkl"
+        for label in ["train", "load"]:  # 두 번째는 디스크 캐시에서
+            t0 = time.perf_counter()
+            model = churn.load_or_train(hist, "bench", store)
+            print(f"{label:10s} {model.stats['samples']:>10,d} samples  {(time.perf_counter() - t0)*1000:8.1f} ms  "
+                  f"(검증 AUC {model.stats['auc'] or float('nan'):.3f})")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        scores = model.score(hist)
+        sec = time.perf_counter() - t0
+        print(f"score      {len(scores):>10,d} users  {sec*1000:8.1f} ms  ({len(scores) / sec / 1e6:.1f} M users/s)")
+    print(f"peak RSS {peak_rss_mb():,.0f} MB")
+
+
+# ---------- ingest: 대용량 CSV 스트리밍 수집의 메모리 상한 ----------
+def _write_big_csv(path: Path, target_bytes: int) -> int:
+    """실데이터를 userid·월을 밀어가며 target_bytes까지 이어 붙인 CSV (메모리에 전체를 올리지 않음)"""
+    import pandas as pd
+    import loader
+    raw = loader.read_source(BASE / "spotify_merged.csv")
+    step = int(raw["userid"].max())
+    months = pd.PeriodIndex(raw["month"], freq="M")
+    rows, r = 0, 0
+    raw.head(0).to_csv(path, index=False)
+    while path.stat().st_size < target_bytes:
+        block = []
+        for _ in range(50):
+            shift = r % 24  # 최대 2년 + 6개월 범위에서 월을 순환
+            block.append(raw.assign(userid=raw["userid"] + step * r,
+                                    month=(months + shift).strftime("%Y-%m")))
+            r += 1
+        out = pd.concat(block, ignore_index=True)
+        out.to_csv(path, mode="a", header=False, index=False)
+        rows += len(out)
+    return rows
+
+
+def bench_ingest(args):
+    results = []
+    for gb in args.gb:
+        path = BASE / ".cache" / f"bench_ingest_{gb:g}gb.csv"
+        path.parent.mkdir(exist_ok=True)
+        if not path.exists():
+            t0 = time.perf_counter()
+            _write_big_csv(path, int(gb * 2**30))
+            print(f"generated {path.name} ({path.stat().st_size / 2**30:.2f} GB) in {time.perf_counter() - t0:.0f}s")
+        code = _timed("import ingest", f"agg, coh = ingest.stream_metrics(ingest.Path({str(path)!r}))\n"
+                                       f"print(agg.n_rows, agg.n_users, file=__import__('sys').stderr)")
+        r = run_isolated(code)
+        results.append(r["rss_mb"])
+        size = path.stat().st_size / 2**30
+        print(f"stream {size:5.2f} GB  {r['sec']:7.1f} s  ({size * 1024 / r['sec']:.0f} MB/s, 2 passes)  "
+              f"peak RSS {r['rss_mb']:7.1f} MB")
+    if args.ceiling_mb and max(results) > args.ceiling_mb:
+        raise SystemExit(f"FAIL: peak RSS {max(results):.0f} MB > ceiling {args.ceiling_mb} MB")
+    print(f"OK: peak RSS {max(results):.0f} MB <= ceiling {args.ceiling_mb} MB "
+          f"(파일 크기 {args.gb[0]:g} → {args.gb[-1]:g} GB 에서 {results[-1] - results[0]:+.0f} MB)")
+
+
+# ---------- tabs: 화면 조작 한 번당 스크립트 재실행 시간 ----------
+INTERACTIONS = [  # (이름, 섹션, 탭, (위젯 라벨, 값) 또는 None)
+    ("rerun · Team Intro", "PROJECT OVERVIEW", "Team Intro", None),
+    ("tab → Dataset", "PROJECT OVERVIEW", "Dataset", None),
+    ("section → DATA EXPLORATION", "DATA EXPLORATION", None, None),
+    ("section → AARRR DASHBOARD", "AARRR DASHBOARD", None, None),
+    ("funnel window → 7일", "AARRR DASHBOARD", "Funnel", ("전환 윈도우 (첫 방문 기준)", "7일 이내")),
+    ("tab → LTV", "AARRR DASHBOARD", "LTV", None),
+    ("LTV segment → Gender", "AARRR DASHBOARD", "LTV", ("세그먼트 기준", "Gender")),
+    ("section → INSIGHTS", "INSIGHTS & STRATEGY", None, None),
+]
+
+
+def _tab_latency(script: str, repeat: int) -> dict:
+    """AppTest로 같은 조작 순서를 repeat번 재생 → 조작별 재실행 시간 중앙값(ms)"""
+    import logging
+    import statistics
+    import warnings
+    warnings.filterwarnings("ignore"); logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+
+    def widget(at, kind, label=None, option=None):
+        for w in getattr(at, kind):
+            if (label is None or w.label == label) and (option is None or option in w.options):
+                return w
+
+    times = {name: [] for name, *_ in INTERACTIONS}
+    for _ in range(repeat + 1):  # 첫 바퀴는 캐시 워밍업이라 버림
+        at = AppTest.from_file(script, default_timeout=300)
+        at.run()
+        for name, section, tab, change in INTERACTIONS:
+            at.sidebar.radio[0].set_value(section)
+            tabs = widget(at, "radio", option=tab) if tab else None
+            if tabs is not None:  # 지연 탭이 있는 버전만 (st.tabs는 위젯이 아님)
+                tabs.set_value(tab)
+            if change:
+                widget(at, "selectbox", label=change[0]).set_value(change[1])
+            t0 = time.perf_counter()
+            at.run()
+            times[name].append((time.perf_counter() - t0) * 1000)
+            assert not at.exception, at.exception
+    return {name: statistics.median(v[1:]) for name, v in times.items()}
+
+
+def bench_tabs(args):
+    scripts = [BASE / "spotify.py"] + [Path(p) for p in args.compare]
+    rows = {str(s): run_isolated(f"from bench import _tab_latency; import json; "
+                                 f"print(json.dumps(_tab_latency({str(s)!r}, {args.repeat})))") for s in scripts}
+    names = list(rows)
+    print(f"{'interaction':30s}" + "".join(f"{Path(n).name:>18s}" for n in names))
+    for name, *_ in INTERACTIONS:
+        print(f"{name:30s}" + "".join(f"{rows[n][name]:15.1f} ms" for n in names))
+
+
+# ---------- filters: 비트맵 교차 필터 응답 시간 ----------
+FILTER_CASES = {
+    "Gender=Female": {"Gender": ["Female"]},
+    "+ month 2": {"Gender": ["Female"], "month": ["2023-03", "2023-04"]},
+    "+ plan + genre 3": {"Gender": ["Female"], "month": ["2023-03", "2023-04"],
+                         "subscription_plan": ["Premium (paid subscription)"],
+                         "fav_music_genre": ["Pop", "Melody", "Rap"]},
+    "Age 20-35 + device": {"Age": ["20-35"], "spotify_listening_device": ["Smartphone"]},
+}
+
+
+def bench_filters(args):
+    import numpy as np
+    import pyarrow as pa
+    import filters
+    import loader
+    big = _tiled_frame(args.scale)
+    ds = loader.Dataset(pa.Table.from_pandas(big, preserve_index=False), "bench")
+    del big
+    t0 = time.perf_counter()
+    index = filters.FilterIndex(ds)
+    bitmap_mb = sum(b.nbytes for b in index.bitmaps.values()) / 2**20
+    print(f"index build  {len(ds):>12,d} rows  {time.perf_counter() - t0:6.2f} s   bitmaps {bitmap_mb:.1f} MB")
+    for name, choices in FILTER_CASES.items():
+        best = {}
+        for _ in range(args.repeat):
+            t0 = time.perf_counter(); sel = index.select(choices)
+            t1 = time.perf_counter(); n = sel.count()
+            t2 = time.perf_counter(); agg = index.aggregates(sel)
+            t3 = time.perf_counter()
+            for k, v in {"select": t1 - t0, "count": t2 - t1, "aggregates": t3 - t2}.items():
+                best[k] = min(best.get(k, np.inf), v)
+        # 같은 선택을 불리언 마스크로 직접 거르는 기존 방식 (한 번만)
+        t0 = time.perf_counter()
+        mask = np.ones(len(ds), dtype=bool)
+        for col, vals in choices.items():
+            mask &= ds.frame[col].isin(vals).to_numpy()
+        t1 = time.perf_counter()
+        assert mask.sum() == n == agg.n_rows
+        print(f"{name:20s} {n:>11,d} rows  select {best['select']*1000:6.1f} ms  count {best['count']*1000:5.1f} ms  "
+              f"aggregates {best['aggregates']*1000:6.1f} ms   (mask scan {(t1 - t0)*1000:6.1f} ms)")
+
+
+# ---------- suite: 합성 데이터 규모별 파이프라인 처리량/메모리 ----------
+SUITE = {  # 경로 → (입력, setup, 측정 구간) — {src}는 synth.py로 만든 CSV
+    "load": ("tidy", "import loader; src = loader.Path({src!r})",
+             "loader.build_snapshot(src); df = loader.load_frame(src)"),
+    "aggregate": ("tidy", "import loader, aggregates; df = loader.load_frame(loader.Path({src!r}))",
+                  "aggregates.compute(df)"),
+    "cohort": ("tidy", "import loader, cohort; df = loader.load_frame(loader.Path({src!r}))",
+               "cohort.CohortEngine().update(df)"),
+    "ltv": ("tidy", "import loader, ltv; df = loader.load_frame(loader.Path({src!r}))", "ltv.compute(df)"),
+    "stream": ("tidy", "import ingest", "ingest.stream_metrics(ingest.Path({src!r}))"),
+    "funnel": ("events", "import funnel", "funnel.funnel_from_csv({src!r})"),
+}
+IN_MEMORY = {"load", "aggregate", "cohort", "ltv"}  # 전체 행을 DataFrame으로 올리는 경로
+
+
+def bench_suite(args):
+    import synth
+    print(f"{'rows':>12s}  {'path':10s} {'sec':>8s} {'M rows/s':>9s} {'peak RSS':>10s} {'(+delta)':>10s}")
+    for rows in args.rows:
+        t0 = time.perf_counter()
+        inputs = {kind: synth.ensure(rows, kind, months=args.months) for kind in ("tidy", "events")}
+        gen = time.perf_counter() - t0
+        if gen > 1:
+            print(f"{rows:>12,d}  (synth 생성 {gen:.1f} s → {inputs['tidy'].parent})")
+        for name in args.paths:
+            kind, setup, stmt = SUITE[name]
+            if name in IN_MEMORY and rows > args.inmem_max:
+                print(f"{rows:>12,d}  {name:10s} {'skip':>8s}  (> --inmem-max, 대용량은 stream 경로)")
+                continue
+            src = str(inputs[kind])
+            try:
+                r = run_isolated(_timed(setup.format(src=src), stmt.format(src=src)))
+            except subprocess.CalledProcessError as e:
+                print(f"{rows:>12,d}  {name:10s} {'FAIL':>8s}  (exit {e.returncode})")
+                continue
+            print(f"{rows:>12,d}  {name:10s} {r['sec']:8.2f} {rows / r['sec'] / 1e6:9.2f} "
+                  f"{r['rss_mb']:7.0f} MB {r['rss_delta_mb']:+7.0f} MB")
+            if args.jsonl:
+                with open(args.jsonl, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"rows": rows, "path": name, **r}) + "\n")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stay or Skip 성능 측정")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("load", help="시작 시 데이터 로드 시간/메모리")
+    p.add_argument("--source", default=None, help="StayOrSkip 기준 경로 (기본: merge.py 결과 폴더)")
+    p.set_defaults(func=bench_load)
+    p = sub.add_parser("sessions", help="동시 세션 N개의 메모리 사용량")
+    p.add_argument("--sessions", type=int, default=50)
+    p.add_argument("--scale", type=int, default=100, help="실데이터 복제 배수")
+    p.set_defaults(func=bench_sessions)
+    p = sub.add_parser("figures", help="Dataset 탭 차트 렌더링 시간과 캐시 적중")
+    p.add_argument("--reruns", type=int, default=3)
+    p.set_defaults(func=bench_figures)
+    p = sub.add_parser("funnel", help="순서 퍼널 엔진 처리량 (청크 스트리밍)")
+    p.add_argument("--events", type=int, default=10_000_000)
+    p.add_argument("--chunk", type=int, default=5_000_000)
+    p.add_argument("--users", type=int, default=1_000_000)
+    p.add_argument("--window", default=None, help="예: 30D")
+    p.set_defaults(func=bench_funnel)
+    p = sub.add_parser("ltv", help="LTV/ARPU 엔진 처리량")
+    p.add_argument("--scale", type=int, default=1000, help="실데이터 복제 배수 (1000 → 312만 행)")
+    p.add_argument("--by", nargs="*", default=["Gender", "fav_music_genre"])
+    p.set_defaults(func=bench_ltv)
+    p = sub.add_parser("segments", help="고객 세그먼트(k-means/RFM) 계산 시간 — 유저 합계 1회 + k별 재실행")
+    p.add_argument("--scale", type=int, default=3206, help="실데이터 복제 배수 (3206 → 1000만 행, 167만 유저)")
+    p.add_argument("--k", type=int, nargs="+", default=[3, 5, 8])
+    p.set_defaults(func=bench_segments)
+    p = sub.add_parser("churn", help="이탈 모델 학습/디스크 캐시 로드/전체 유저 채점 처리량")
+    p.add_argument("--scale", type=int, default=1924, help="실데이터 복제 배수 (1924 → 100만 유저)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_churn)
+    p = sub.add_parser("ingest", help="대용량 CSV 스트리밍 수집 메모리 상한 테스트")
+    p.add_argument("--gb", type=float, nargs="+", default=[0.25, 2.0], help="생성할 파일 크기(GB)들")
+    p.add_argument("--ceiling-mb", type=float, default=512)
+    p.set_defaults(func=bench_ingest)
+    p = sub.add_parser("filters", help="교차 필터 선택/집계 응답 시간")
+    p.add_argument("--scale", type=int, default=3206, help="실데이터 복제 배수 (3206 → 1000만 행)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_filters)
+    p = sub.add_parser("tabs", help="섹션/탭/위젯 조작별 재실행 시간 (AppTest)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--compare", nargs="*", default=[], help="비교할 다른 버전의 앱 스크립트 경로")
+    p.set_defaults(func=bench_tabs)
+    p = sub.add_parser("suite", help="합성 데이터 규모별 load/aggregate/cohort/ltv/stream/funnel 처리량과 최대 메모리")
+    p.add_argument("--rows", type=lambda t: __import__("synth").parse_rows(t), nargs="+",
+                   default=[10**4, 10**5, 10**6, 10**7], help="예: 10K 1M 100M")
+    p.add_argument("--paths", nargs="+", choices=list(SUITE), default=list(SUITE))
+    p.add_argument("--months", type=int, default=24)
+    p.add_argument("--inmem-max", type=int, default=5_000_000, help="이보다 큰 규모는 DataFrame 경로 생략")
+    p.add_argument("--jsonl", default=None, help="결과를 JSON lines로 덧붙일 파일")
+    p.set_defaults(func=bench_suite)
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# =============================
+# 📈 Stay or Skip — 차트 빌더
+# =============================
+# 각 함수는 이미 집계된 데이터만 받아 matplotlib Figure를 돌려준다.
+# (Streamlit에 의존하지 않으므로 figcache/사전 계산 스크립트에서도 그대로 사용)
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.ticker import FuncFormatter
+
+BRAND, GREY, ICE = "#1DB954", "#BFBFBF", "#80DEEA"
+DARK_BG, PANEL_BG, MUTED = "#121212", "#191414", "#CFE3D8"
+PLAN_ORDER = ["Free (ad-supported)", "Premium (paid subscription)"]
+
+
+def _dark(fig, ax):
+    """AARRR 대시보드용 다크 테마"""
+    ax.set_facecolor(PANEL_BG); fig.set_facecolor(DARK_BG); ax.tick_params(colors=MUTED)
+
+
+# ---------- PROJECT OVERVIEW · Dataset ----------
+def monthly_revenue(monthly: pd.DataFrame):
+    fmt_million_krw = FuncFormatter(lambda x, pos: f"₩{x/1_000_000:,.0f}M")
+    fig, ax = plt.subplots(figsize=(6.5, 3.6))
+    ax.plot(monthly["month"], monthly["revenue"], marker="o", linewidth=2.5, color=BRAND)
+    ax.set_xlabel("Month"); ax.set_ylabel("Revenue (₩, 백만원 단위)")
+    ax.yaxis.set_major_formatter(fmt_million_krw); ax.grid(alpha=0.2)
+    fig.tight_layout()
+    return fig
+
+
+def plan_revenue_share(plan_rev: pd.DataFrame):
+    plan_rev = plan_rev.copy()
+    plan_rev["subscription_plan"] = pd.Categorical(plan_rev["subscription_plan"], PLAN_ORDER, True)
+    plan_rev = plan_rev.sort_values("subscription_plan")
+    fig, ax = plt.subplots(figsize=(5, 3.6))
+    pie_out = ax.pie(plan_rev["revenue"], labels=None, autopct="%1.1f%%", startangle=90,
+                     colors=[GREY, BRAND], pctdistance=0.75, wedgeprops=dict(width=0.35))
+    wedges, *_ = pie_out  # 버전 호환
+    ax.set_title("Revenue (₩) Share", pad=6)
+    ax.legend(wedges, plan_rev["subscription_plan"], loc="lower center",
+              bbox_to_anchor=(0.5, -0.15), ncol=2, frameon=False)
+    fig.tight_layout()
+    return fig
+
+
+def users_by_plan(users_mix: pd.DataFrame, latest: str):
+    fig, ax = plt.subplots(figsize=(5, 3.6))
+    colors = [BRAND if "Premium" in x else GREY for x in users_mix["subscription_plan"]]
+    ax.bar(users_mix["subscription_plan"], users_mix["users"], color=colors)
+    ax.set_ylabel("Users (Unique)"); ax.set_title(f"Active Users by Plan — {latest}")
+    ax.set_ylim(0, max(users_mix["users"]) * 1.15)
+    for i, v in enumerate(users_mix["users"]): ax.text(i, v, f"{int(v):,}", ha="center", va="bottom", fontsize=10)
+    fig.tight_layout()
+    return fig
+
+
+def top_missing(na: pd.Series, top: int = 5):
+    na_top = na[na > 0].head(top).reset_index(); na_top.columns = ["column", "na_cnt"]
+    fig, ax = plt.subplots(figsize=(10, 3.6))
+    if len(na_top) > 0:
+        ax.barh(na_top["column"], na_top["na_cnt"], color=GREY); ax.invert_yaxis()
+        ax.set_xlabel("Missing Values"); ax.set_title("Top Missing Columns", pad=6)
+        ax.set_xlim(0, max(na_top["na_cnt"]) * 1.15)
+        for i, v in enumerate(na_top["na_cnt"]): ax.text(v, i, f" {int(v):,}", va="center")
+    else:
+        ax.axis("off"); ax.text(0.5, 0.5, "결측치 없음", ha="center", va="center")
+    fig.tight_layout()
+    return fig
+
+
+# ---------- AARRR DASHBOARD ----------
+def funnel(steps, conv):
+    fig, ax = plt.subplots(figsize=(6, 3)); ax.plot(steps, conv, marker="o", color=BRAND)
+    ax.set_ylim(0, 105); ax.set_ylabel("Conversion %", color=MUTED); _dark(fig, ax)
+    return fig
+
+
+def retention(curve: pd.Series):
+    fig, ax = plt.subplots(figsize=(6, 3)); ax.plot(curve.index, curve.values, marker="o", color=ICE)
+    ax.set_ylim(0, 105); ax.set_xticks(curve.index)
+    ax.set_ylabel("Retention %", color=MUTED); ax.set_xlabel("months since first paid", color=MUTED)
+    _dark(fig, ax)
+    return fig
+
+
+def ltv_curve(curve: pd.Series):
+    fig, ax = plt.subplots(figsize=(6, 3))
+    ax.plot(curve.index + 1, curve.values, marker="o", color=BRAND)
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"₩{x/1_000:,.0f}K"))
+    ax.set_ylabel("Avg cumulative revenue", color=MUTED); ax.set_xlabel("months active", color=MUTED)
+    _dark(fig, ax)
+    return fig
+
+
+def cohort_heatmap(matrix: pd.DataFrame, title: str):
+    """코호트 × 경과 개월 비율(%) 히트맵 — NaN(아직 관측 불가) 칸은 비워 둔다"""
+    fig, ax = plt.subplots(figsize=(7, 3.8))
+    vals = matrix.to_numpy(dtype=float)
+    ax.imshow(np.ma.masked_invalid(vals), cmap="Greens", vmin=0, vmax=100, aspect="auto")
+    ax.set_xticks(range(vals.shape[1]), matrix.columns); ax.set_yticks(range(vals.shape[0]), matrix.index)
+    ax.set_xlabel("months since first paid", color=MUTED); ax.set_ylabel("cohort", color=MUTED)
+    ax.set_title(title, color=MUTED, pad=6)
+    for (i, j), v in np.ndenumerate(vals):
+        if not np.isnan(v):
+            ax.text(j, i, f"{v:.0f}", ha="center", va="center", fontsize=9,
+                    color="#0E0E0E" if v > 55 else "#F9FCF9")
+    _dark(fig, ax)
+    fig.tight_layout()
+    return fig
+
+
+def segment_bars(summary: pd.DataFrame):
+    """세그먼트별 유저 비중 막대 + 예상 LTV 라벨"""
+    fig, ax = plt.subplots(figsize=(6, 3))
+    ax.barh(summary["segment"], summary["share"] * 100, color=BRAND); ax.invert_yaxis()
+    ax.set_xlim(0, max(summary["share"].max() * 100 * 1.35, 1))
+    for i, (v, l) in enumerate(zip(summary["share"] * 100, summary["projected_ltv"])):
+        ax.text(v, i, f" {v:.0f}% · LTV " + ("-" if np.isnan(l) else f"₩{l/1_000:,.0f}K"),
+                va="center", color=MUTED, fontsize=9)
+    ax.set_xlabel("Users %", color=MUTED)
+    _dark(fig, ax)
+    fig.tight_layout()
+    return fig
+
+
+def churn_histogram(scores: np.ndarray, threshold: float = 0.5):
+    """유료 유저의 다음 달 이탈 확률 분포 — 기준선 오른쪽이 고위험"""
+    fig, ax = plt.subplots(figsize=(6, 3))
+    bins = np.linspace(0, 1, 21)
+    counts, _, patches = ax.hist(scores, bins=bins, color=GREY)
+    for left, patch in zip(bins[:-1], patches):
+        if left >= threshold:
+            patch.set_facecolor(BRAND)
+    ax.axvline(threshold, color=ICE, linestyle="--", linewidth=1)
+    ax.set_xlabel("churn probability (next month)", color=MUTED); ax.set_ylabel("Paying users", color=MUTED)
+    _dark(fig, ax)
+    fig.tight_layout()
+    return fig
+
+
+# ---------- 스펙 이름 → 결과 객체로 Figure 만들기 ----------
+# 앱(show_chart)과 precompute가 같은 캐시 키를 쓰도록 한 곳에 모아 둔다.
+THEME = "cupbop-dark-v3"  # 차트 스타일을 바꾸면 버전을 올려 캐시/아티팩트 무효화
+
+AGG_CHARTS = {
+    "monthly_revenue": lambda agg: monthly_revenue(agg.monthly_revenue),
+    "plan_revenue_share": lambda agg: plan_revenue_share(agg.plan_revenue),
+    "users_by_plan": lambda agg: users_by_plan(agg.users_mix, agg.latest),
+    "top_missing": lambda agg: top_missing(agg.na_counts),
+}
+COHORT_CHARTS = {
+    "retention_curve": lambda coh: retention(coh.retention_curve()),
+    "cohort_users": lambda coh: cohort_heatmap(coh.user_retention(), "User Retention %"),
+    "cohort_revenue": lambda coh: cohort_heatmap(coh.revenue_retention(), "Revenue Retention %"),
+}
+LTV_CHARTS = {
+    "ltv_curve": lambda lt: ltv_curve(lt.curve),
+}
+
+
+def funnel_spec(window) -> str:
+    return f"funnel:{window}"
+
+
+def funnel_chart(fr: pd.DataFrame):
+    return funnel(fr["stage"], fr["conv_prev"])
+
+
+def segment_spec(method: str, k: int) -> str:
+    return f"segments:{method}:{k}" if method == "kmeans" else f"segments:{method}"
+
+
+def churn_spec(version: int) -> str:
+    return f"churn_hist:v{version}"  # 모델(churn.VERSION)이 바뀌면 다른 키
+
+
+def segment_chart(seg):
+    return segment_bars(seg.summary)
+
+
+def churn_chart(cs):
+    return churn_histogram(cs.paying()["score"].to_numpy())
@@ -0,0 +1,220 @@
+# =============================
+# 🚨 Stay or Skip — 이탈 예측 (유료 → 다음 달 미결제)
+# =============================
+# tidy 월 이력을 (유저 × 월) 격자로 펼쳐 누적합만으로 "t월 시점까지의 이력" 피처를 만든다.
+# (활동 개월, 결제 개월, 연속 결제, 요금제 전환, 과거 이탈, 공백 개월, 누적/당월 매출, 직전 업그레이드)
+# 설문 응답은 segments.encode로 조합 단위 multi-hot → 점수 계산 때 조합별 로짓을 한 번만 구해 유저에 뿌린다.
+# 모델은 NumPy 로지스틱 회귀(L2, IRLS) — 새 의존성 없이 수십만 샘플도 1초 안팎에 학습된다.
+# 이탈 정의는 ltv.compute와 같다: t월 유료이고 t+1월 행이 있는 유저 중 t+1월에 결제하지 않은 경우.
+# 학습한 모델은 fingerprint와 함께 .cache/churn_model.pkl에 두고, 데이터가 같으면 다시 학습하지 않는다.
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cohort import month_ordinal
+from loader import CACHE_DIR, Dataset, read_store, write_store
+from segments import FEATURES, encode, user_rows
+
+STORE = CACHE_DIR / "churn_model.pkl"
+VERSION = 1            # 피처/학습 방식을 바꾸면 올려서 저장된 모델 무효화
+NUMERIC = ["months_active", "paid_months", "paid_streak", "plan_switches", "past_churns",
+           "gap_months", "log_revenue_total", "log_revenue_last", "upgraded"]
+MAX_TRAIN = 200_000    # 학습 샘플 상한 (넘으면 무작위 추출)
+L2 = 1.0
+
+
+class History:
+    """유저 × 월 격자와 누적 카운터 — 어떤 (유저, 월) 상태든 피처를 인덱싱만으로 꺼낸다"""
+
+    def __init__(self, frame: pd.DataFrame, features=FEATURES):
+        rep, user_of_row = user_rows(frame)
+        n = len(rep)
+        self.userid = frame["userid"].to_numpy()[rep].astype(np.int64)
+        m_codes, m_labels = pd.factorize(frame["month"], sort=True)
+        ords = month_ordinal(m_labels)
+        lo = int(ords.min()) if len(ords) else 0
+        S = int(ords.max()) - lo + 1 if len(ords) else 1
+        self.last_month = str(m_labels[int(np.argmax(ords))]) if len(ords) else None
+        cell = user_of_row * S + (ords - lo)[m_codes]
+        rev = frame["revenue"].to_numpy().astype(np.float32)
+        P = np.zeros(n * S, dtype=bool); P[cell] = True                 # 행이 있는 달
+        Q = np.zeros(n * S, dtype=bool); Q[cell[rev > 0]] = True        # 결제한 달
+        R = np.zeros(n * S, dtype=np.float32); R[cell] = rev
+        P, Q, self.R = P.reshape(n, S), Q.reshape(n, S), R.reshape(n, S)
+        self.P, self.Q = P, Q
+        # ---------- t월까지의 누적 카운터 ----------
+        self.active = np.cumsum(P, axis=1, dtype=np.int16)
+        self.paid = np.cumsum(Q, axis=1, dtype=np.int16)
+        self.revenue = np.cumsum(self.R, axis=1, dtype=np.float32)
+        both = P[:, 1:] & P[:, :-1]                                      # 연속 두 달 모두 관측
+        step = np.zeros((n, S), dtype=bool); step[:, 1:] = both & (Q[:, 1:] != Q[:, :-1])
+        self.switches = np.cumsum(step, axis=1, dtype=np.int16)
+        step[:, 1:] = both & Q[:, :-1] & ~Q[:, 1:]
+        self.churns = np.cumsum(step, axis=1, dtype=np.int16)
+        idx = np.arange(S, dtype=np.int16)
+        self.streak = idx - np.maximum.accumulate(np.where(Q, np.int16(-1), idx), axis=1)  # t월에서 끝나는 연속 결제
+        self.first = P.argmax(axis=1)
+        self.last = S - 1 - P[:, ::-1].argmax(axis=1)
+        # ---------- 설문: 고유 응답 조합 × 토큰 ----------
+        cols = [c for c in features if c in frame.columns]
+        _, self.survey, _, self.combo, self.tokens = encode(frame[cols].iloc[rep].reset_index(drop=True), cols)
+
+    def __len__(self):
+        return len(self.userid)
+
+    @property
+    def months(self) -> int:
+        return self.P.shape[1]
+
+    def numeric(self, u: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """(유저, 월) 쌍별 이력 피처 (len × NUMERIC, float32)"""
+        prev = np.maximum(t - 1, 0)
+        cols = [self.active[u, t], self.paid[u, t], self.streak[u, t], self.switches[u, t], self.churns[u, t],
+                (t - self.first[u] + 1) - self.active[u, t],
+                np.log1p(self.revenue[u, t]), np.log1p(self.R[u, t]),
+                self.Q[u, t] & (t > 0) & ~self.Q[u, prev] & self.P[u, prev]]
+        return np.stack(cols, axis=1).astype(np.float32)
+
+    def samples(self):
+        """학습 샘플: t월 유료 & t+1월 관측 → (u, t, 이탈 여부)"""
+        u, t = np.nonzero(self.Q[:, :-1] & self.P[:, 1:])
+        return u, t, ~self.Q[u, t + 1]
+
+
+class ChurnModel:
+    """표준화 + 로지스틱 회귀 가중치 (숫자 피처 / 설문 토큰 분리 — 설문은 조합 단위로 점수 계산)"""
+
+    def __init__(self, fingerprint: str, mean, std, w_num, w_survey: dict, bias: float, stats: dict):
+        self.fingerprint = fingerprint
+        self.version = VERSION
+        self.mean, self.std = mean, std
+        self.w_num = w_num
+        self.w_survey = w_survey  # 토큰 이름 → 가중치 (데이터마다 토큰 순서가 달라도 맞춰 씀)
+        self.bias = bias
+        self.stats = stats        # 학습/검증 샘플 수, 이탈률, 검증 AUC
+
+    def _survey_logit(self, hist: History) -> np.ndarray:
+        w = np.array([self.w_survey.get(tok, 0.0) for tok in hist.tokens], dtype=np.float32)
+        return hist.survey.astype(np.float32) @ w  # 조합별 로짓 기여
+
+    def score(self, hist: History, u: np.ndarray = None, t: np.ndarray = None) -> np.ndarray:
+        """(유저, 월) 상태별 다음 달 이탈 확률 — 기본은 전체 유저의 마지막 관측 월 (한 번의 벡터 연산)"""
+        if u is None:
+            u, t = np.arange(len(hist)), hist.last
+        z = (hist.numeric(u, t) - self.mean) / self.std @ self.w_num
+        z += self._survey_logit(hist)[hist.combo[u]] + self.bias
+        return 1 / (1 + np.exp(-z))
+
+
+# ---------- 학습 ----------
+def fit_logistic(X: np.ndarray, y: np.ndarray, l2: float = L2, iters: int = 30, tol: float = 1e-6):
+    """L2 로지스틱 회귀 (뉴턴/IRLS) → (가중치, 절편). 설문 블록의 공선성은 L2가 잡아 준다."""
+    Xb = np.hstack([X, np.ones((len(X), 1), dtype=X.dtype)]).astype(np.float64)
+    reg = np.full(Xb.shape[1], l2); reg[-1] = 0  # 절편은 규제하지 않음
+    w = np.zeros(Xb.shape[1])
+    for _ in range(iters):
+        p = 1 / (1 + np.exp(-(Xb @ w)))
+        grad = Xb.T @ (p - y) + reg * w
+        H = (Xb * (p * (1 - p))[:, None]).T @ Xb + np.diag(reg + 1e-9)
+        step = np.linalg.solve(H, grad)
+        w -= step
+        if np.abs(step).max() < tol:
+            break
+    return w[:-1], float(w[-1])
+
+
+def auc(y: np.ndarray, score: np.ndarray):
+    """순위 기반 ROC AUC (Mann-Whitney) — 한 클래스뿐이면 None"""
+    pos, n = int(y.sum()), len(y)
+    if pos == 0 or pos == n:
+        return None
+    r = pd.Series(score).rank().to_numpy()
+    return float((r[y].sum() - pos * (pos + 1) / 2) / (pos * (n - pos)))
+
+
+def _design(hist: History, u, t):
+    return hist.numeric(u, t), hist.survey[hist.combo[u]].astype(np.float32)
+
+
+def _fit(hist: History, u, t, y):
+    num, sv = _design(hist, u, t)
+    mean, std = num.mean(0), num.std(0)
+    std = np.where(std > 0, std, 1).astype(np.float32)
+    w, b = fit_logistic(np.hstack([(num - mean) / std, sv]), y.astype(np.float64))
+    k = len(NUMERIC)
+    return mean, std, w[:k].astype(np.float32), dict(zip(hist.tokens, w[k:].tolist())), b
+
+
+def train(hist: History, fingerprint: str = "", seed: int = 0) -> ChurnModel:
+    """마지막 달로의 전이로 검증(AUC)한 뒤, 모든 전이로 다시 학습한 모델"""
+    u, t, y = hist.samples()
+    if len(u) > MAX_TRAIN:
+        keep = np.sort(np.random.default_rng(seed).choice(len(u), MAX_TRAIN, replace=False))
+        u, t, y = u[keep], t[keep], y[keep]
+    stats = {"samples": len(u), "churn_rate": float(y.mean()) if len(y) else None, "auc": None, "valid": 0}
+    if len(u) == 0:
+        return ChurnModel(fingerprint, np.zeros(len(NUMERIC), np.float32), np.ones(len(NUMERIC), np.float32),
+                          np.zeros(len(NUMERIC), np.float32), {}, 0.0, stats)
+    hold = t + 1 == hist.months - 1  # 시간 기준 홀드아웃: 가장 최근 전이
+    if hold.any() and (~hold).any() and 0 < y[~hold].sum() < (~hold).sum():
+        model = ChurnModel(fingerprint, *_fit(hist, u[~hold], t[~hold], y[~hold]), stats)
+        stats["auc"] = auc(y[hold], model.score(hist, u[hold], t[hold]))
+        stats["valid"] = int(hold.sum())
+    if 0 < y.sum() < len(y):
+        return ChurnModel(fingerprint, *_fit(hist, u, t, y), stats)
+    rate = np.clip(y.mean(), 1e-3, 1 - 1e-3)  # 한 클래스뿐 → 상수 모델
+    return ChurnModel(fingerprint, np.zeros(len(NUMERIC), np.float32), np.ones(len(NUMERIC), np.float32),
+                      np.zeros(len(NUMERIC), np.float32), {}, float(np.log(rate / (1 - rate))), stats)
+
+
+def load_or_train(hist: History, fingerprint: str, store: Path = STORE) -> ChurnModel:
+    """같은 fingerprint(+VERSION)로 학습해 둔 모델이 디스크에 있으면 그대로, 없으면 학습 후 저장"""
+    prev = read_store(store, VERSION) if store.exists() else None
+    if prev is not None and prev.fingerprint == fingerprint:
+        return prev
+    model = train(hist, fingerprint)
+    write_store(model, store)
+    return model
+
+
+# ---------- 대시보드용 결과 ----------
+class ChurnScores:
+    """전체 유저의 현재(마지막 관측 월) 이탈 확률 + 모델 요약"""
+
+    def __init__(self, fingerprint: str, model: ChurnModel, users: pd.DataFrame, last_month):
+        self.fingerprint = fingerprint
+        self.model = model
+        self.users = users            # userid, score, paying, 이력 피처 일부
+        self.last_month = last_month
+
+    def paying(self) -> pd.DataFrame:
+        """이탈 대상 = 데이터 마지막 달에 결제한 유저"""
+        return self.users[self.users["paying"].to_numpy()]
+
+    def at_risk(self, top: int = 50) -> pd.DataFrame:
+        return self.paying().nlargest(top, "score")
+
+    def subset(self, userids, fingerprint: str) -> "ChurnScores":
+        """필터된 유저만 (모델은 전체 데이터로 학습한 것 그대로)"""
+        keep = self.users["userid"].isin(userids).to_numpy()
+        return ChurnScores(fingerprint, self.model, self.users[keep], self.last_month)
+
+
+def score_users(hist: History, model: ChurnModel, fingerprint: str = "") -> ChurnScores:
+    u = np.arange(len(hist))
+    t = hist.last
+    num = hist.numeric(u, t)
+    users = pd.DataFrame({"userid": hist.userid, "score": model.score(hist, u, t),
+                          "paying": hist.Q[u, t] & (t == hist.months - 1)})
+    for j in [0, 1, 2, 3, 4]:
+        users[NUMERIC[j]] = num[:, j].astype(np.int64)
+    users["revenue_total"] = hist.revenue[u, t]
+    return ChurnScores(fingerprint, model, users, hist.last_month)
+
+
+def compute(dataset: Dataset, store: Path = STORE) -> ChurnScores:
+    """데이터셋 → (디스크 캐시 모델로) 전체 유저 점수"""
+    hist = History(dataset.frame)
+    model = load_or_train(hist, dataset.fingerprint, store)
+    return score_users(hist, model, dataset.fingerprint)
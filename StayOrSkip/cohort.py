@@ -0,0 +1,131 @@
+# =============================
+# 🧊 Stay or Skip — 코호트 리텐션 엔진
+# =============================
+# 코호트 = 처음 유료 결제(revenue > 0)한 월, 경과 = 그 뒤로 지난 개월 수.
+# 유저 리텐션[c, d] = c월 코호트 중 c+d월에도 결제한 유저 수 / 코호트 크기
+# 매출 리텐션[c, d] = c월 코호트의 c+d월 매출 / c월 매출
+# 월·유저를 정수 코드로 바꾼 뒤 np.bincount 한 번으로 (코호트, 경과) 셀을 채운다.
+# 새 월이 붙으면 그 월이 만드는 대각선 (c, 새월-c) 셀만 더하면 된다.
+# (기존 월 내용이 바뀌었으면 — 월별 해시로 확인 — 전체 재계산)
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregates import appended_months, month_hashes, rows_by_month
+from loader import CACHE_DIR, Dataset, read_store, write_store
+
+STORE = CACHE_DIR / "cohort.pkl"
+VERSION = 2  # 저장 형식을 바꾸면 올려서 예전 pickle을 무시
+COLUMNS = ["userid", "month", "revenue"]  # 코호트 행렬이 읽는 컬럼 (월별 해시도 이것만)
+NO_COHORT = np.iinfo(np.int32).max
+
+
+def month_ordinal(months) -> np.ndarray:
+    """'2023-01' 같은 월 라벨 → 연속 정수 (빈 월이 있어도 간격 유지)"""
+    return pd.PeriodIndex(np.asarray(months, dtype=object), freq="M").asi8
+
+
+class CohortEngine:
+    """(코호트 × 경과 개월) 유저 수/매출 행렬과 유저별 첫 결제월을 상태로 보관"""
+
+    def __init__(self):
+        self.fingerprint = ""
+        self.base = None                       # 첫 월의 ordinal
+        self.first = np.zeros(0, dtype=np.int32)  # userid → 첫 결제월 인덱스
+        self.users = np.zeros((0, 0), dtype=np.int64)
+        self.revenue = np.zeros((0, 0), dtype=np.float64)
+        self.rows_by_month = pd.Series(dtype=np.int64)
+        self.month_hashes = None  # materialize가 채움 — 다음 갱신 때 월별 변경 확인용
+        self.version = VERSION
+
+    @property
+    def n_months(self) -> int:
+        return len(self.rows_by_month)
+
+    def update(self, frame: pd.DataFrame, active=None) -> "CohortEngine":
+        """지금까지 본 월보다 뒤의 월 행만 넣어야 한다 (처음엔 전체)"""
+        m_codes, labels = pd.factorize(frame["month"], sort=True)
+        ords = month_ordinal(labels)
+        if self.base is None:
+            self.base = int(ords[0])
+        elif ords[0] < self.base + self.users.shape[0]:
+            raise ValueError("이미 집계된 월 이전의 행은 증분으로 넣을 수 없습니다.")
+        m = (ords - self.base).astype(np.int32)[m_codes]
+        size = int(ords[-1] - self.base) + 1
+
+        uid = frame["userid"].to_numpy().astype(np.int64)
+        rev = frame["revenue"].to_numpy().astype(np.float64)
+        act = rev > 0 if active is None else np.asarray(active, dtype=bool)
+
+        # 유저별 첫 결제월 (새 유저/처음 결제한 유저만 갱신됨)
+        self.mark_first(uid[act], m[act])
+        self.add_rows(uid[act], m[act], rev[act], size)
+        self.rows_by_month = pd.concat([self.rows_by_month, rows_by_month(frame)])
+        return self
+
+    def mark_first(self, uid: np.ndarray, m: np.ndarray) -> None:
+        """결제 행(userid, 월 인덱스)으로 유저별 첫 결제월 갱신"""
+        if len(uid) and uid.max() >= len(self.first):
+            self.first = np.concatenate([self.first, np.full(uid.max() + 1 - len(self.first), NO_COHORT, np.int32)])
+        np.minimum.at(self.first, uid, m)
+
+    def add_rows(self, uid: np.ndarray, m: np.ndarray, rev: np.ndarray, size: int) -> None:
+        """첫 결제월이 확정된 결제 행들을 (코호트, 경과) 셀에 더하기"""
+        grow = size - self.users.shape[0]
+        if grow > 0:  # 행렬을 새 월 수만큼 키움
+            self.users = np.pad(self.users, ((0, grow), (0, grow)))
+            self.revenue = np.pad(self.revenue, ((0, grow), (0, grow)))
+        size = self.users.shape[0]
+        c = self.first[uid].astype(np.int64)
+        key = c * size + (m - c)
+        self.users += np.bincount(key, minlength=size * size).reshape(size, size)
+        self.revenue += np.bincount(key, weights=rev, minlength=size * size).reshape(size, size)
+
+    # ---------- 결과 표 ----------
+    def _labels(self):
+        return pd.period_range(pd.Period(ordinal=self.base, freq="M"), periods=self.users.shape[0]).strftime("%Y-%m")
+
+    def _frame(self, mat: np.ndarray) -> pd.DataFrame:
+        n = mat.shape[0]
+        observable = np.arange(n)[:, None] + np.arange(n)[None, :] < n  # 아직 안 온 미래 셀은 NaN
+        out = pd.DataFrame(np.where(observable, mat, np.nan), index=self._labels(), columns=range(n))
+        out.index.name, out.columns.name = "cohort", "months_since"
+        return out
+
+    def cohort_sizes(self) -> pd.Series:
+        return pd.Series(self.users[:, 0], index=self._labels(), name="users")
+
+    def user_retention(self) -> pd.DataFrame:
+        """코호트 크기 대비 유지 비율 (%)"""
+        return self._frame(self.users / np.maximum(self.users[:, :1], 1) * 100)
+
+    def revenue_retention(self) -> pd.DataFrame:
+        """코호트 첫 달 매출 대비 비율 (%)"""
+        return self._frame(self.revenue / np.maximum(self.revenue[:, :1], 1) * 100)
+
+    def retention_curve(self) -> pd.Series:
+        """경과 개월별 전체 평균 유저 리텐션 (관측 가능한 코호트만, 크기 가중)"""
+        n = self.users.shape[0]
+        base = np.cumsum(self.users[:, 0])[::-1]  # d개월 뒤를 관측할 수 있는 코호트들의 크기 합
+        kept = self.users.sum(axis=0)
+        return pd.Series(kept / np.maximum(base, 1) * 100, index=pd.RangeIndex(n, name="months_since"))
+
+
+# ---------- fingerprint 기준 저장/증분 갱신 ----------
+def materialize(dataset: Dataset, store: Path = STORE) -> CohortEngine:
+    """같은 fingerprint면 그대로, 기존 월은 그대로이고 새 월만 붙었으면 그 월의 대각선만, 아니면 전체 재계산"""
+    prev = read_store(store, VERSION) if store.exists() else None
+    if prev is not None and prev.fingerprint == dataset.fingerprint:
+        return prev
+    frame = dataset.frame
+    hashes = month_hashes(frame, COLUMNS)
+    new = appended_months(prev.month_hashes, hashes) if prev is not None else None
+    if new is not None:
+        engine = prev.update(frame[frame["month"].isin(new)])
+    else:
+        engine = CohortEngine().update(frame)
+    engine.fingerprint = dataset.fingerprint
+    engine.month_hashes = hashes
+    write_store(engine, store)
+    return engine
@@ -0,0 +1,83 @@
+# =============================
+# 🖼️ Stay or Skip — 렌더링된 차트 캐시
+# =============================
+# (데이터 fingerprint, 차트 스펙, 테마) → 인코딩된 PNG/SVG 바이트.
+# 용량 상한을 넘으면 가장 오래 안 쓴 항목부터 버린다(LRU).
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+# st.pyplot 기본 저장 옵션과 맞춤 (화질이 달라 보이지 않도록)
+SAVE_KW = {"bbox_inches": "tight", "dpi": 200}
+# st.image는 이보다 넓은 이미지를 재실행마다 디코딩·축소·재인코딩한다 → 캐시에 넣기 전에 한 번만 줄여 둠
+MAX_WIDTH = 1460
+
+
+def fit_width(data: bytes, max_width: int = MAX_WIDTH) -> bytes:
+    """PNG/JPEG 바이트를 max_width 이하로 (이미 작으면 그대로)"""
+    from PIL import Image
+    img = Image.open(io.BytesIO(data))
+    if img.width <= max_width:
+        return data
+    fmt = img.format
+    img = img.resize((max_width, round(img.height * max_width / img.width)), resample=Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def encode(fig, fmt: str = "png") -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **SAVE_KW)
+    plt.close(fig)
+    return fit_width(buf.getvalue()) if fmt == "png" else buf.getvalue()
+
+
+class FigureCache:
+    """프로세스 전체가 공유하는 차트 바이트 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_bytes: int = 64 * 2**20, fmt: str = "png"):
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: bytes) -> None:
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            if len(data) > self.max_bytes:
+                return  # 상한보다 큰 항목은 캐시하지 않음
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+
+    def get_or_render(self, key, build) -> bytes:
+        """캐시에 있으면 바로, 없으면 build()로 Figure를 만들어 인코딩 후 저장"""
+        data = self.get(key)
+        if data is None:
+            data = encode(build(), self.fmt)
+            self.put(key, data)
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "items": len(self._items), "bytes": self._bytes}
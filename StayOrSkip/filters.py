@@ -0,0 +1,277 @@
+# =============================
+# 🔎 Stay or Skip — 교차 필터 인덱스
+# =============================
+# 필터 컬럼마다 값별 행 비트맵(np.packbits, 8행 = 1바이트)을 한 번 만들어 두고
+# 선택은 컬럼 안에서는 OR, 컬럼끼리는 AND 비트 연산으로만 구한다 (프레임을 다시 훑지 않음).
+# Dataset 탭 집계는 행을 다시 세지 않도록 두 가지를 더 만들어 둔다.
+#   · 셀 큐브: 필터 값 조합(셀)별 행 수·매출·이용자 수·결측 수 → 선택된 셀만 더하면 끝
+#   · 유저 비트맵: 유저 단위 컬럼(설문)은 값별, 월·요금제처럼 유저마다 바뀌는 컬럼은
+#     조합별 "그 조합에 행이 있는 유저" 비트맵 → AND 하면 선택의 고유 이용자
+# 코호트/LTV처럼 행이 필요한 엔진에는 선택된 행만 담은 프레임을 넘긴다.
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from aggregates import Aggregates
+from loader import Dataset
+
+FILTER_COLS = ["subscription_plan", "Age", "Gender", "fav_music_genre", "spotify_listening_device", "month"]
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)  # 바이트별 1비트 수
+MAX_ROW_COMBOS = 4096  # 유저마다 바뀌는 컬럼 조합이 이보다 많으면 유저 비트맵 대신 행 단위로
+
+
+def _codes(s: pd.Series):
+    """범주형이면 코드를 그대로 (정렬된 categories), 아니면 정렬 factorize — 결측은 -1"""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy().astype(np.int32), list(s.cat.categories)
+    codes, uniques = pd.factorize(s, sort=True)
+    return codes.astype(np.int32), list(uniques)
+
+
+def _dense(ids: np.ndarray, space: int):
+    """0 ≤ ids < space → (실제로 나온 값, 0부터 다시 매긴 번호) — space가 작으면 정렬 없이 bincount로"""
+    if space <= 1 << 22:
+        present = np.bincount(ids, minlength=space) > 0
+        return np.flatnonzero(present), (np.cumsum(present) - 1)[ids]
+    return np.unique(ids, return_inverse=True)
+
+
+def _mixed_radix(codes: dict, cols: list, values: dict, n_rows: int):
+    """컬럼별 코드(+1, 0 = 결측)를 한 정수로 묶기 → (행별 조합 번호, 조합 공간 크기)"""
+    out, space = np.zeros(n_rows, dtype=np.int64), 1
+    for col in cols:
+        out = out * (len(values[col]) + 1) + (codes[col] + 1)
+        space *= len(values[col]) + 1
+    return out, space
+
+
+def _unmix(combos: np.ndarray, cols: list, values: dict) -> dict:
+    out, rest = {}, combos
+    for col in reversed(cols):
+        rest, out[col] = np.divmod(rest, len(values[col]) + 1)
+    return out
+
+
+def _or(bitmaps: np.ndarray, idx) -> np.ndarray:
+    return np.bitwise_or.reduce(bitmaps[idx], axis=0)
+
+
+class Selection:
+    """필터 결과 — bits가 None이면 전체 행"""
+
+    def __init__(self, key: str, bits, n_rows: int, chosen: dict):
+        self.key = key        # 캐시 키 ("" = 필터 없음)
+        self.bits = bits      # packbits된 행 선택 (uint8)
+        self.n_rows = n_rows  # 전체 행 수
+        self.chosen = chosen  # 조건이 걸린 컬럼 → 코드별 선택 여부 (0번 칸 = 결측)
+
+    @property
+    def active(self) -> bool:
+        return self.bits is not None
+
+    @property
+    def mask(self) -> np.ndarray:
+        if self.bits is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(self.bits, count=self.n_rows).view(bool)
+
+    def count(self) -> int:
+        return self.n_rows if self.bits is None else int(POPCOUNT[self.bits].sum())
+
+
+class FilterIndex:
+    """데이터셋 하나(fingerprint)에 대한 필터 비트맵과 집계 가속 구조"""
+
+    def __init__(self, dataset: Dataset, columns=FILTER_COLS):
+        frame = dataset.frame
+        self.dataset = dataset
+        self.fingerprint = dataset.fingerprint
+        self.n_rows = len(frame)
+        self.columns = [c for c in columns if c in frame]
+        self.all_columns = list(frame.columns)
+
+        # ---------- 값별 행 비트맵 ----------
+        codes, self.values, self.bitmaps = {}, {}, {}
+        for col in self.columns:
+            codes[col], self.values[col] = _codes(frame[col])
+            # (값, 행) bool을 한 번에 만들면 행 수 × 값 수만큼 커지므로 값마다 packbits
+            self.bitmaps[col] = np.stack([np.packbits(codes[col] == k) for k in range(len(self.values[col]))]) \
+                if self.values[col] else np.zeros((0, (self.n_rows + 7) // 8), dtype=np.uint8)
+
+        # ---------- 집계용 배열 (큐브를 못 쓰는 경우의 행 단위 경로) ----------
+        self.m, self.months = _codes(frame["month"])
+        p, self.plans = _codes(frame["subscription_plan"])
+        self.key = self.m * len(self.plans) + p
+        self.uid = frame["userid"].to_numpy()
+        self.revenue = frame["revenue"].to_numpy()
+        self.null_rows = {c: np.flatnonzero(frame[c].isna().to_numpy()) for c in frame.columns}
+        self.null_rows = {c: r for c, r in self.null_rows.items() if len(r)}  # 결측 없는 컬럼은 항상 0
+        # 유저 번호: userid 범위가 작으면 정렬 없이
+        if self.n_rows and self.uid.min() >= 0:
+            self.user_ids, self.u = _dense(self.uid.astype(np.int64), int(self.uid.max()) + 1)
+        else:
+            self.user_ids, self.u = np.unique(self.uid, return_inverse=True)
+        self.first_pair, self.exact_users = self._first_pairs(codes)
+
+        self._build_cube(codes)
+        self._build_users(codes)
+
+    def _first_pairs(self, codes: dict):
+        """(월×요금제 키, userid) 쌍의 첫 행 표시 — 선택 후 이 표시만 세면 고유 이용자 수
+
+        같은 쌍의 행들이 필터 컬럼 값도 같아야 (tidy는 쌍마다 한 행이라 보통 그렇다)
+        어떤 선택에서도 첫 행이 함께 남는다. 아니면 exact_users=False → 선택마다 np.unique.
+        """
+        pair = self.key.astype(np.int64) * len(self.user_ids) + self.u
+        space = len(self.months) * len(self.plans) * len(self.user_ids)
+        if space <= 4 * self.n_rows and np.bincount(pair, minlength=space).max(initial=0) <= 1:
+            return np.ones(self.n_rows, dtype=bool), True  # tidy: 쌍마다 한 행
+        pair = pd.factorize(pair)[0]
+        # factorize 번호는 처음 나온 순서대로 1씩 커지므로 "지금까지의 최대보다 크면" 첫 행
+        first = pair > np.maximum.accumulate(np.r_[-1, pair[:-1]])
+        if first.all():
+            return first, True
+        dup = np.flatnonzero(~first)
+        head = np.flatnonzero(first)[pair[dup]]
+        return first, all((c[dup] == c[head]).all() for c in codes.values())
+
+    def _build_cube(self, codes: dict):
+        """실제로 나타난 필터 값 조합(셀)별 합계 — 셀 수가 행 수에 가까우면 쓰지 않음"""
+        self.cells = None
+        if not self.exact_users or not {"month", "subscription_plan"} <= set(self.columns):
+            return
+        cells, row_cell = _dense(*_mixed_radix(codes, self.columns, self.values, self.n_rows))
+        if len(cells) > max(MAX_ROW_COMBOS, self.n_rows // 8):
+            return
+        n = len(cells)
+        self.cells = _unmix(cells, self.columns, self.values)  # 컬럼 → 셀별 코드 (+1, 0 = 결측)
+        self.cell_m = self.cells["month"] - 1
+        self.cell_key = self.cell_m * len(self.plans) + self.cells["subscription_plan"] - 1
+        self.cell_rows = np.bincount(row_cell, minlength=n)
+        self.cell_revenue = np.bincount(row_cell, weights=self.revenue, minlength=n)
+        self.cell_users = np.bincount(row_cell, weights=self.first_pair, minlength=n).astype(np.int64)
+        self.cell_na = {c: np.bincount(row_cell[r], minlength=n) for c, r in self.null_rows.items()}
+
+    def _build_users(self, codes: dict):
+        """유저 단위 컬럼은 값별 유저 비트맵, 유저마다 바뀌는 컬럼은 조합별 '행이 있는 유저' 비트맵"""
+        self.user_bits = None
+        u, n_u = self.u, len(self.user_ids)
+        self.user_cols, self.row_cols = {}, []
+        for col in self.columns:
+            per_user = np.full(n_u, -2, dtype=np.int32)
+            per_user[u] = codes[col]
+            if (per_user[u] == codes[col]).all():  # 유저마다 값이 하나
+                self.user_cols[col] = np.stack([np.packbits(per_user == k) for k in range(len(self.values[col]))]) \
+                    if self.values[col] else np.zeros((0, (n_u + 7) // 8), dtype=np.uint8)
+            else:
+                self.row_cols.append(col)
+        combos, row_combo = _dense(*_mixed_radix(codes, self.row_cols, self.values, self.n_rows))
+        if len(combos) > MAX_ROW_COMBOS:
+            return
+        order = np.argsort(row_combo.astype(np.uint16), kind="stable")  # 작은 정수 → 기수 정렬
+        bounds = np.searchsorted(row_combo[order], np.arange(len(combos) + 1))
+        self.combo_bits = np.zeros((len(combos), (n_u + 7) // 8), dtype=np.uint8)
+        for j in range(len(combos)):
+            seen = np.zeros(n_u, dtype=bool)
+            seen[u[order[bounds[j]:bounds[j + 1]]]] = True
+            self.combo_bits[j] = np.packbits(seen)
+        self.combo_codes = _unmix(combos, self.row_cols, self.values)  # 행 단위 컬럼 → 조합별 코드 (+1)
+        self.user_bits = True
+
+    # ---------- 선택 ----------
+    def options(self, col: str) -> list:
+        return self.values[col]
+
+    def select(self, choices: dict) -> Selection:
+        """choices = {컬럼: 선택한 값 목록} — 빈 목록/전체 선택은 그 컬럼 조건 없음"""
+        bits, parts, chosen = None, [], {}
+        for col in self.columns:
+            picked = [v for v in choices.get(col) or [] if v in self.values[col]]
+            if not picked or len(picked) == len(self.values[col]):
+                continue
+            idx = [self.values[col].index(v) for v in picked]
+            col_bits = _or(self.bitmaps[col], idx)
+            bits = col_bits if bits is None else np.bitwise_and(bits, col_bits, out=bits)
+            chosen[col] = np.zeros(len(self.values[col]) + 1, dtype=bool)
+            chosen[col][np.add(idx, 1)] = True
+            parts.append(f"{col}={'|'.join(map(str, sorted(picked)))}")
+        key = hashlib.sha1(";".join(parts).encode()).hexdigest()[:12] if parts else ""
+        return Selection(key, bits, self.n_rows, chosen)
+
+    def scoped(self, sel: Selection) -> str:
+        """선택별 fingerprint — 차트/집계 캐시 키가 선택마다 달라지도록"""
+        return self.fingerprint if not sel.active else f"{self.fingerprint}#{sel.key}"
+
+    # ---------- 선택 → Dataset 탭 집계 ----------
+    def aggregates(self, sel: Selection) -> Aggregates:
+        if self.cells is None:
+            return self._row_aggregates(sel)
+        take = np.ones(len(self.cell_key), dtype=bool)
+        for col, vec in sel.chosen.items():
+            take &= vec[self.cells[col]]
+        k, m = self.cell_key[take], self.cell_m[take]
+        n_m = len(self.months)
+        size = n_m * len(self.plans)
+        by_month_plan = self._by_month_plan(
+            np.bincount(k, weights=self.cell_revenue[take], minlength=size),
+            np.bincount(k, weights=self.cell_users[take], minlength=size).astype(np.int64),
+            np.bincount(k, weights=self.cell_rows[take], minlength=size).astype(np.int64))
+        na = np.zeros((n_m, len(self.all_columns)), dtype=np.int64)
+        for c, per_cell in self.cell_na.items():
+            na[:, self.all_columns.index(c)] = np.bincount(m, weights=per_cell[take], minlength=n_m)
+        present = np.bincount(m, weights=self.cell_rows[take], minlength=n_m) > 0
+        return Aggregates(self.scoped(sel), by_month_plan, self._na_frame(na, present), self.selected_users(sel))
+
+    def selected_users(self, sel: Selection) -> np.ndarray:
+        """선택된 행이 하나라도 있는 userid (정렬됨)"""
+        if self.user_bits is None:
+            return np.unique(self.uid[sel.mask])
+        take = np.ones(len(self.combo_bits), dtype=bool)
+        for col in self.row_cols:
+            if col in sel.chosen:
+                take &= sel.chosen[col][self.combo_codes[col]]
+        bits = _or(self.combo_bits, np.flatnonzero(take)) if take.any() \
+            else np.zeros(self.combo_bits.shape[1], dtype=np.uint8)
+        for col, bitmaps in self.user_cols.items():
+            if col in sel.chosen:
+                bits &= _or(bitmaps, np.flatnonzero(sel.chosen[col][1:]))
+        return self.user_ids[np.unpackbits(bits, count=len(self.user_ids)).view(bool)]
+
+    def _row_aggregates(self, sel: Selection) -> Aggregates:
+        """큐브를 못 쓸 때: 선택된 행을 직접 세기"""
+        mask = sel.mask
+        rows = np.flatnonzero(mask)
+        n_m, size = len(self.months), len(self.months) * len(self.plans)
+        k = self.key[rows]
+        if self.exact_users:
+            users = np.bincount(k, weights=self.first_pair[rows], minlength=size).astype(np.int64)
+        else:
+            pairs = np.unique((k.astype(np.int64) << 32) | self.uid[rows])
+            users = np.bincount(pairs >> 32, minlength=size)
+        by_month_plan = self._by_month_plan(np.bincount(k, weights=self.revenue[rows], minlength=size),
+                                            users, np.bincount(k, minlength=size))
+        na = np.zeros((n_m, len(self.all_columns)), dtype=np.int64)
+        for c, null in self.null_rows.items():
+            na[:, self.all_columns.index(c)] = np.bincount(self.m[null[mask[null]]], minlength=n_m)
+        present = np.bincount(self.m[rows], minlength=n_m) > 0
+        return Aggregates(self.scoped(sel), by_month_plan, self._na_frame(na, present), self.selected_users(sel))
+
+    def _by_month_plan(self, revenue, users, rows) -> pd.DataFrame:
+        n_m, n_p = len(self.months), len(self.plans)
+        out = pd.DataFrame({
+            "month": np.repeat(np.asarray(self.months, dtype=object), n_p),
+            "subscription_plan": np.tile(np.asarray(self.plans, dtype=object), n_m),
+            "revenue": revenue.round().astype(np.int64),
+            "users": users,
+            "rows": rows,
+        })
+        return out[out["rows"] > 0].reset_index(drop=True)
+
+    def _na_frame(self, na: np.ndarray, present: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(na[present], columns=self.all_columns,
+                            index=pd.Index(np.asarray(self.months, dtype=object)[present], name="month"))
+
+    def frame(self, sel: Selection, columns=None) -> pd.DataFrame:
+        """선택된 행만 담은 프레임 (코호트/LTV 엔진 입력용)"""
+        return self.dataset.view(columns, sel.mask if sel.active else None)
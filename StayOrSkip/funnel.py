@@ -0,0 +1,123 @@
+# =============================
+# 🔻 Stay or Skip — 순서 기반 퍼널 엔진
+# =============================
+# 이벤트 로그(user, timestamp, event)에서 유저별로 단계를 "순서대로" 밟았는지 계산한다.
+# 단계 k 도달 시각 = (단계 k-1 도달 시각 이후에 발생한) 단계 k 이벤트 중 가장 이른 시각.
+# 단계 코드로 한 번 정렬한 뒤 단계별 벡터 연산(np.minimum.at) 한 번씩만 하고,
+# 유저별 도달 시각만 상태로 들고 있으므로 로그를 청크 단위로 흘려 넣을 수 있다.
+import numpy as np
+import pandas as pd
+
+STAGES = ["visit", "signup", "first_play", "subscribe"]
+NOT_REACHED = np.iinfo(np.int64).max
+DEMO_FINGERPRINT = "demo-seed42"  # 시드 고정 데모 로그 → 캐시/아티팩트 키
+WINDOWS = {"제한 없음": None, "7일 이내": "7D", "30일 이내": "30D"}
+
+
+class FunnelEngine:
+    """청크를 update()로 계속 넣고 result()로 단계별 도달 유저 수를 얻는다.
+
+    청크는 시간순(이전 청크보다 늦은 이벤트)이거나 유저 단위로 나뉘어 있어야 한다.
+    window를 주면 첫 단계 이후 그 기간 안에 도달한 단계만 인정한다.
+    """
+
+    def __init__(self, stages=STAGES, window=None):
+        self.stages = list(stages)
+        self.window = None if window is None else pd.Timedelta(window).value
+        self._reached = np.full((len(self.stages), 0), NOT_REACHED, dtype=np.int64)
+        self._users = None  # 정수가 아닌 userid일 때만 사용하는 코드 매핑
+        self.n_events = 0
+
+    # ---------- 유저 → 배열 위치 ----------
+    def _user_codes(self, users: pd.Series) -> np.ndarray:
+        if pd.api.types.is_integer_dtype(users.dtype) and self._users is None:
+            codes = users.to_numpy().astype(np.int64, copy=False)
+            if len(codes) and codes.min() < 0:
+                raise ValueError("userid는 0 이상의 정수여야 합니다.")
+        else:
+            if self._users is None:
+                if self._reached.shape[1]:
+                    raise ValueError("한 엔진에 정수/비정수 userid를 섞어 넣을 수 없습니다.")
+                self._users = pd.Index([])
+            codes = self._users.get_indexer(users)
+            new = codes < 0
+            if new.any():
+                fresh = pd.Index(pd.unique(users[new]))
+                self._users = self._users.append(fresh)
+                codes[new] = self._users.get_indexer(users[new])
+            codes = codes.astype(np.int64)
+        n = int(codes.max()) + 1 if len(codes) else 0
+        if n > self._reached.shape[1]:
+            grow = np.full((len(self.stages), n - self._reached.shape[1]), NOT_REACHED, dtype=np.int64)
+            self._reached = np.concatenate([self._reached, grow], axis=1)
+        return codes
+
+    def update(self, events: pd.DataFrame, user: str = "user", time: str = "timestamp",
+               event: str = "event") -> "FunnelEngine":
+        stage = pd.Categorical(events[event], categories=self.stages).codes
+        keep = stage >= 0  # 퍼널 단계가 아닌 이벤트는 버림
+        stage = stage[keep]
+        u = self._user_codes(events[user][keep])
+        t = pd.to_datetime(events[time][keep]).to_numpy().astype("datetime64[ns]").view(np.int64)
+        self.n_events += len(t)
+
+        # 단계 코드로 한 번만 정렬 → 각 단계는 자기 이벤트 구간만 훑는다
+        order = np.argsort(stage, kind="stable")
+        bounds = np.searchsorted(stage[order], np.arange(len(self.stages) + 1))
+        first = self._reached[0]
+        for k in range(len(self.stages)):
+            idx = order[bounds[k]:bounds[k + 1]]
+            uk, tk = u[idx], t[idx]
+            if k > 0:
+                prev = self._reached[k - 1][uk]
+                m = (tk >= prev) & (prev != NOT_REACHED)
+                if self.window is not None:
+                    m &= (tk - first[uk]) <= self.window
+                uk, tk = uk[m], tk[m]
+            np.minimum.at(self._reached[k], uk, tk)
+        return self
+
+    # ---------- 결과 ----------
+    def stage_reached(self) -> np.ndarray:
+        """유저별 도달한 마지막 단계 인덱스 (-1 = 첫 단계 미도달)"""
+        return (self._reached != NOT_REACHED).sum(axis=0) - 1
+
+    def result(self) -> pd.DataFrame:
+        users = (self._reached != NOT_REACHED).sum(axis=1)
+        prev = np.concatenate([users[:1], users[:-1]])
+        return pd.DataFrame({
+            "stage": self.stages,
+            "users": users,
+            "conv_prev": (users / np.maximum(prev, 1) * 100).round(1),   # 직전 단계 대비
+            "conv_top": (users / max(users[0], 1) * 100).round(1),       # 첫 단계 대비
+        })
+
+
+def ordered_funnel(events: pd.DataFrame, stages=STAGES, window=None, **cols) -> pd.DataFrame:
+    """메모리에 올라간 이벤트 로그 한 번에 계산"""
+    return FunnelEngine(stages, window).update(events, **cols).result()
+
+
+def funnel_from_csv(path, stages=STAGES, window=None, chunksize: int = 5_000_000,
+                    user: str = "user", time: str = "timestamp", event: str = "event") -> pd.DataFrame:
+    """메모리에 안 들어가는 로그는 청크로 읽어 같은 엔진에 흘려 넣기 (시간순 파일 가정)"""
+    engine = FunnelEngine(stages, window)
+    reader = pd.read_csv(path, usecols=[user, time, event], chunksize=chunksize,
+                         dtype={event: "category"}, parse_dates=[time])
+    for chunk in reader:
+        engine.update(chunk, user=user, time=time, event=event)
+    return engine.result()
+
+
+def demo_events() -> pd.DataFrame:
+    """페이지 데모용 이벤트 로그 (시드 42 고정 — 예전 np.random.seed(42) 블록과 같은 값)"""
+    rng = np.random.RandomState(42)
+    dates = pd.date_range("2025-01-01", periods=60, freq="D")
+    df = pd.DataFrame({
+        "date": rng.choice(dates, 1000),
+        "channel": rng.choice(["SNS", "Search", "Ad"], 1000, p=[0.45, 0.35, 0.20]),
+        "event": rng.choice(STAGES, 1000, p=[0.45, 0.25, 0.20, 0.10]),
+        "amount": rng.gamma(2.2, 6.0, 1000).round(2),
+    })
+    df["user"] = rng.randint(0, 250, 1000)
+    return df
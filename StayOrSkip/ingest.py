@@ -0,0 +1,150 @@
+# =============================
+# 🚰 Stay or Skip — 스트리밍 수집 (메모리에 안 들어가는 추출본용)
+# =============================
+# CSV/xlsx/parquet을 크기가 정해진 청크로 읽으면서 청크마다 부분 집계만 만들고 버린다.
+# 남는 상태는 월×요금제 부분 집계, 월×컬럼 결측 수, userid 단위 배열(본 적 있음/첫 결제월)뿐이라
+# 최대 메모리는 파일 행 수가 아니라 청크 크기와 userid 범위로 정해진다.
+# 코호트 행렬은 첫 결제월이 확정돼야 채울 수 있어 파일을 한 번 더 스트리밍한다.
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+import aggregates
+from cohort import CohortEngine, NO_COHORT, month_ordinal
+
+# 고정 dtype — 청크마다 타입 추론이 달라지지 않도록
+INT_COLUMNS = {"userid": pa.int64(), "revenue": pa.int64(), "music_recc_rating": pa.int8()}
+BLOCK_BYTES = 4 * 2**20    # CSV 청크 크기 (바이트) — pyarrow가 여러 블록을 미리 읽으므로 작게
+XLSX_ROWS = 200_000        # xlsx 청크 크기 (행)
+PARQUET_ROWS = 500_000     # parquet 청크 크기 (행)
+STREAM_MIN_BYTES = 256 * 2**20  # 이보다 큰 추출본은 통째로 올리지 않고 청크 스트리밍으로 집계만 (앱·precompute 공통)
+
+
+# ---------- 청크 읽기 ----------
+def iter_csv(path: Path, block_bytes: int = BLOCK_BYTES, columns=None):
+    """pyarrow 스트리밍 리더 — 문자열 컬럼은 청크 안에서 dictionary(범주형)로"""
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_bytes),  # UTF-8 BOM은 pyarrow가 건너뜀
+        convert_options=pacsv.ConvertOptions(column_types=INT_COLUMNS, strings_can_be_null=True,
+                                             auto_dict_encode=True, auto_dict_max_cardinality=2**20,
+                                             include_columns=columns or []),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def iter_xlsx(path: Path, rows: int = XLSX_ROWS, columns=None):
+    """openpyxl read_only 모드로 행을 흘려 읽어 rows개씩 DataFrame으로"""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        it = wb.worksheets[0].iter_rows(values_only=True)
+        header = list(next(it))
+        keep = header if columns is None else [c for c in header if c in columns]
+        buf = []
+        for row in it:
+            buf.append(row)
+            if len(buf) >= rows:
+                yield _typed(pd.DataFrame(buf, columns=header)[keep]); buf = []
+        if buf:
+            yield _typed(pd.DataFrame(buf, columns=header)[keep])
+    finally:
+        wb.close()
+
+
+def iter_parquet(path: Path, rows: int = PARQUET_ROWS, columns=None):
+    """parquet 파일(또는 merge.py의 월별 파티션 폴더)을 행 그룹 단위 배치로"""
+    files = sorted(p for p in path.iterdir() if p.suffix == ".parquet") if path.is_dir() else [path]
+    for file in files:
+        pf = pq.ParquetFile(file)
+        keep = None if columns is None else [c for c in pf.schema_arrow.names if c in columns]
+        for batch in pf.iter_batches(batch_size=rows, columns=keep):
+            yield _typed(batch.to_pandas())
+
+
+def _typed(chunk: pd.DataFrame) -> pd.DataFrame:
+    for col, typ in INT_COLUMNS.items():
+        if col in chunk:
+            chunk[col] = chunk[col].astype(typ.to_pandas_dtype())
+    for col in chunk.columns.difference(list(INT_COLUMNS)):
+        chunk[col] = chunk[col].astype("category")
+    return chunk
+
+
+def iter_chunks(path: Path, **kw):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return iter_csv(path, **kw)
+    if suffix == ".parquet" or path.is_dir():
+        return iter_parquet(path, **kw)
+    if suffix in (".xlsx", ".xlsm"):
+        return iter_xlsx(path, **kw)
+    raise ValueError(f"스트리밍을 지원하지 않는 형식입니다: {path.name} (csv / xlsx / parquet)")
+
+
+# ---------- 청크별 부분 집계 누적 ----------
+def _grow(arr: np.ndarray, n: int, fill) -> np.ndarray:
+    if n <= len(arr):
+        return arr
+    return np.concatenate([arr, np.full(max(n, 2 * len(arr)) - len(arr), fill, dtype=arr.dtype)])
+
+
+def stream_metrics(path: Path, fingerprint: str = "", cohorts: bool = True, **kw):
+    """(Aggregates, CohortEngine | None) — Dataset/Cohort 탭이 쓰는 것과 같은 객체"""
+    bmp_parts, na, seen, options = [], None, np.zeros(0, dtype=bool), {}
+    first = np.zeros(0, dtype=np.int64)  # userid → 첫 결제월 ordinal
+    no_first = np.iinfo(np.int64).max
+    for chunk in iter_chunks(path, **kw):
+        # users는 청크별 고유 유저 수의 합 — tidy 단위가 (userid, 월) 한 행이라 청크 간 중복 없음
+        bmp, na_part, uids, opts = aggregates.partials(chunk)
+        bmp_parts.append(bmp)
+        options = aggregates.merge_options(options, opts)
+        if sum(len(b) for b in bmp_parts) > 4096:  # 부분 집계도 주기적으로 접어서 작게 유지
+            bmp_parts = [_fold(bmp_parts)]
+        na = na_part if na is None else na.add(na_part, fill_value=0)
+        seen = _grow(seen, int(uids.max()) + 1 if len(uids) else 0, False)
+        seen[uids] = True
+        if cohorts:
+            uid, m, rev = _cohort_arrays(chunk)
+            paid = rev > 0
+            first = _grow(first, int(uid.max()) + 1 if len(uid) else 0, no_first)
+            np.minimum.at(first, uid[paid], m[paid])
+
+    bmp = _fold(bmp_parts).sort_values(["month", "subscription_plan"], ignore_index=True)
+    na = na.sort_index().astype(np.int64)
+    agg = aggregates.Aggregates(fingerprint, bmp, na, np.flatnonzero(seen), options)
+    return agg, (_stream_cohorts(path, first, no_first, agg, fingerprint, **kw) if cohorts else None)
+
+
+def _fold(parts) -> pd.DataFrame:
+    return (pd.concat(parts, ignore_index=True)
+            .groupby(["month", "subscription_plan"], as_index=False)[["revenue", "users", "rows"]].sum())
+
+
+def _cohort_arrays(chunk: pd.DataFrame):
+    m_codes, labels = pd.factorize(chunk["month"], sort=True)
+    m = month_ordinal(labels)[m_codes]
+    return (chunk["userid"].to_numpy().astype(np.int64), m,
+            chunk["revenue"].to_numpy().astype(np.float64))
+
+
+def _stream_cohorts(path, first, no_first, agg, fingerprint, **kw) -> CohortEngine:
+    """두 번째 패스: 첫 결제월이 확정된 상태로 (코호트, 경과) 셀 채우기"""
+    engine = CohortEngine()
+    engine.fingerprint = fingerprint
+    engine.rows_by_month = agg.rows_by_month
+    ords = month_ordinal(agg.months)
+    engine.base = int(ords[0])
+    size = int(ords[-1] - ords[0]) + 1
+    engine.first = np.where(first == no_first, NO_COHORT, first - engine.base).astype(np.int32)
+    for chunk in iter_chunks(path, columns=["userid", "month", "revenue"], **kw):
+        uid, m, rev = _cohort_arrays(chunk)
+        paid = rev > 0
+        engine.add_rows(uid[paid], (m[paid] - engine.base).astype(np.int64), rev[paid], size)
+    return engine
@@ -0,0 +1,188 @@
+# =============================
+# 📦 Stay or Skip — 컬럼형 스냅샷 로더
+# =============================
+# 원본(xlsx/csv)을 처음 한 번만 파싱해 Arrow IPC 스냅샷(.arrow)으로 저장하고,
+# 이후에는 원본이 바뀌지 않는 한 스냅샷을 메모리 맵으로 읽는다.
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BASE = Path(__file__).parent
+CACHE_DIR = BASE / ".cache"
+SOURCE = CACHE_DIR / "merged" / "spotify_merged"  # merge.py 결과 (월별 parquet 파티션 폴더)
+BUNDLED = BASE / "spotify_merged.xlsx"  # 저장소에 든 병합본 — 병합 결과를 쓸 수 없는 읽기 전용 환경용
+
+# 정렬 순서가 의미 있는 범주형 컬럼 (max/min, 정렬에 사용)
+ORDERED_COLS = ["month", "timestamp"]
+# 정수 컬럼은 범위에 맞는 작은 타입으로
+INT_DTYPES = {"userid": "int32", "revenue": "int64", "music_recc_rating": "int8"}
+
+
+# ---------- 원본 파싱 ----------
+def read_source(path: Path) -> pd.DataFrame:
+    """xlsx/csv/parquet 원본을 그대로 읽기 (확장자로 판별, 폴더는 merge.py의 월별 parquet 파티션)"""
+    if path.is_dir() or path.suffix.lower() == ".parquet":
+        return pq.read_table(path).to_pandas()
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, encoding="utf-8-sig")
+    return pd.read_excel(path)
+
+
+def to_compact(raw: pd.DataFrame) -> pd.DataFrame:
+    """문자열 컬럼 → category, 정수 컬럼 → 작은 정수 타입"""
+    out = raw.copy()
+    for col in out.columns:
+        if col in INT_DTYPES:
+            out[col] = out[col].astype(INT_DTYPES[col])
+        elif out[col].dtype == object:
+            cats = sorted(out[col].dropna().unique())
+            out[col] = pd.Categorical(out[col], categories=cats, ordered=col in ORDERED_COLS)
+    return out
+
+
+# ---------- 변경 감지 ----------
+def file_digest(path: Path) -> str:
+    """파일 sha256 — 폴더면 데이터 파일('_'/'.'로 시작하지 않는 것)의 이름과 내용을 이름순으로"""
+    h = hashlib.sha256()
+    files = sorted(p for p in path.iterdir() if p.is_file() and p.name[0] not in "_.") if path.is_dir() else [path]
+    for file in files:
+        if path.is_dir():
+            h.update(file.name.encode())
+        with file.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def read_store(store: Path, version: int):
+    """.cache의 pickle 저장본 — 없거나, 못 읽거나, 저장 형식(version)이 다르면 None"""
+    try:
+        obj = pd.read_pickle(store)
+    except Exception:  # 클래스 구조가 바뀐 예전 pickle 등 → 다시 계산
+        return None
+    return obj if getattr(obj, "version", None) == version else None
+
+
+def write_store(obj, store: Path) -> bool:
+    """.cache에 pickle 저장 — 임시 파일에 다 쓴 뒤 교체 (동시에 쓰는 프로세스가 있어도 반쪽 파일을 안 남김)
+
+    읽기 전용 환경 등으로 못 쓰면 False (호출한 쪽은 메모리 캐시만 사용)
+    """
+    tmp = store.with_name(f"{store.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        store.parent.mkdir(exist_ok=True)
+        pd.to_pickle(obj, tmp)
+        tmp.replace(store)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def _paths(source: Path):
+    """스냅샷·메타 경로 — 이름이 같은 다른 폴더의 원본끼리 덮어쓰지 않도록 절대 경로 해시를 붙임"""
+    key = hashlib.sha1(str(Path(source).resolve()).encode()).hexdigest()[:12]
+    stem = CACHE_DIR / f"{source.name}.{key}"
+    return stem.with_name(stem.name + ".arrow"), stem.with_name(stem.name + ".json")
+
+
+def snapshot_is_fresh(source: Path) -> bool:
+    """mtime/size가 같으면 바로 통과, 다르면 해시로 실제 변경 여부 확인"""
+    snap, meta_path = _paths(source)
+    if not (snap.exists() and meta_path.exists()):
+        return False
+    meta = json.loads(meta_path.read_text())
+    st = source.stat()
+    if meta.get("mtime_ns") == st.st_mtime_ns and meta.get("size") == st.st_size:
+        return True
+    if meta.get("sha256") != file_digest(source):
+        return False
+    # 내용은 같고 mtime만 바뀐 경우(체크아웃 등) → 스탬프만 갱신
+    meta.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+    try:
+        meta_path.write_text(json.dumps(meta))
+    except OSError:
+        pass  # 읽기 전용 배포 환경 등 → 다음에도 해시로 확인 (스냅샷은 그대로 사용)
+    return True
+
+
+# ---------- 스냅샷 생성/읽기 ----------
+def build_snapshot(source: Path) -> pa.Table:
+    """원본을 파싱해 스냅샷으로 저장 (비압축 IPC → 메모리 맵 가능)"""
+    table = pa.Table.from_pandas(to_compact(read_source(source)), preserve_index=False)
+    snap, meta_path = _paths(source)
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = snap.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(snap)
+    st = source.stat()
+    meta_path.write_text(json.dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                                     "sha256": file_digest(source), "rows": table.num_rows}))
+    return table
+
+
+def read_snapshot(source: Path) -> pa.Table:
+    snap, _ = _paths(source)
+    # 반환된 테이블이 매핑된 버퍼를 직접 참조하므로 파일을 닫지 않는다
+    return pa.ipc.open_file(pa.memory_map(str(snap), "r")).read_all()
+
+
+def load_table(source: Path = SOURCE) -> pa.Table:
+    """스냅샷이 최신이면 메모리 맵으로, 아니면 새로 만들어 반환"""
+    source = Path(source)
+    if snapshot_is_fresh(source):
+        return read_snapshot(source)
+    try:
+        return build_snapshot(source)
+    except OSError:
+        # 읽기 전용 배포 환경 등 → 스냅샷 없이 메모리에서만 사용
+        return pa.Table.from_pandas(to_compact(read_source(source)), preserve_index=False)
+
+
+def load_frame(source: Path = SOURCE) -> pd.DataFrame:
+    return load_table(source).to_pandas(split_blocks=True)
+
+
+# ---------- 세션 공유용 읽기 전용 데이터셋 ----------
+def source_stamp(source: Path = SOURCE) -> tuple:
+    """원본 변경 감지용 키 (st.cache_resource 인자로 사용)"""
+    st = Path(source).stat()
+    return (str(source), st.st_mtime_ns, st.st_size)
+
+
+class Dataset:
+    """프로세스 전체에서 한 벌만 두고 모든 세션이 공유하는 데이터셋.
+
+    frame의 컬럼은 Arrow 버퍼를 그대로 가리키는 읽기 전용 배열이라
+    제자리 수정은 에러가 난다. 파생 뷰는 view()로만 만든다.
+    """
+
+    def __init__(self, table: pa.Table, fingerprint: str = ""):
+        self.table = table
+        self.fingerprint = fingerprint  # 원본 sha256 — 사전 집계/캐시 키로 사용
+        self.frame = table.to_pandas(split_blocks=True)
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def view(self, columns=None, mask=None) -> pd.DataFrame:
+        """컬럼/행 선택 뷰 (copy-on-write 모드에서는 실제 복사 없이 원본 공유)"""
+        out = self.frame if columns is None else self.frame[list(columns)]
+        return out if mask is None else out[mask]
+
+
+def load_dataset(source: Path = SOURCE) -> Dataset:
+    source = Path(source)
+    table = load_table(source)
+    if snapshot_is_fresh(source):
+        fingerprint = json.loads(_paths(source)[1].read_text())["sha256"]
+    else:  # 스냅샷을 못 쓰는 환경 → 직접 해시
+        fingerprint = file_digest(source)
+    return Dataset(table, fingerprint)
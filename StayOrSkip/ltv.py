@@ -0,0 +1,126 @@
+# =============================
+# 💰 Stay or Skip — 유저별 LTV / ARPU 엔진
+# =============================
+# tidy(userid, month, revenue, subscription_plan)를 (userid, 월) 순으로 한 번 정렬한 뒤
+# 누적합·bincount만으로 유저별 누적 매출, 요금제(×세그먼트)별 ARPU/ARPPU,
+# 유료 유지 기준 월 이탈률과 이탈 보정 예상 LTV를 계산한다. (파이썬 루프 없음)
+import numpy as np
+import pandas as pd
+
+from cohort import month_ordinal
+
+SEGMENTS = ["Age", "Gender", "fav_music_genre", "spotify_listening_device", "spotify_usage_period"]  # LTV 탭 세그먼트 기준
+
+
+class LTVTables:
+    """한 데이터셋(+세그먼트 기준)에 대한 LTV 결과 묶음"""
+
+    def __init__(self, fingerprint: str, by, users: pd.DataFrame, curve: pd.Series,
+                 plans: pd.DataFrame, segments: pd.DataFrame, overall: pd.Series):
+        self.fingerprint = fingerprint
+        self.by = by              # 세그먼트 컬럼 (None = 전체)
+        self.users = users        # 유저별 누적 매출·활동 개월
+        self.curve = curve        # 활동 n개월차 평균 누적 매출 (LTV 곡선)
+        self.plans = plans        # (세그먼트, 요금제)별 ARPU/ARPPU
+        self.segments = segments  # 세그먼트별 ARPU/ARPPU/이탈률/예상 LTV
+        self.overall = overall    # 전체 합계 기준 같은 지표
+
+
+def _rates(df: pd.DataFrame, horizon=None, discount: float = 0.0) -> pd.DataFrame:
+    """합계 컬럼(revenue, user_months, paid_months, at_risk, retained) → 비율 지표"""
+    df["arpu"] = df["revenue"] / df["user_months"].clip(lower=1)
+    df["arppu"] = df["revenue"] / df["paid_months"].clip(lower=1)
+    # 유료 → 다음 달 전이가 하나도 없으면 이탈률을 알 수 없음 → NaN (표에는 "-")
+    at_risk = df["at_risk"].to_numpy(dtype=float)
+    df["churn"] = 1 - df["retained"].to_numpy(dtype=float) / np.where(at_risk > 0, at_risk, np.nan)
+    df["projected_ltv"] = projected_ltv(df["arppu"], df["churn"], horizon, discount)
+    return df
+
+
+def projected_ltv(arppu, churn, horizon=None, discount: float = 0.0):
+    """월 ARPPU × 기대 유지 개월 — 기하급수 생존 (1-churn)^t, 월 할인율 discount
+
+    horizon이 없으면 무한 등비급수, 있으면 horizon개월까지만 합산한다.
+    churn이 NaN이거나, horizon 없이 관측 이탈이 0(할인도 0)이라 급수가 발산하면 NaN.
+    """
+    arppu, churn = np.asarray(arppu, dtype=float), np.asarray(churn, dtype=float)
+    q = (1 - churn) / (1 + discount)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if horizon is None:
+            return np.where(q < 1, arppu / (1 - q), np.nan)
+        months = np.where(q < 1, (1 - q ** horizon) / (1 - q), horizon)  # q = 1 → horizon개월 그대로
+    return arppu * np.where(np.isnan(q), np.nan, months)
+
+
+def compute(frame: pd.DataFrame, fingerprint: str = "", by=None,
+            horizon=None, discount: float = 0.0) -> LTVTables:
+    # ---------- (userid, 월) 정렬된 배열 ----------
+    m_codes, m_labels = pd.factorize(frame["month"], sort=True)
+    m = month_ordinal(m_labels)[m_codes]
+    uid = frame["userid"].to_numpy().astype(np.int64)
+    order = np.lexsort((m, uid))
+    uid, m = uid[order], m[order]
+    rev = frame["revenue"].to_numpy().astype(np.float64)[order]
+    # 범주형 컬럼은 코드만 뽑아 정렬 순서대로 재배열 (문자열 배열을 만들지 않음)
+    p, plans = pd.factorize(frame["subscription_plan"], sort=True)
+    p = p[order]
+    if by is None:
+        g, segs = np.zeros(len(uid), dtype=np.int64), pd.Index(["전체"])
+    else:
+        g, segs = pd.factorize(frame[by], sort=True, use_na_sentinel=False)
+        g = g[order]
+    paid = rev > 0
+
+    # ---------- 유저별 누적 매출 ----------
+    starts = np.flatnonzero(np.r_[True, uid[1:] != uid[:-1]])
+    cum = np.cumsum(rev)
+    before = np.r_[0.0, cum][starts]                      # 유저 시작 직전까지의 누적
+    run_len = np.diff(np.r_[starts, len(uid)])
+    cum_by_user = cum - np.repeat(before, run_len)          # 행별 유저 내 누적 매출
+    last = starts + run_len - 1
+    tenure = np.arange(len(uid)) - np.repeat(starts, run_len)  # 유저 내 몇 번째 달인지
+    curve = pd.Series(np.bincount(tenure, weights=cum_by_user) / np.bincount(tenure),
+                      index=pd.RangeIndex(tenure.max() + 1, name="month_index"), name="avg_cum_revenue")
+    users = pd.DataFrame({
+        "userid": uid[starts],
+        "months_active": run_len,
+        "paid_months": np.add.reduceat(paid.astype(np.int64), starts),
+        "total_revenue": cum_by_user[last],
+        "last_plan": np.asarray(plans, dtype=object)[p[last]],
+    })
+    if by is not None:
+        users[by] = np.asarray(segs, dtype=object)[g[starts]]
+
+    # ---------- (세그먼트, 요금제)별 ARPU / ARPPU ----------
+    n_p = len(plans)
+    key = g * n_p + p
+    size = len(segs) * n_p
+    tbl = pd.DataFrame({
+        "segment": np.repeat(np.asarray(segs, dtype=object), n_p),
+        "subscription_plan": np.tile(np.asarray(plans, dtype=object), len(segs)),
+        "user_months": np.bincount(key, minlength=size),
+        "paid_months": np.bincount(key, weights=paid, minlength=size).astype(np.int64),
+        "revenue": np.bincount(key, weights=rev, minlength=size),
+    })
+    tbl = tbl[tbl["user_months"] > 0].reset_index(drop=True)
+    tbl["arpu"] = tbl["revenue"] / tbl["user_months"]
+    tbl["arppu"] = tbl["revenue"] / tbl["paid_months"].clip(lower=1)
+
+    # ---------- 세그먼트별 월 이탈률 (유료 → 다음 달 미결제) ----------
+    # 같은 유저의 바로 다음 달 행이 있는 유료 행만 분모 (관측 끝 달은 제외)
+    nxt = np.r_[(uid[1:] == uid[:-1]) & (m[1:] == m[:-1] + 1), False]
+    at_risk = paid & nxt
+    retained = at_risk & np.r_[paid[1:], False]
+    n_g = len(segs)
+    seg = pd.DataFrame({
+        "segment": np.asarray(segs, dtype=object),
+        "users": np.bincount(g[starts], minlength=n_g),
+        "user_months": np.bincount(g, minlength=n_g),
+        "paid_months": np.bincount(g, weights=paid, minlength=n_g).astype(np.int64),
+        "revenue": np.bincount(g, weights=rev, minlength=n_g),
+        "at_risk": np.bincount(g, weights=at_risk, minlength=n_g).astype(np.int64),
+        "retained": np.bincount(g, weights=retained, minlength=n_g).astype(np.int64),
+    })
+    overall = _rates(seg.drop(columns="segment").sum().to_frame().T, horizon, discount).iloc[0]
+    seg = _rates(seg, horizon, discount)
+    return LTVTables(fingerprint, by, users, curve, tbl, seg, overall)
@@ -0,0 +1,215 @@
+# =============================
+# 🔗 Stay or Skip — 설문 × 매출 병합 파이프라인
+# =============================
+# 사용법: python StayOrSkip/merge.py [--survey 경로] [--revenue 경로] [--out 폴더] [--full]
+# Spotify_data.xlsx(설문, 유저당 1행 — userid 컬럼이 없어 행 번호 + 1을 userid로 사용)와
+# 스포티파이_매출지표.xlsx(userid × 월 매출)를 userid 해시 조인(직접 주소 테이블)으로 붙인다.
+# 조인하는 같은 패스에서 중복·고아(한쪽에만 있는 키)·결측 통계를 세고,
+# 결과는 월별 parquet 파티션 + _quality.json(대시보드가 읽는 품질 리포트)으로 남긴다.
+# 설문이 그대로면 내용이 같은 월 파티션은 재사용하고 새로 생기거나 바뀐 월의 매출 행만 조인한다.
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import loader
+from loader import BASE, SOURCE, file_digest
+
+SURVEY = BASE / "Spotify_data.xlsx"
+REVENUE = BASE / "스포티파이_매출지표.xlsx"
+REVENUE_SHEET = "시트 1"
+OUT = SOURCE  # 월별 파티션 폴더 (loader가 폴더째 읽음)
+REPORT, STATE = "_quality.json", "_state.json"  # '_'로 시작 → parquet 읽기에서 제외됨
+REVENUE_COLS = ["userid", "month", "revenue", "subscription_plan", "timestamp"]
+
+
+# ---------- 입력 읽기 ----------
+def read_survey(path: Path = SURVEY) -> pd.DataFrame:
+    survey = pd.read_excel(path) if path.suffix.lower() != ".csv" else pd.read_csv(path, encoding="utf-8-sig")
+    survey.insert(0, "userid", np.arange(1, len(survey) + 1, dtype=np.int64))
+    return survey
+
+
+def read_revenue(path: Path = REVENUE, sheet: str = REVENUE_SHEET) -> pd.DataFrame:
+    """userid, spotify_subscription_plan, revenue, timestamp → 병합 스키마(subscription_plan, month 추가)"""
+    raw = (pd.read_csv(path, encoding="utf-8-sig") if path.suffix.lower() == ".csv"
+           else pd.read_excel(path, sheet_name=sheet))
+    ts = pd.to_datetime(raw["timestamp"], errors="coerce")
+    return pd.DataFrame({
+        "userid": pd.to_numeric(raw["userid"], errors="coerce"),  # 숫자가 아니면 NaN → 고아 행
+        "month": ts.dt.strftime("%Y-%m"),
+        "revenue": pd.to_numeric(raw["revenue"], errors="coerce"),
+        "subscription_plan": raw["spotify_subscription_plan"],
+        "timestamp": ts.dt.strftime("%Y-%m-%d"),
+    })
+
+
+# ---------- 조인 + 품질 통계 (한 패스) ----------
+def join_month(survey: pd.DataFrame, survey_na: np.ndarray, rows: pd.DataFrame):
+    """한 달치 매출 행 ⨝ 설문 → (병합 행, 통계)
+
+    설문 userid는 1..N 정수라 위치 배열 하나가 해시 테이블 역할을 한다.
+    (userid, 월) 중복은 처음 나온 행만 남기고, 설문에 없는 userid 행은 버리면서 센다.
+    """
+    uid = rows["userid"].to_numpy(dtype=np.float64)
+    lut = np.full(len(survey) + 1, -1, dtype=np.int64)
+    lut[survey["userid"].to_numpy()] = np.arange(len(survey))
+    valid = np.isfinite(uid) & (uid >= 1) & (uid <= len(survey)) & (uid == np.round(uid))
+    pos = np.full(len(uid), -1, dtype=np.int64)
+    pos[valid] = lut[uid[valid].astype(np.int64)]
+    orphan = pos < 0
+    order = np.argsort(np.where(orphan, -1, pos), kind="stable")  # 같은 userid가 인접하도록 (안정 정렬 → 첫 행이 앞)
+    sp = pos[order]
+    first = np.concatenate([[True], sp[1:] != sp[:-1]])
+    keep = np.sort(order[first & (sp >= 0)])  # 남길 행은 매출 시트 순서대로
+    dup = int(((~first) & (sp >= 0)).sum())
+
+    p = pos[keep]
+    merged = rows.iloc[keep].reset_index(drop=True).assign(userid=lambda d: d["userid"].astype(np.int64))
+    side = survey.iloc[p].reset_index(drop=True).drop(columns="userid")
+    side["spotify_subscription_plan"] = merged["subscription_plan"].to_numpy()  # 월별 요금제가 기준
+    out = pd.concat([merged, side], axis=1)
+
+    # 결측: 설문 쪽은 유저별 결측 × 등장 횟수, 매출 쪽은 남긴 행에서 바로
+    times = np.bincount(p, minlength=len(survey))
+    nulls = dict(zip(survey.columns[1:], (survey_na[:, 1:].T @ times).tolist()))
+    nulls["spotify_subscription_plan"] = 0
+    nulls.update({c: int(out[c].isna().sum()) for c in REVENUE_COLS})
+    stats = {"rows_in": len(rows), "rows": len(out), "duplicates": dup, "orphans": int(orphan.sum()),
+             "nulls": {c: int(n) for c, n in nulls.items()}}
+    return out, stats
+
+
+def _schema(survey: pd.DataFrame) -> pa.Schema:
+    """파티션마다 타입 추론이 달라지지 않도록 (전부 결측인 컬럼 등) 고정 스키마"""
+    fields = [("userid", pa.int64()), ("month", pa.string()), ("revenue", pa.int64()),
+              ("subscription_plan", pa.string()), ("timestamp", pa.string())]
+    for col in survey.columns[1:]:
+        numeric = pd.api.types.is_numeric_dtype(survey[col])
+        fields.append((col, pa.from_numpy_dtype(survey[col].dtype) if numeric else pa.string()))
+    return pa.schema(fields)
+
+
+def _rows_hash(rows: pd.DataFrame) -> str:
+    """월 파티션 재사용 판단용 — 다른 월의 이상값 때문에 dtype이 바뀌어도 같은 내용이면 같은 값"""
+    rows = rows.astype({"userid": np.float64, "revenue": np.float64})
+    return f"{int(pd.util.hash_pandas_object(rows, index=False).sum()):x}:{len(rows)}"
+
+
+# ---------- 증분 빌드 ----------
+def update(survey_path: Path = SURVEY, revenue_path: Path = REVENUE, out: Path = OUT, full: bool = False) -> dict:
+    """새로 생기거나 바뀐 월만 조인해 파티션을 쓰고 품질 리포트를 갱신 → 리포트 dict"""
+    t0 = time.perf_counter()
+    out.mkdir(parents=True, exist_ok=True)
+    try:
+        state = json.loads((out / STATE).read_text())
+    except (OSError, ValueError):
+        state = {}
+    survey_sha = file_digest(survey_path)
+    if full or state.get("survey_sha256") != survey_sha:
+        state = {"survey_sha256": survey_sha, "months": {}}  # 설문이 바뀌면 모든 월이 영향 → 전체 재조인
+
+    survey = read_survey(survey_path)
+    survey_na = survey.isna().to_numpy()
+    schema = _schema(survey)
+    revenue = read_revenue(revenue_path)
+    no_month = revenue["month"].isna()
+    months = {}
+    for month, rows in revenue[~no_month].groupby("month", sort=True):
+        h = _rows_hash(rows)
+        prev = state["months"].get(month)
+        if prev is not None and prev["hash"] == h and (out / prev["file"]).exists():
+            months[month] = {**prev, "status": "reused"}
+            continue
+        merged, stats = join_month(survey, survey_na, rows)
+        file = f"part-{month}.parquet"
+        tmp = out / (file + ".tmp")
+        pq.write_table(pa.Table.from_pandas(merged, schema=schema, preserve_index=False), tmp)
+        tmp.replace(out / file)
+        months[month] = {"hash": h, "file": file, **stats, "status": "joined"}
+    for month, prev in state["months"].items():  # 매출 시트에서 사라진 월
+        if month not in months:
+            (out / prev["file"]).unlink(missing_ok=True)
+
+    matched = np.zeros(len(survey) + 1, dtype=bool)
+    for e in months.values():
+        matched[pq.read_table(out / e["file"], columns=["userid"])["userid"].to_numpy()] = True
+    nulls = {c: 0 for c in schema.names}
+    for e in months.values():
+        for c, n in e["nulls"].items():
+            nulls[c] += n
+    report = {
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "build_sec": round(time.perf_counter() - t0, 3),
+        "inputs": {"survey": {"path": survey_path.name, "rows": len(survey), "sha256": survey_sha},
+                   "revenue": {"path": revenue_path.name, "rows": len(revenue)}},
+        "rows": sum(e["rows"] for e in months.values()),
+        "users": int(matched.sum()),
+        "months": sorted(months),
+        "duplicates": sum(e["duplicates"] for e in months.values()),
+        "orphans": {"revenue_only_rows": sum(e["orphans"] for e in months.values()),
+                    "survey_only_users": int(len(survey) - matched.sum())},
+        "invalid_timestamp_rows": int(no_month.sum()),
+        "nulls": nulls,
+        "joined": [m for m, e in months.items() if e["status"] == "joined"],
+        "by_month": {m: {k: e[k] for k in ("rows_in", "rows", "duplicates", "orphans", "status")}
+                     for m, e in months.items()},
+    }
+    removed = set(state["months"]) - set(months)
+    if not report["joined"] and not removed and (out / REPORT).exists():
+        return {**json.loads((out / REPORT).read_text()), "joined": []}  # 폴더를 건드리지 않음 → 원본 스탬프 유지
+    state["months"] = {m: {k: v for k, v in e.items() if k != "status"} for m, e in months.items()}
+    for name, obj in [(STATE, state), (REPORT, report)]:
+        tmp = out / (name + ".tmp")
+        tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=1))
+        tmp.replace(out / name)
+    return report
+
+
+def read_report(source: Path):
+    """병합 결과 폴더의 품질 리포트 (다른 원본이면 None)"""
+    try:
+        return json.loads((Path(source) / REPORT).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def input_stamp(survey_path: Path = SURVEY, revenue_path: Path = REVENUE) -> tuple:
+    """입력 파일 변경 감지용 키 — 앱이 이 값이 바뀔 때만 update()를 부름"""
+    return tuple((p.stat().st_mtime_ns, p.stat().st_size) for p in (survey_path, revenue_path))
+
+
+def load_dataset() -> loader.Dataset:
+    """병합 결과를 최신으로 맞춘 뒤 Dataset으로 (합성·벤치마크 스크립트용 기본 원본)
+
+    결과 폴더에 쓸 수 없는 환경이면 저장소에 든 병합본(loader.BUNDLED)을 대신 연다.
+    """
+    try:
+        update()
+    except OSError:
+        return loader.load_dataset(loader.BUNDLED)
+    return loader.load_dataset(OUT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stay or Skip 설문 × 매출 병합")
+    ap.add_argument("--survey", type=Path, default=SURVEY)
+    ap.add_argument("--revenue", type=Path, default=REVENUE)
+    ap.add_argument("--out", type=Path, default=OUT)
+    ap.add_argument("--full", action="store_true", help="기존 파티션을 무시하고 전체 재조인")
+    args = ap.parse_args()
+    r = update(args.survey, args.revenue, args.out, args.full)
+    print(f"{r['rows']:,} rows · {r['users']:,} users · {r['months'][0]} ~ {r['months'][-1]} → {args.out} "
+          f"({r['build_sec']} s, joined {len(r['joined'])}/{len(r['months'])} months)", file=sys.stderr)
+    print(f"  duplicates {r['duplicates']} · revenue-only rows {r['orphans']['revenue_only_rows']} · "
+          f"survey-only users {r['orphans']['survey_only_users']} · "
+          f"null cells {sum(r['nulls'].values()):,}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
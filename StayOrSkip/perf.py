@@ -0,0 +1,211 @@
+# =============================
+# ⏱️ Stay or Skip — 재실행 단위 성능 계측
+# =============================
+# 한 번의 스크립트 실행(rerun)을 Run 하나로 보고, 그 안의 구간(span)마다
+# 벽시계 시간, 캐시 적중 여부, (memory=True일 때만) tracemalloc 기준 순증 메모리/피크를 기록한다.
+# 꺼져 있으면 span은 플래그 확인 한 번뿐이라 평소 실행에는 거의 영향이 없다.
+# tracemalloc은 모든 할당을 느리게 하므로(엔진 호출 기준 10%대) 시간 기록과 따로 켠다.
+# 켜진 실행 동안만 추적하며 프로세스 전체 할당을 본다 (다른 세션 포함).
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+_local = threading.local()   # Streamlit은 세션마다 스크립트 스레드가 따로 → 실행 상태도 스레드별
+_tracing = {"users": 0, "lock": threading.Lock(), "owned": False}
+PENDING = "perf_pending_run"  # begin(state=...)에 넘긴 dict에서 아직 end()되지 않은 실행 자리
+
+
+class Run:
+    """한 번의 재실행 기록 — spans는 시작 순서, depth로 중첩 표시"""
+
+    def __init__(self, meta: dict, memory: bool = False):
+        self.meta = dict(meta)
+        self.memory = memory  # False면 메모리 칸은 None (tracemalloc 미사용)
+        self.spans = []
+        self.stack = []  # 열린 span의 (레코드, 시작 시점 메모리, 자식까지 본 피크)
+        self.t0 = time.perf_counter()
+        self.mem0 = self.top = _memory()[0] if memory else 0  # top: 최상위 span 바깥까지 포함한 실행 피크
+        self.wall_ms = 0.0
+        self.peak_kb = 0.0 if memory else None
+        self.state = None  # begin()에 넘긴 state (end()에서 PENDING 자리를 비움)
+
+    def to_dict(self) -> dict:
+        hits = sum(s["cache"] == "hit" for s in self.spans)
+        misses = sum(s["cache"] == "miss" for s in self.spans)
+        return {**self.meta, "wall_ms": self.wall_ms, "peak_kb": self.peak_kb, "memory": self.memory,
+                "cache": {"hit": hits, "miss": misses}, "spans": self.spans}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+
+# ---------- 실행 경계 ----------
+def begin(enabled: bool, memory: bool = False, state: dict = None, **meta):
+    """스크립트 맨 위에서 호출 — enabled가 아니면 이번 실행은 아무것도 기록하지 않음
+
+    memory=True일 때만 tracemalloc을 켜서 구간별 메모리도 잰다 (시간 측정값이 그만큼 부풀려짐).
+    state는 실행 사이에 남는 dict (앱에서는 st.session_state). Streamlit은 재실행마다 스크립트
+    스레드를 새로 만들므로, st.stop·재실행 중단으로 end()까지 못 간 이전 실행은 여기서 정리한다.
+    """
+    state = vars(_local) if state is None else state
+    prev = state.pop(PENDING, None)
+    if prev is not None and prev.memory:
+        _release_tracing()
+    _local.run = None
+    if enabled:
+        if memory:
+            _acquire_tracing()
+        run = _local.run = Run({"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}, memory)
+        run.state = state
+        state[PENDING] = run
+
+
+def end(**meta):
+    """스크립트 맨 아래에서 호출 — 이번 실행 기록(Run) 또는 None"""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+    run.meta.update(meta)
+    run.wall_ms = round((time.perf_counter() - run.t0) * 1000, 2)
+    _local.run = None
+    # 다음 begin()이 먼저 정리했으면(중단된 뒤 늦게 끝난 실행) 추적 해제는 이미 끝난 것
+    owner = run.state.get(PENDING) is run
+    if owner:
+        run.state.pop(PENDING, None)
+    if run.memory:
+        run.peak_kb = round(max(0, max(run.top, _memory()[1]) - run.mem0) / 1024, 1)
+        if owner:
+            _release_tracing()
+    return run
+
+
+def active() -> bool:
+    return getattr(_local, "run", None) is not None
+
+
+# ---------- 구간 ----------
+@contextmanager
+def span(name: str, kind: str = "block"):
+    """with perf.span("load_data", "cache"): ... — 꺼져 있으면 그대로 통과"""
+    run = getattr(_local, "run", None)
+    if run is None:
+        yield
+        return
+    rec = {"name": name, "kind": kind, "depth": len(run.stack), "ms": 0.0,
+           "alloc_kb": None, "peak_kb": None, "cache": None}
+    run.spans.append(rec)
+    cur = 0
+    if run.memory:
+        cur, peak = _memory()
+        _carry(run, peak)  # 부모가 지금까지 본 피크를 넘겨 두고 피크 카운터를 이 구간용으로 초기화
+        _reset_peak()
+    frame = [rec, cur, cur]
+    run.stack.append(frame)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        run.stack.pop()
+        if run.memory:
+            cur, peak = _memory()
+            top = max(frame[2], peak)
+            rec["alloc_kb"] = round((cur - frame[1]) / 1024, 1)
+            rec["peak_kb"] = round(max(0, top - frame[1]) / 1024, 1)
+            _carry(run, top)
+            _reset_peak()
+        if kind in ("cache", "chart") and rec["cache"] is None:
+            rec["cache"] = "hit"
+
+
+def _carry(run: Run, peak: int):
+    if run.stack:
+        run.stack[-1][2] = max(run.stack[-1][2], peak)
+    else:
+        run.top = max(run.top, peak)
+
+
+def miss():
+    """캐시 본문(=미스일 때만 실행)에서 호출 — 가장 안쪽의 열린 cache/chart span을 miss로 표시"""
+    run = getattr(_local, "run", None)
+    if run is not None:
+        for rec, _, _ in reversed(run.stack):
+            if rec["kind"] in ("cache", "chart"):
+                rec["cache"] = "miss"
+                return
+
+
+def timed(name: str = None, kind: str = "block"):
+    """함수 전체를 span 하나로 감싸는 데코레이터"""
+    def deco(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with span(label, kind):
+                return fn(*args, **kwargs)
+        return call
+    return deco
+
+
+def cached(cache_decorator, name: str = None):
+    """@perf.cached(st.cache_resource(...)) — 호출 시간 + 본문이 실행됐는지(=미스) 기록
+
+    본문 쪽은 functools.wraps로 원래 함수처럼 보이므로 Streamlit 캐시 키(소스·인자 이름)는 그대로.
+    """
+    def deco(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            miss()
+            return fn(*args, **kwargs)
+        inner = cache_decorator(body)
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with span(label, "cache"):
+                return inner(*args, **kwargs)
+        call.clear = inner.clear
+        return call
+    return deco
+
+
+# ---------- 내보내기 ----------
+def to_jsonl(runs) -> str:
+    return "".join(r.to_json() + "\n" for r in runs)
+
+
+def append_jsonl(path, run: Run):
+    """배포 간 회귀 추적용 — 실행 기록을 한 줄씩 파일에 덧붙임"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(run.to_json() + "\n")
+
+
+# ---------- tracemalloc ----------
+def _memory():
+    return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+
+
+def _reset_peak():
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def _acquire_tracing():
+    with _tracing["lock"]:
+        if _tracing["users"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing["owned"] = True  # 우리가 켠 경우에만 마지막 사용자가 끔
+        _tracing["users"] += 1
+
+
+def _release_tracing():
+    with _tracing["lock"]:
+        _tracing["users"] = max(0, _tracing["users"] - 1)
+        if _tracing["users"] == 0 and _tracing["owned"]:
+            tracemalloc.stop()
+            _tracing["owned"] = False
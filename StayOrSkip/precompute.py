@@ -0,0 +1,198 @@
+# =============================
+# 🏭 Stay or Skip — 대시보드 아티팩트 사전 계산 (배치/cron용)
+# =============================
+# 사용법: python StayOrSkip/precompute.py [--source 경로] [--jobs N]
+# 데이터셋을 한 번 스냅샷으로 만든 뒤, 집계·퍼널·코호트·LTV·기본 세그먼트·이탈 점수·차트 PNG를 프로세스 풀에서
+# 병렬로 만들어 .cache/artifacts/<fingerprint>/ 에 쓰고 manifest.json을 남긴다.
+# 앱은 manifest의 원본 스탬프가 현재 원본과 같으면 계산 없이 아티팩트만 읽는다.
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")  # 워커 프로세스에서 GUI 백엔드를 쓰지 않도록
+
+import aggregates
+import charts
+import churn
+import cohort
+import figcache
+import funnel
+import ingest
+import loader
+import ltv
+import merge
+import segments
+
+ARTIFACT_DIR = loader.CACHE_DIR / "artifacts"
+MANIFEST = ARTIFACT_DIR / "manifest.json"
+SEGMENT_DEFAULTS = [("kmeans", 5), ("rfm", 5)]  # Segments 탭 첫 화면 (방법, k) — 나머지 k는 앱에서 계산
+
+
+# ---------- 워커 작업 (프로세스마다 스냅샷을 메모리 맵으로 다시 연다) ----------
+_dataset = None
+
+
+def _load(source: str, fingerprint: str) -> loader.Dataset:
+    global _dataset
+    if _dataset is None:
+        _dataset = loader.Dataset(loader.load_table(Path(source)), fingerprint)
+    return _dataset
+
+
+def _frame(source: str, fingerprint: str):
+    return _load(source, fingerprint).frame
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    objects, pngs = fn(*args)
+    return objects, pngs, time.perf_counter() - t0
+
+
+def _charts(registry: dict, obj, fingerprint: str) -> dict:
+    return {spec: figcache.encode(build(obj)) for spec, build in registry.items()}
+
+
+def task_aggregates(source: str, fingerprint: str, streaming: bool):
+    if streaming:
+        agg, coh = ingest.stream_metrics(Path(source), fingerprint=fingerprint)
+        preview = next(ingest.iter_chunks(Path(source))).head(5)
+        return {"aggregates": agg, "cohort": coh, "preview": preview}, {
+            **_charts(charts.AGG_CHARTS, agg, fingerprint), **_charts(charts.COHORT_CHARTS, coh, fingerprint)}
+    frame = _frame(source, fingerprint)
+    agg = aggregates.compute(frame, fingerprint)
+    return {"aggregates": agg, "preview": frame.head(5)}, _charts(charts.AGG_CHARTS, agg, fingerprint)
+
+
+def task_cohort(source: str, fingerprint: str):
+    coh = cohort.CohortEngine().update(_frame(source, fingerprint))
+    coh.fingerprint = fingerprint
+    return {"cohort": coh}, _charts(charts.COHORT_CHARTS, coh, fingerprint)
+
+
+def task_ltv(source: str, fingerprint: str, by):
+    lt = ltv.compute(_frame(source, fingerprint), fingerprint, by=by)
+    return {f"ltv:{by}": lt}, (_charts(charts.LTV_CHARTS, lt, fingerprint) if by is None else {})
+
+
+def task_segments(source: str, fingerprint: str, method: str, k: int):
+    frame = _frame(source, fingerprint)
+    base = segments.UserBase(frame[segments.input_columns(frame.columns)], fingerprint=fingerprint)
+    seg = segments.compute(None, method, k, base=base)
+    spec = charts.segment_spec(method, k)  # 앱 get_segments가 같은 키로 찾음
+    return {spec: seg}, {spec: figcache.encode(charts.segment_chart(seg))}
+
+
+def task_churn(source: str, fingerprint: str):
+    # 학습한 모델은 churn.STORE(.cache/churn_model.pkl)에도 남음 → 필터/재시작 시 다시 학습하지 않음
+    cs = churn.compute(_load(source, fingerprint))
+    pngs = {charts.churn_spec(churn.VERSION): figcache.encode(charts.churn_chart(cs))} if len(cs.paying()) else {}
+    return {"churn": cs}, pngs
+
+
+def task_funnel(window):
+    fr = funnel.ordered_funnel(funnel.demo_events(), window=window, time="date")
+    return {f"funnel:{window}": fr}, {charts.funnel_spec(window): figcache.encode(charts.funnel_chart(fr))}
+
+
+# ---------- 빌드 ----------
+def build(source: Path, jobs: int, out_dir: Path = ARTIFACT_DIR) -> dict:
+    t_start = time.perf_counter()
+    stamp = loader.source_stamp(source)
+    streaming = stamp[2] >= ingest.STREAM_MIN_BYTES
+    if streaming:  # 대용량은 스냅샷 없이 스트리밍 (LTV는 앱과 마찬가지로 생략)
+        fingerprint = f"stream:{stamp[1]}:{stamp[2]}"
+    else:          # 스냅샷을 먼저 만들어 두면 워커들은 메모리 맵만 연다
+        fingerprint = loader.load_dataset(source).fingerprint
+
+    src, fp = str(source), fingerprint
+    tasks = [("aggregates", task_aggregates, (src, fp, streaming)),
+             *[(f"funnel:{w}", task_funnel, (w,)) for w in funnel.WINDOWS.values()]]
+    if not streaming:
+        tasks += [("cohort", task_cohort, (src, fp)),
+                  *[(f"ltv:{by}", task_ltv, (src, fp, by)) for by in [None] + ltv.SEGMENTS],
+                  *[(charts.segment_spec(m, k), task_segments, (src, fp, m, k)) for m, k in SEGMENT_DEFAULTS],
+                  ("churn", task_churn, (src, fp))]
+
+    target = out_dir / fingerprint.replace(":", "_")[:32]
+    work = target.with_name(target.name + ".tmp")  # 다 쓴 뒤에 교체 → 앱이 만들다 만 파일을 읽지 않음
+    shutil.rmtree(work, ignore_errors=True)
+    work.mkdir(parents=True)
+    objects_meta, charts_meta, timings = {}, {}, {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [(pool.submit(_timed, fn, *args), name) for name, fn, args in tasks]
+        for fut, name in futures:
+            objects, pngs, timings[name] = fut.result()
+            for key, obj in objects.items():
+                path = work / (key.replace(":", "__") + ".pkl")
+                path.write_bytes(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+                objects_meta[key] = {"file": path.name, "task": name}
+            for spec, png in pngs.items():
+                path = work / ("chart__" + spec.replace(":", "__") + ".png")
+                path.write_bytes(png)
+                charts_meta[spec] = {"file": path.name, "task": name,  # 앱 FigureCache 키의 fingerprint 부분
+                                     "fingerprint": funnel.DEMO_FINGERPRINT if spec.startswith("funnel:") else fingerprint}
+    shutil.rmtree(target, ignore_errors=True)
+    work.rename(target)
+
+    manifest = {
+        "source": src, "mtime_ns": stamp[1], "size": stamp[2],
+        "fingerprint": fingerprint, "theme": charts.THEME, "dir": target.name,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "build_sec": round(time.perf_counter() - t_start, 2),
+        "timings": {k: round(v, 3) for k, v in timings.items()}, "objects": objects_meta, "charts": charts_meta,
+    }
+    tmp = out_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1))
+    tmp.replace(out_dir / "manifest.json")
+    # manifest가 새 폴더를 가리킨 뒤에 예전 fingerprint 폴더 정리 (다른 빌드가 쓰는 중인 .tmp는 남김)
+    for old in out_dir.iterdir():
+        if old.is_dir() and old != target and not old.name.endswith(".tmp"):
+            shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+# ---------- 앱에서 읽기 ----------
+def read_artifacts(stamp: tuple, manifest_path: Path = MANIFEST):
+    """현재 원본 스탬프·차트 테마와 맞는 manifest가 있으면 {"objects", "charts", "manifest"}, 아니면 None
+
+    charts는 FigureCache 키 (fingerprint, spec, theme) → PNG 바이트.
+    """
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if (Path(manifest["source"]).resolve() != Path(stamp[0]).resolve()
+            or (manifest["mtime_ns"], manifest["size"]) != tuple(stamp[1:])
+            or manifest["theme"] != charts.THEME):
+        return None
+    base = manifest_path.parent / manifest["dir"]
+    objects = {key: pickle.loads((base / e["file"]).read_bytes()) for key, e in manifest["objects"].items()}
+    pngs = {(e["fingerprint"], spec, manifest["theme"]): (base / e["file"]).read_bytes()
+            for spec, e in manifest["charts"].items()}
+    return {"objects": objects, "charts": pngs, "manifest": manifest}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stay or Skip 대시보드 아티팩트 사전 계산")
+    ap.add_argument("--source", type=Path, default=Path(os.environ.get("STAYORSKIP_DATA", merge.OUT)))
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+    if args.source.resolve() == merge.OUT.resolve():  # 앱 기본 원본 → 병합부터 최신으로
+        merge.update()
+    manifest = build(args.source.resolve(), args.jobs)
+    print(f"{len(manifest['objects'])} objects + {len(manifest['charts'])} charts → {ARTIFACT_DIR / manifest['dir']} "
+          f"({manifest['build_sec']} s, fingerprint {manifest['fingerprint'][:12]})", file=sys.stderr)
+    for name, sec in sorted(manifest["timings"].items()):
+        print(f"  {name:28s} {sec:6.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
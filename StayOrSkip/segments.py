@@ -0,0 +1,250 @@
+# =============================
+# 🧩 Stay or Skip — 고객 세그먼트 엔진
+# =============================
+# 설문 컬럼(범주형)을 유저당 정수 코드로 바꾸고, 같은 응답 조합은 한 행 + 가중치로 접은 뒤
+# 그 행들만 one-hot(복수 응답은 multi-hot)으로 펼쳐 가중 미니배치 k-means를 돌린다.
+# 응답 조합 수는 유저 수와 무관하게 작으므로 수백만 유저도 몇 초 안에 끝난다.
+# 행동 기반 대안으로 RFM(최근성·빈도·금액) 점수 세그먼트도 제공한다.
+# 유저별 합계·인코딩(UserBase)은 데이터셋당 한 번만 만들고, k나 방법을 바꾼 재실행은 그 위에서만 돈다.
+# 세그먼트별 크기와 매출/ARPU/이탈률/예상 LTV는 ltv.compute와 같은 정의로 요약한다.
+import numpy as np
+import pandas as pd
+
+import ltv
+from cohort import month_ordinal
+
+FEATURES = ["Age", "Gender", "spotify_usage_period", "spotify_listening_device", "preferred_listening_content",
+            "fav_music_genre", "music_time_slot", "music_lis_frequency", "music_expl_method",
+            "pod_lis_frequency", "premium_sub_willingness"]
+MULTI = {"spotify_listening_device", "music_lis_frequency", "music_expl_method", "music_Influencial_mood"}  # ", " 복수 응답
+COLUMNS = ["userid", "month", "revenue"]  # 설문 외에 필요한 tidy 컬럼
+RFM_SEGMENTS = ["VIP", "충성", "신규 유료", "이탈 위험", "휴면", "무료"]
+BATCH = 4096
+
+
+class Segmentation:
+    """한 데이터셋 × 파라미터에 대한 세그먼트 결과 (탭은 읽기만 한다)"""
+
+    def __init__(self, fingerprint: str, method: str, params: dict, users: pd.DataFrame,
+                 summary: pd.DataFrame, stats: dict):
+        self.fingerprint = fingerprint
+        self.method = method      # "kmeans" | "rfm"
+        self.params = params
+        self.users = users        # userid, segment
+        self.summary = summary    # 세그먼트별 users, share, revenue, arpu, arppu, churn, projected_ltv, profile
+        self.stats = stats        # 응답 조합 수, inertia 등
+
+
+def input_columns(available, features=FEATURES) -> list:
+    """세그먼트 계산에 필요한 컬럼 중 데이터에 있는 것만 (프레임 일부만 잘라 넘길 때)"""
+    return COLUMNS + [c for c in features if c in set(available)]
+
+
+# ---------- 유저 단위 배열 ----------
+def user_rows(frame: pd.DataFrame):
+    """tidy 행 → (유저별 대표 행 위치, 행별 유저 번호) — 설문 컬럼은 유저마다 같은 값"""
+    uid = frame["userid"].to_numpy().astype(np.int64)
+    if len(uid) and uid.min() >= 0 and uid.max() < 4 * len(uid) + 1024:  # 촘촘한 userid → 정렬 없이
+        present = np.zeros(int(uid.max()) + 1, dtype=bool)
+        present[uid] = True
+        slot = np.cumsum(present) - 1
+        rep = np.empty(int(present.sum()), dtype=np.int64)
+        rep[slot[uid]] = np.arange(len(uid))  # 같은 유저의 아무 행이나 하나
+        return rep, slot[uid]
+    _, rep, inverse = np.unique(uid, return_index=True, return_inverse=True)
+    return rep, inverse
+
+
+# ---------- 인코딩 ----------
+def encode(users: pd.DataFrame, features=FEATURES):
+    """유저 × 설문 → 고유 응답 조합 행렬
+
+    반환: X(조합 × 토큰, 컬럼 블록마다 길이 1로 정규화한 float32), raw(0/1 multi-hot),
+    weight(조합별 유저 수), inverse(유저 → 조합 번호), tokens(토큰 이름 "컬럼=값")
+    """
+    codes, blocks, tokens = [], [], []
+    for col in features:
+        cat = pd.Categorical(users[col])
+        cats = [str(c) for c in cat.categories]
+        vocab = sorted({t for c in cats for t in (c.split(", ") if col in MULTI else [c])})
+        table = np.zeros((len(cats) + 1, len(vocab)), dtype=np.float32)  # 마지막 행 = 결측 (전부 0)
+        for i, c in enumerate(cats):
+            for t in (c.split(", ") if col in MULTI else [c]):
+                table[i, vocab.index(t)] = 1
+        c = cat.codes.astype(np.int64)
+        codes.append(np.where(c < 0, len(cats), c))
+        blocks.append(table)
+        tokens += [f"{col}={t}" for t in vocab]
+    codes = np.stack(codes, axis=1) if codes else np.zeros((len(users), 0), dtype=np.int64)
+    # 응답 조합을 혼합 진법 정수 하나로 → 고유 조합만 남김 (int64를 넘으면 행 단위 unique)
+    radix = [len(b) for b in blocks]
+    if np.prod(np.array(radix, dtype=float)) < 2**62:
+        key = np.zeros(len(codes), dtype=np.int64)
+        for j, r in enumerate(radix):
+            key = key * r + codes[:, j]
+        _, first, inverse, weight = np.unique(key, return_index=True, return_inverse=True, return_counts=True)
+        combos = codes[first]
+    else:
+        combos, inverse, weight = np.unique(codes, axis=0, return_inverse=True, return_counts=True)
+    raw = np.hstack([b[combos[:, j]] for j, b in enumerate(blocks)]) if blocks else np.zeros((len(combos), 0))
+    X = np.hstack([b[combos[:, j]] / np.maximum(np.linalg.norm(b[combos[:, j]], axis=1, keepdims=True), 1)
+                   for j, b in enumerate(blocks)]).astype(np.float32)
+    return X, raw, weight.astype(np.float64), inverse.ravel(), tokens
+
+
+# ---------- 가중 미니배치 k-means ----------
+def _nearest(X: np.ndarray, centers: np.ndarray, chunk: int = 1 << 16):
+    """행별 가장 가까운 중심과 거리² (청크 단위 행렬곱)"""
+    labels = np.empty(len(X), dtype=np.int64)
+    dist = np.empty(len(X), dtype=np.float64)
+    c2 = (centers ** 2).sum(1)
+    for lo in range(0, len(X), chunk):
+        x = X[lo:lo + chunk]
+        d = c2[None, :] - 2 * x @ centers.T
+        labels[lo:lo + chunk] = d.argmin(1)
+        dist[lo:lo + chunk] = np.maximum(d[np.arange(len(x)), labels[lo:lo + chunk]] + (x ** 2).sum(1), 0)
+    return labels, dist
+
+
+def minibatch_kmeans(X: np.ndarray, weight: np.ndarray, k: int, seed: int = 0,
+                     batch: int = BATCH, iters: int = 100, tol: float = 1e-4):
+    """가중치(=같은 조합의 유저 수)에 비례해 배치를 뽑는 미니배치 k-means (Sculley 2010)
+
+    k-means++로 초기화하고, 중심마다 지금까지 배정된 수로 학습률을 줄여 간다.
+    반환: (중심, 조합별 라벨, 가중 inertia)
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(X))
+    p = weight / weight.sum()
+    centers = X[[rng.choice(len(X), p=p)]]
+    for _ in range(1, k):  # k-means++ (가중)
+        _, d = _nearest(X, centers)
+        w = d * weight
+        centers = np.vstack([centers, X[rng.choice(len(X), p=w / w.sum()) if w.sum() > 0 else rng.integers(len(X))]])
+    counts = np.zeros(k)
+    for _ in range(iters):
+        xb = X[rng.choice(len(X), size=batch, p=p)]
+        lb, _ = _nearest(xb, centers)
+        n = np.bincount(lb, minlength=k).astype(np.float64)
+        sums = (np.arange(k)[:, None] == lb[None, :]).astype(np.float32) @ xb  # 중심별 배치 합
+        counts += n
+        hit = n > 0
+        step = np.zeros_like(centers, dtype=np.float64)
+        step[hit] = (sums[hit] - n[hit, None] * centers[hit]) / counts[hit, None]
+        centers = (centers + step).astype(np.float32)
+        if np.abs(step).max() < tol:
+            break
+    labels, dist = _nearest(X, centers)
+    return centers, labels, float(dist @ weight)
+
+
+# ---------- k와 무관한 부분 (데이터셋당 한 번) ----------
+class UserBase:
+    """유저별 합계 지표 + 최근성 + 응답 조합 인코딩 — k나 방법을 바꿔 다시 돌려도 재사용"""
+
+    def __init__(self, frame: pd.DataFrame, features=FEATURES, fingerprint: str = ""):
+        self.fingerprint = fingerprint
+        self.features = [c for c in features if c in frame.columns]  # 합성 core 데이터 등은 일부만 있음
+        rep, user_of_row = user_rows(frame)
+        n = len(rep)
+        self.userid = frame["userid"].to_numpy()[rep].astype(np.int64)
+        # (유저, 월) 격자 — 행이 있는 달/유료인 달. ltv.compute와 같은 이탈 정의를 정렬 없이 계산
+        m_codes, m_labels = pd.factorize(frame["month"], sort=True)
+        ords = month_ordinal(m_labels)
+        span = int(ords.max() - ords.min() + 1) if len(ords) else 1
+        cell = user_of_row * span + (ords - (ords.min() if len(ords) else 0))[m_codes]
+        rev = frame["revenue"].to_numpy().astype(np.float64)
+        paid = rev > 0
+        present = np.zeros(n * span, dtype=bool); present[cell] = True
+        paid_grid = np.zeros(n * span, dtype=bool); paid_grid[cell[paid]] = True
+        present, paid_grid = present.reshape(n, span), paid_grid.reshape(n, span)
+        at_risk = paid_grid[:, :-1] & present[:, 1:]  # 유료 → 다음 달 행이 있음
+        paid_months = paid_grid.sum(1)
+        self.metrics = pd.DataFrame({
+            "user_months": present.sum(1),
+            "paid_months": paid_months,
+            "revenue": np.bincount(user_of_row, weights=rev, minlength=n),
+            "at_risk": at_risk.sum(1),
+            "retained": (at_risk & paid_grid[:, 1:]).sum(1),
+        })
+        # 마지막 결제 후 지난 개월 (데이터 마지막 달 기준, 결제 이력 없으면 NaN)
+        last_paid = span - 1 - paid_grid[:, ::-1].argmax(1)
+        self.recency = np.where(paid_months > 0, span - 1 - last_paid, np.nan)
+        users = frame[self.features].iloc[rep].reset_index(drop=True)
+        self.X, self.raw, self.weight, self.inverse, self.tokens = encode(users, self.features)
+
+    def __len__(self):
+        return len(self.userid)
+
+
+# ---------- 세그먼트 → 요약 ----------
+def _summarize(base: UserBase, user_seg: np.ndarray, names: list) -> pd.DataFrame:
+    """세그먼트별 크기·매출·ARPU·이탈률·예상 LTV (ltv.compute의 세그먼트 표와 같은 정의)"""
+    n_g = len(names)
+    seg = pd.DataFrame({"segment": names, "users": np.bincount(user_seg, minlength=n_g)})
+    for col in base.metrics.columns:
+        seg[col] = np.bincount(user_seg, weights=base.metrics[col].to_numpy(), minlength=n_g)
+    seg = ltv._rates(seg[seg["users"] > 0].reset_index(drop=True))
+    seg["share"] = seg["users"] / seg["users"].sum()
+    return seg
+
+
+def kmeans_segments(base: UserBase, k: int = 5, seed: int = 0) -> Segmentation:
+    _, combo_label, inertia = minibatch_kmeans(base.X, base.weight, k, seed)
+    k = int(combo_label.max()) + 1 if len(combo_label) else 0  # 조합 수가 k보다 적으면 줄어듦
+    # 크기 순으로 C1, C2, ... 이름 붙이기
+    size = np.bincount(combo_label, weights=base.weight, minlength=k)
+    rank = np.empty(k, dtype=np.int64); rank[np.argsort(-size, kind="stable")] = np.arange(k)
+    combo_label = rank[combo_label]
+    names = [f"C{i + 1}" for i in range(k)]
+    user_seg = combo_label[base.inverse]
+    summary = _summarize(base, user_seg, names)
+    # 프로필: 전체 대비 비중이 가장 높은(lift) 응답 토큰 3개
+    onehot = np.zeros((len(base.X), k)); onehot[np.arange(len(base.X)), combo_label] = base.weight
+    share = (onehot.T @ base.raw) / np.maximum(onehot.sum(0), 1)[:, None]
+    overall = base.weight @ base.raw / base.weight.sum()
+    lift = np.where(share >= 0.4, share / np.maximum(overall, 1e-9), 0)
+    profile = [", ".join(f"{base.tokens[j]} ({share[c, j]:.0%})" for j in np.argsort(-lift[c])[:3] if lift[c, j] > 0)
+               for c in range(k)]
+    summary["profile"] = [profile[names.index(s)] for s in summary["segment"]]
+    return Segmentation(base.fingerprint, "kmeans", {"k": k, "features": base.features, "seed": seed},
+                        pd.DataFrame({"userid": base.userid, "segment": np.asarray(names)[user_seg]}),
+                        summary, {"users": len(base), "combos": len(base.X), "dims": base.X.shape[1],
+                                  "inertia": inertia})
+
+
+def rfm_segments(base: UserBase) -> Segmentation:
+    """R = 마지막 결제 후 지난 개월, F = 결제 개월 수, M = 누적 매출 → 유료 유저 안에서 1~5점
+
+    VIP(R·F·M ≥ 4), 충성(F ≥ 3, R ≥ 3), 신규 유료(F ≤ 2, R ≥ 4), 이탈 위험(F ≥ 3, R ≤ 2),
+    휴면(그 외 — 예전에 결제했지만 최근·빈도 모두 낮음), 무료(결제 이력 없음)
+    """
+    n = len(base)
+    freq = base.metrics["paid_months"].to_numpy().astype(np.float64)
+    money = base.metrics["revenue"].to_numpy()
+    payer = freq > 0
+
+    def score(v, higher_better=True):  # 유료 유저 안에서 순위 백분위 → 1~5 (동점은 평균 순위)
+        s = np.zeros(n)
+        r = pd.Series(v[payer] if higher_better else -v[payer]).rank(pct=True).to_numpy()
+        s[payer] = np.ceil(r * 5).clip(1, 5)
+        return s
+
+    R, F, M = score(base.recency, higher_better=False), score(freq), score(money)
+    seg = np.select([~payer, (R >= 4) & (F >= 4) & (M >= 4), (F >= 3) & (R >= 3), (F <= 2) & (R >= 4),
+                     (F >= 3) & (R <= 2)], [5, 0, 1, 2, 3], default=4)
+    summary = _summarize(base, seg, RFM_SEGMENTS)
+    mean = lambda x: pd.Series(x[payer]).groupby(seg[payer]).mean()  # noqa: E731
+    rfm = pd.DataFrame({"R": mean(R), "F": mean(F), "M": mean(M)}).reindex(range(len(RFM_SEGMENTS)))
+    summary["profile"] = [f"R {r:.1f} · F {f:.1f} · M {mm:.1f}" if np.isfinite(r) else "결제 이력 없음"
+                          for r, f, mm in rfm.loc[[RFM_SEGMENTS.index(s) for s in summary["segment"]]].to_numpy()]
+    return Segmentation(base.fingerprint, "rfm", {}, pd.DataFrame({"userid": base.userid,
+                                                                  "segment": np.asarray(RFM_SEGMENTS)[seg]}),
+                        summary, {"users": n, "payers": int(payer.sum())})
+
+
+def compute(frame: pd.DataFrame, method: str = "kmeans", k: int = 5, fingerprint: str = "",
+            base: UserBase = None) -> Segmentation:
+    """한 번에 계산 — 같은 데이터로 여러 번 돌릴 때는 UserBase를 만들어 base로 넘긴다"""
+    base = base or UserBase(frame, fingerprint=fingerprint)
+    return kmeans_segments(base, k) if method == "kmeans" else rfm_segments(base)
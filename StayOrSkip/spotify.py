@@ -3,26 +3,56 @@
 # =============================
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+from collections import deque
 from pathlib import Path
 import base64
+import os
+import loader
+import aggregates
+import charts
+import churn
+import cohort
+import figcache
+import filters
+import funnel
+import ingest
+import ltv
+import merge
+import perf
+import precompute
+import segments
+
+# 공유 데이터셋에서 파생한 뷰를 수정해도 원본 버퍼는 건드리지 않도록
+pd.set_option("mode.copy_on_write", True)
 
 # ---------- App config (한 번만) ----------
 st.set_page_config(page_title="Stay or Skip 🎧", page_icon="🎧", layout="wide")
 
+# ---------- 성능 계측 (?debug=1 이거나 STAYORSKIP_PERF_LOG가 있을 때만 기록) ----------
+DEBUG = bool(st.query_params.get("debug"))
+PERF_LOG = os.environ.get("STAYORSKIP_PERF_LOG")  # 실행 기록을 JSON lines로 덧붙일 파일 (배포 간 회귀 추적)
+# 메모리(tracemalloc)는 모든 세션의 할당을 느리게 하므로 디버그 패널이나 명시적 opt-in일 때만
+PERF_MEMORY = DEBUG or bool(os.environ.get("STAYORSKIP_PERF_MEMORY"))
+PERF_HISTORY = 50                                  # 디버그 패널/내보내기에 남길 최근 실행 수
+perf.begin(DEBUG or bool(PERF_LOG), memory=PERF_MEMORY, state=st.session_state)
+
 # ---------- 경로 헬퍼 ----------
 BASE = Path(__file__).parent  # spotify.py가 있는 폴더(StayOrSkip)
 
+@perf.cached(st.cache_data(show_spinner=False))
+def image_bytes(filename: str) -> bytes:
+    # 폭이 큰 원본은 st.image가 매 실행마다 축소하므로 한 번만 줄여서 보관
+    return figcache.fit_width((BASE / filename).read_bytes())
+
 def show_image(filename: str):
     """같은 폴더(또는 하위폴더)의 이미지를 안전하게 표시"""
     p = BASE / filename
     if p.exists():
-        st.image(str(p), use_container_width=True)
+        st.image(image_bytes(filename), use_container_width=True)
     else:
         st.warning(f"이미지 못 찾음: {p}")
 
+@perf.cached(st.cache_data(show_spinner=False))
 def img_to_datauri(filename: str) -> str:
     """이미지를 data URI로 변환해 CSS/HTML에 안전 삽입"""
     p = BASE / filename
@@ -38,21 +68,232 @@ def tight_top(px: int):
     st.markdown(f"<div style='margin-top:{px}px;'></div>", unsafe_allow_html=True)
 
 # ---------- 데이터 로드 ----------
-@st.cache_data(show_spinner=False)
-def load_data():
-    return pd.read_excel(BASE / "spotify_merged.xlsx")
-
-try:
-    tidy = load_data()
-except FileNotFoundError:
-    st.error("`spotify_merged.xlsx` 파일을 찾을 수 없습니다. StayOrSkip 폴더에 올려주세요.")
-    st.stop()
-except Exception as e:
-    st.exception(e)
-    st.stop()
+# 기본 원본은 merge.py가 설문·매출 xlsx에서 만든 월별 parquet 파티션 폴더
+DATA_PATH = Path(os.environ.get("STAYORSKIP_DATA", merge.OUT))
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def build_merged(inputs: tuple):
+    # 설문/매출 xlsx가 바뀌었을 때만 병합 (설문이 그대로면 새로 생기거나 바뀐 월만 조인) → 품질 리포트
+    # 읽기 전용 배포 등으로 결과 폴더에 못 쓰면 None → 저장소에 든 병합본으로 대체
+    try:
+        return merge.update()
+    except OSError:
+        return None
+
+def data_source() -> tuple:
+    """(실제로 열 원본 경로, 품질 리포트) — 병합을 못 하면 (loader.BUNDLED, None)"""
+    if DATA_PATH != merge.OUT:  # STAYORSKIP_DATA로 준 추출본은 그대로 (품질 리포트는 있을 때만)
+        return DATA_PATH, merge.read_report(DATA_PATH)
+    quality = build_merged(merge.input_stamp())
+    return (merge.OUT, quality) if quality is not None else (loader.BUNDLED, None)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_data(stamp: tuple) -> loader.Dataset:
+    # 원본이 바뀌었을 때만 파싱, 평소엔 .cache/ 스냅샷을 메모리 맵으로 읽음
+    # cache_resource → 모든 세션이 복사 없이 같은 객체를 공유 (stamp가 바뀌면 새로 로드)
+    return loader.load_dataset(Path(stamp[0]))
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_stream(stamp: tuple):
+    # 대용량 모드: 청크별 부분 집계 → (Dataset 탭 집계, 코호트, 미리보기 5행)
+    source, fingerprint = Path(stamp[0]), f"stream:{stamp[1]}:{stamp[2]}"
+    agg, coh = ingest.stream_metrics(source, fingerprint=fingerprint)
+    return agg, coh, next(ingest.iter_chunks(source)).head(5)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_aggregates(fingerprint: str, _dataset: loader.Dataset) -> aggregates.Aggregates:
+    # Dataset 탭 집계는 fingerprint별로 한 번만 (새 월만 추가된 경우 그 월만 집계)
+    return aggregates.materialize(_dataset)
+
+# ---------- 차트 캐시 ----------
+@st.cache_resource(show_spinner=False)
+def figure_cache() -> figcache.FigureCache:
+    return figcache.FigureCache(max_bytes=64 * 2**20)
+
+def show_chart(fingerprint: str, spec: str, build):
+    """같은 데이터·스펙·테마면 다시 그리지 않고 캐시된 PNG를 그대로 표시"""
+    def render():
+        perf.miss()
+        return build()
+    with perf.span(spec, "chart"):
+        png = figure_cache().get_or_render((fingerprint, spec, charts.THEME), render)
+        st.image(png, use_container_width=True)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_artifacts(stamp: tuple) -> dict:
+    # precompute.py 결과가 현재 원본·테마와 맞으면 계산 없이 읽기만 (PNG는 차트 캐시에 미리 넣음)
+    art = precompute.read_artifacts(stamp)
+    if art is None:
+        return {}
+    for key, png in art["charts"].items():
+        figure_cache().put(key, png)
+    return art["objects"]
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_cohorts(fingerprint: str, _dataset: loader.Dataset) -> cohort.CohortEngine:
+    # 코호트 행렬도 fingerprint별 한 번 (새 월만 추가된 경우 그 대각선만 계산)
+    return cohort.materialize(_dataset)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=16))
+def load_ltv(fingerprint: str, by, _dataset: loader.Dataset) -> ltv.LTVTables:
+    # (fingerprint, 세그먼트 기준)별로 한 번만 계산
+    return ltv.compute(_dataset.frame, fingerprint, by=by)
+
+def open_data() -> dict:
+    """데이터가 필요한 탭에서만 호출 (로드·집계는 모두 캐시 → 두 번째부터는 stat 한 번)"""
+    try:
+        # 품질 리포트는 병합 결과 폴더에만 있음 (다른 추출본·번들 병합본이면 None)
+        source, quality = data_source()
+        stamp = loader.source_stamp(source)
+        artifacts = load_artifacts(stamp)
+        base = {"stamp": stamp, "artifacts": artifacts, "quality": quality}
+        if "aggregates" in artifacts:  # 사전 계산본이 있으면 원본/스냅샷을 열지 않음
+            return {**base, "dataset": None, "stream": None,
+                    "agg": artifacts["aggregates"], "preview": artifacts["preview"]}
+        if stamp[2] >= ingest.STREAM_MIN_BYTES:
+            stream = load_stream(stamp)
+            return {**base, "dataset": None, "stream": stream, "agg": stream[0], "preview": stream[2]}
+        dataset = load_data(stamp)
+        return {**base, "dataset": dataset, "stream": None,
+                "agg": load_aggregates(dataset.fingerprint, dataset), "preview": dataset.frame.head(5)}
+    except FileNotFoundError as e:
+        st.error(f"`{Path(e.filename or DATA_PATH).name}` 파일을 찾을 수 없습니다. StayOrSkip 폴더에 올려주세요.")
+        st.stop()
+    except Exception as e:
+        st.exception(e)
+        st.stop()
+
+# ---------- 교차 필터 (사이드바 선택 → 모든 집계/차트) ----------
+FILTER_LABELS = {"subscription_plan": "요금제", "Age": "연령", "Gender": "성별",
+                 "fav_music_genre": "선호 장르", "spotify_listening_device": "청취 기기", "month": "월"}
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_filter_index(fingerprint: str, _dataset: loader.Dataset) -> filters.FilterIndex:
+    # 값별 비트맵·셀 큐브는 데이터셋당 한 번 (선택은 비트 연산만)
+    return filters.FilterIndex(_dataset)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=32))
+def load_filtered_aggregates(scope: str, _index: filters.FilterIndex, _sel: filters.Selection):
+    return _index.aggregates(_sel)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=16))
+def load_filtered_cohorts(scope: str, _index: filters.FilterIndex, _sel: filters.Selection) -> cohort.CohortEngine:
+    engine = cohort.CohortEngine().update(_index.frame(_sel, ["userid", "month", "revenue"]))
+    engine.fingerprint = scope
+    return engine
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=32))
+def load_filtered_ltv(scope: str, by, _index: filters.FilterIndex, _sel: filters.Selection) -> ltv.LTVTables:
+    cols = ["userid", "month", "revenue", "subscription_plan"] + ([by] if by else [])
+    return ltv.compute(_index.frame(_sel, cols), scope, by=by)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_segment_base(fingerprint: str, _dataset: loader.Dataset) -> segments.UserBase:
+    # 유저별 합계·응답 조합 인코딩은 데이터셋당 한 번 (k/방법을 바꾸면 아래 클러스터링만 다시)
+    frame = _dataset.view(segments.input_columns(_dataset.frame.columns))
+    return segments.UserBase(frame, fingerprint=fingerprint)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=8))
+def load_filtered_segment_base(scope: str, _index: filters.FilterIndex, _sel: filters.Selection) -> segments.UserBase:
+    cols = segments.input_columns(_index.dataset.frame.columns)
+    return segments.UserBase(_index.frame(_sel, cols), fingerprint=scope)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=32))
+def load_segments(scope: str, method: str, k: int, _base: segments.UserBase) -> segments.Segmentation:
+    return segments.compute(None, method, k, base=_base)
+
+def filter_index(data: dict):
+    """대용량(스트리밍) 모드는 행을 들고 있지 않으므로 필터 없음"""
+    if data["stream"] is not None:
+        return None
+    dataset = data["dataset"] or load_data(data["stamp"])
+    return load_filter_index(dataset.fingerprint, dataset)
+
+def selection(data: dict):
+    """사이드바에서 고른 필터 → (인덱스, 선택) · 필터가 없으면 (None, None)"""
+    chosen = st.session_state.get("filters", {})
+    index = filter_index(data) if any(chosen.values()) else None
+    sel = index.select(chosen) if index is not None else None
+    if sel is None or not sel.active:
+        return None, None
+    if sel.count() == 0:
+        st.warning("선택한 필터 조건에 맞는 행이 없습니다. 사이드바 필터를 줄여 주세요.")
+        st.stop()
+    return index, sel
+
+def get_agg(data: dict):
+    index, sel = selection(data)
+    return data["agg"] if sel is None else load_filtered_aggregates(index.scoped(sel), index, sel)
+
+def get_preview(data: dict) -> pd.DataFrame:
+    index, sel = selection(data)
+    return data["preview"] if sel is None else index.frame(sel).head(5)
+
+def get_cohorts(data: dict) -> cohort.CohortEngine:
+    index, sel = selection(data)
+    if sel is not None:
+        return load_filtered_cohorts(index.scoped(sel), index, sel)
+    if "cohort" in data["artifacts"]:
+        return data["artifacts"]["cohort"]
+    dataset = data["dataset"]
+    return data["stream"][1] if dataset is None else load_cohorts(dataset.fingerprint, dataset)
+
+def get_ltv(data: dict, by):
+    index, sel = selection(data)
+    if sel is not None:
+        return load_filtered_ltv(index.scoped(sel), by, index, sel)
+    if f"ltv:{by}" in data["artifacts"]:
+        return data["artifacts"][f"ltv:{by}"]
+    dataset = data["dataset"]
+    return None if dataset is None else load_ltv(dataset.fingerprint, by, dataset)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=1))
+def load_churn(fingerprint: str, _dataset: loader.Dataset) -> churn.ChurnScores:
+    # 학습한 모델은 디스크(.cache/churn_model.pkl)에도 fingerprint별로 → 재시작해도 점수 계산만
+    return churn.compute(_dataset)
+
+@perf.cached(st.cache_resource(show_spinner=False, max_entries=16))
+def load_filtered_churn(scope: str, _index: filters.FilterIndex, _sel: filters.Selection,
+                        _scores: churn.ChurnScores) -> churn.ChurnScores:
+    return _scores.subset(_index.frame(_sel, ["userid"])["userid"].unique(), scope)
+
+def get_churn(data: dict):
+    """전체 데이터로 학습·채점한 뒤 필터는 유저만 골라냄 · 대용량(스트리밍) 모드에서는 None"""
+    if data["stream"] is not None:
+        return None
+    index, sel = selection(data)
+    if "churn" in data["artifacts"]:  # precompute.py가 학습·채점해 둔 전체 점수
+        scores = data["artifacts"]["churn"]
+    else:
+        dataset = data["dataset"] or load_data(data["stamp"])
+        scores = load_churn(dataset.fingerprint, dataset)
+    return scores if sel is None else load_filtered_churn(index.scoped(sel), index, sel, scores)
+
+def get_segments(data: dict, method: str, k: int):
+    """유저 단위 계산이라 행이 필요 → 대용량(스트리밍) 모드에서는 None"""
+    if data["stream"] is not None:
+        return None
+    index, sel = selection(data)
+    if sel is not None:
+        base = load_filtered_segment_base(index.scoped(sel), index, sel)
+    elif charts.segment_spec(method, k) in data["artifacts"]:  # 기본 (방법, k)는 사전 계산본
+        return data["artifacts"][charts.segment_spec(method, k)]
+    else:
+        dataset = data["dataset"] or load_data(data["stamp"])
+        base = load_segment_base(dataset.fingerprint, dataset)
+    return load_segments(base.fingerprint, method, k, base)
+
+# ---------- 지연 탭 ----------
+def lazy_tabs(pages: dict, key: str):
+    """st.tabs는 보이지 않는 탭 본문까지 매번 실행 → 선택된 탭의 함수만 실행"""
+    # 라벨은 숨겨지지만 aria-label로 남음 → CSS가 이 라디오만 탭 모양으로 꾸밈
+    label = st.radio(f"lazy_tabs:{key}", list(pages), horizontal=True, key=key, label_visibility="collapsed")
+    with perf.span(label, "tab"):
+        pages[label]()
 
 # ================= CSS =================
-st.markdown("""
+with perf.span("css", "markdown"):
+    st.markdown("""
 <style>
 :root{
   --bg:#121212; --panel:#191414; --text:#F9FCF9; --muted:#D7E4DC; --line:rgba(255,255,255,.08);
@@ -91,15 +332,14 @@ h1{ font-weight:800; letter-spacing:-0.2px; margin:0 0 -0.2rem 0!important; }
 .cup-h2::before{ content:""; display:inline-block; width:4px; height:22px; background:var(--brand); border-radius:2px; }
 .cup-card{ background:transparent; border:1px solid var(--line); border-radius:10px; padding:1rem 1.2rem; margin:1.1rem 0; }
 
-.stTabs [aria-selected="true"], .stTabs [data-baseweb="tab"]:focus, .stTabs [data-baseweb="tab"]:active { background:transparent; box-shadow:none; filter:none; }
-.stTabs [aria-selected="true"] p{ color:var(--brand-2); }
-.stTabs [role="tablist"]{ border-color: rgba(255,255,255,.08); }
-.stTabs [data-baseweb="tab"]{ border-bottom:2px solid transparent; }
-.stTabs [data-baseweb="tab"][aria-selected="true"]{ border-bottom-color:var(--brand); }
-.stTabs [data-baseweb="tab"]:hover{ border-bottom-color:var(--brand-2); }
-.stTabs [data-baseweb="tab-highlight"]{ background:var(--brand)!important; }
-.stTabs [data-baseweb="tab"] p{ color:rgba(255,255,255,0.72)!important; transition:color .15s ease; }
-.stTabs [data-baseweb="tab"]:hover p{ color:var(--brand-2)!important; }
+/* 지연 탭 선택기(가로 라디오)만 탭처럼 — lazy_tabs 라디오의 aria-label로 한정 (탭 안의 일반 라디오는 그대로) */
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"]{ gap:1.4rem; border-bottom:1px solid rgba(255,255,255,.08); }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"]{ padding-bottom:.35rem; margin-right:0; border-bottom:2px solid transparent; }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"] > div:first-child{ display:none; }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"] p{ color:rgba(255,255,255,0.72); }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"]:hover{ border-bottom-color:var(--brand-2); }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"]:has(input:checked){ border-bottom-color:var(--brand); }
+[data-testid="stMain"] div[role="radiogroup"][aria-label^="lazy_tabs:"] label[data-baseweb="radio"]:has(input:checked) p{ color:var(--brand-2); }
 
 div[data-testid="stMetric"] div[data-testid="stMetricValue"]{ color:var(--brand)!important; font-weight:800!important; font-size:2.2rem!important; line-height:1.1!important; white-space:nowrap!important; }
 div[data-testid="stMetric"] div[data-testid="stMetricLabel"] p{ font-size:1.05rem!important; color:var(--muted)!important; letter-spacing:.2px; }
@@ -122,7 +362,53 @@ div[data-testid="stMarkdownContainer"] ul{ margin-top:.05rem!important; margin-b
 """, unsafe_allow_html=True)
 
 # ================= Sidebar =================
-with st.sidebar:
+def reset_filters():
+    st.session_state["filters"] = {}
+    for col in FILTER_LABELS:
+        st.session_state.pop(f"flt_{col}", None)
+
+def streaming_source() -> bool:
+    """대용량(스트리밍) 모드인지 — 원본을 열지 않고 경로·크기·사전 계산본만 보고 판단"""
+    if DATA_PATH == merge.OUT:
+        return False  # 병합 결과(월별 parquet 폴더)는 항상 메모리 경로
+    stamp = loader.source_stamp(DATA_PATH)
+    return "aggregates" not in load_artifacts(stamp) and stamp[2] >= ingest.STREAM_MIN_BYTES
+
+def render_filters():
+    """교차 필터 — 위젯이 안 그려지는 섹션을 다녀와도 선택이 유지되도록 filters에 따로 저장
+
+    토글을 켜거나 조건이 걸려 있을 때만 데이터를 연다 (정적 페이지 재실행은 토글 하나만 그림).
+    보기 목록은 집계(또는 사전 계산본)에서, 비트맵 인덱스는 조건이 실제로 걸렸을 때 selection()에서.
+    """
+    saved = st.session_state.setdefault("filters", {})
+    active = any(saved.values())
+    st.session_state.setdefault("flt_open", st.session_state.get("filters_open", False))  # 다른 섹션을 다녀와도 유지
+    st.session_state["filters_open"] = st.toggle("🔎 Filters", key="flt_open")
+    if not (st.session_state["filters_open"] or active):
+        return
+    try:
+        streaming = streaming_source()
+    except FileNotFoundError:
+        streaming = False  # 원본 오류 안내는 open_data()에서
+    if streaming:
+        st.caption("대용량 모드에서는 교차 필터를 지원하지 않습니다.")
+        return
+    data = open_data()
+    options = data["agg"].options if getattr(data["agg"], "options", None) else None
+    index = filter_index(data) if options is None or active else None  # 예전 사전 계산본은 보기 목록이 없음
+    for col in filters.FILTER_COLS:
+        values = options.get(col) if options is not None else (index.options(col) if col in index.columns else None)
+        if values:
+            saved[col] = st.multiselect(FILTER_LABELS.get(col, col), values,
+                                        default=[v for v in saved.get(col) or [] if v in values], key=f"flt_{col}")
+    if any(saved.values()):
+        index = index or filter_index(data)
+        st.caption(f"선택 {index.select(saved).count():,} / {index.n_rows:,}행")
+    else:
+        st.caption(f"전체 {data['agg'].n_rows:,}행")
+    st.button("필터 초기화", on_click=reset_filters, use_container_width=True)
+
+with st.sidebar, perf.span("sidebar"):
     show_image("Cup_3_copy_4.png")  # 안전 경로
     st.markdown('<hr class="cup-divider">', unsafe_allow_html=True)
     section = st.radio("", ["PROJECT OVERVIEW","DATA EXPLORATION","AARRR DASHBOARD","INSIGHTS & STRATEGY"])
@@ -134,20 +420,24 @@ with st.sidebar:
         '© DATA CUPBOP | Stay or Skip'
         '</div>', unsafe_allow_html=True
     )
+    if section in ("PROJECT OVERVIEW", "AARRR DASHBOARD"):
+        render_filters()
 
 # ================= Demo data (페이지 데모용) =================
-np.random.seed(42)
-dates = pd.date_range("2025-01-01", periods=60, freq="D")
-df = pd.DataFrame({
-    "date": np.random.choice(dates, 1000),
-    "channel": np.random.choice(["SNS","Search","Ad"], 1000, p=[0.45,0.35,0.20]),
-    "event": np.random.choice(["visit","signup","first_play","subscribe"], 1000, p=[0.45,0.25,0.20,0.10]),
-    "amount": np.random.gamma(2.2, 6.0, 1000).round(2)
-})
+@perf.cached(st.cache_resource(show_spinner=False))
+def demo_log() -> pd.DataFrame:
+    # 시드 고정 데모 로그 → 재실행마다 새로 만들지 않고 프로세스당 한 번
+    return funnel.demo_events()
+
+@perf.cached(st.cache_data(show_spinner=False))
+def demo_funnel(window):
+    # 데모 로그는 시드 고정이라 window만 캐시 키로 충분
+    return funnel.ordered_funnel(demo_log(), window=window, time="date")
 
 # ================= Title =================
-icon_datauri = img_to_datauri("free-icon-play-4604241.png")
-st.markdown(f"""
+with perf.span("title", "markdown"):
+    icon_datauri = img_to_datauri("free-icon-play-4604241.png")
+    st.markdown(f"""
 <style>
   .cup-hero {{ display:inline-flex; align-items:baseline; gap:0; margin:-4.5rem 0 .25rem 0; transform:translateY(-8px); }}
   .cup-hero h1 {{ margin:0; line-height:1; font-weight:800; letter-spacing:-.2px; transform:translateY(-2px); }}
@@ -162,10 +452,9 @@ vgap(36)
 
 # ================= Sections =================
 if section == "PROJECT OVERVIEW":
-    tabs = st.tabs(["Team Intro", "About Spotify", "Background & Objectives", "Dataset"])
 
     # ---- Team Intro ----
-    with tabs[0]:
+    def tab_team_intro():
         st.markdown('<div class="cup-h2">Team Introduction</div>', unsafe_allow_html=True)
         tight_top(-36)
         st.markdown("<style>.cup-logo{ display:block; margin:-1.2rem 0 2.2rem 0; width:35%; max-width:520px; height:auto; }</style>", unsafe_allow_html=True)
@@ -183,7 +472,7 @@ if section == "PROJECT OVERVIEW":
         """, unsafe_allow_html=True)
 
     # ---- About Spotify ----
-    with tabs[1]:
+    def tab_about_spotify():
         st.markdown('<div class="cup-h2">About Spotify</div>', unsafe_allow_html=True)
         tight_top(-36)
 
@@ -229,7 +518,7 @@ if section == "PROJECT OVERVIEW":
         st.caption("*Spotify 공식 회사 정보 기준 요약")
 
     # ---- Background & Objectives ----
-    with tabs[2]:
+    def tab_background():
         st.markdown('<div class="cup-h2">Background & Objectives</div>', unsafe_allow_html=True)
         tight_top(-36)
         st.markdown("""
@@ -253,102 +542,82 @@ if section == "PROJECT OVERVIEW":
         </div>
         """, unsafe_allow_html=True)
 
-    # ---- Dataset (⚠️ tabs[3]는 반드시 같은 깊이로) ----
-    with tabs[3]:
+    # ---- Dataset (데이터는 이 탭을 열 때만 로드) ----
+    def tab_dataset():
+        data = open_data()
+        agg, preview = get_agg(data), get_preview(data)
         st.markdown('<div class="cup-h2">Dataset Overview</div>', unsafe_allow_html=True)
         tight_top(-36)
-        st.markdown("""
+        # 기간·규모는 현재 원본의 집계에서 (병합에 새 월이 붙어도 그대로 맞음)
+        period = f"{agg.months[0]} ~ {agg.months[-1]}"
+        scale = f"{agg.n_rows:,}행 ({len(agg.months)}개월 · {agg.n_users:,}명)"
+        st.markdown(f"""
         <div class="cup-card">
-          <b>데이터셋명</b>: Spotify User Behavior + Revenue Dataset — 2023.01–06<br>
-          <b>규모</b>: 3,120행 (6개월 × 520명), 24개 컬럼<br>
+          <b>데이터셋명</b>: Spotify User Behavior + Revenue Dataset — {period}<br>
+          <b>규모</b>: {scale}, {len(agg.na_by_month.columns)}개 컬럼<br>
           <b>주요 컬럼</b>: userid, month, revenue, subscription_plan, timestamp, fav_music_genre 등<br>
           <b>출처</b>: Kaggle Spotify User Behavior Dataset + 강사 제공 매출지표
         </div>
         """, unsafe_allow_html=True)
 
-        # 이미 위에서 tidy 로드함 (재로딩 X)
+        # 캐시된 데이터셋 재사용 (재로딩 X)
         st.markdown("#### 📂 Dataset Preview  \n<span style='font-size:0.9rem;color:#888;'>데이터 상위 5행 미리보기</span>", unsafe_allow_html=True)
-        st.dataframe(tidy.head(5))
+        st.dataframe(preview)
 
         st.markdown("#### 💹 Monthly Revenue Trend  \n<span style='font-size:0.9rem;color:#888;'>월별 매출 추이</span>", unsafe_allow_html=True)
-        monthly = tidy.groupby("month")["revenue"].sum().reset_index()
-        fmt_million_krw = FuncFormatter(lambda x, pos: f"₩{x/1_000_000:,.0f}M")
-        fig_tr, ax_tr = plt.subplots(figsize=(6.5, 3.6))
-        ax_tr.plot(monthly["month"], monthly["revenue"], marker="o", linewidth=2.5, color="#1DB954")
-        ax_tr.set_xlabel("Month"); ax_tr.set_ylabel("Revenue (₩, 백만원 단위)")
-        ax_tr.yaxis.set_major_formatter(fmt_million_krw); ax_tr.grid(alpha=0.2)
-        plt.tight_layout(); st.pyplot(fig_tr, use_container_width=True)
+        show_chart(agg.fingerprint, "monthly_revenue", lambda: charts.AGG_CHARTS["monthly_revenue"](agg))
 
         st.markdown("#### 📊 Plan Comparison Overview  \n<span style='font-size:0.9rem;color:#888;'>요금제별 매출·이용자 비중 비교</span>", unsafe_allow_html=True)
         col_left, col_right = st.columns(2, gap="medium")
 
         with col_left:
-            plan_rev = tidy.groupby("subscription_plan")["revenue"].sum().reset_index()
-            order = ["Free (ad-supported)", "Premium (paid subscription)"]
-            plan_rev["subscription_plan"] = pd.Categorical(plan_rev["subscription_plan"], order, True)
-            plan_rev = plan_rev.sort_values("subscription_plan")
-            fig_rs, ax_rs = plt.subplots(figsize=(5, 3.6))
-            pie_out = ax_rs.pie(plan_rev["revenue"], labels=None, autopct="%1.1f%%", startangle=90,
-                                colors=["#BFBFBF", "#1DB954"], pctdistance=0.75, wedgeprops=dict(width=0.35))
-            wedges, *_ = pie_out  # 버전 호환
-            ax_rs.set_title("Revenue (₩) Share", pad=6)
-            ax_rs.legend(wedges, plan_rev["subscription_plan"], loc="lower center",
-                         bbox_to_anchor=(0.5, -0.15), ncol=2, frameon=False)
-            plt.tight_layout(); st.pyplot(fig_rs, clear_figure=True, use_container_width=True)
+            show_chart(agg.fingerprint, "plan_revenue_share", lambda: charts.AGG_CHARTS["plan_revenue_share"](agg))
 
         with col_right:
-            latest = tidy["month"].max()
-            users_mix = (tidy[tidy["month"] == latest]
-                         .groupby("subscription_plan")["userid"].nunique()
-                         .reset_index(name="users").sort_values("users", ascending=False))
-            fig_um, ax_um = plt.subplots(figsize=(5, 3.6))
-            colors = ["#1DB954" if "Premium" in x else "#BFBFBF" for x in users_mix["subscription_plan"]]
-            ax_um.bar(users_mix["subscription_plan"], users_mix["users"], color=colors)
-            ax_um.set_ylabel("Users (Unique)"); ax_um.set_title(f"Active Users by Plan — {latest}")
-            ax_um.set_ylim(0, max(users_mix["users"]) * 1.15)
-            for i, v in enumerate(users_mix["users"]): ax_um.text(i, v, f"{int(v):,}", ha="center", va="bottom", fontsize=10)
-            plt.tight_layout(); st.pyplot(fig_um, clear_figure=True, use_container_width=True)
+            show_chart(agg.fingerprint, "users_by_plan", lambda: charts.AGG_CHARTS["users_by_plan"](agg))
 
         st.markdown("#### 🧹 Data Quality Check  \n<span style='font-size:0.9rem;color:#888;'>데이터 정합성 및 결측치 현황</span>", unsafe_allow_html=True)
-        st.markdown("""
+        st.markdown(f"""
         <div class="cup-card">
           - 병합 기준: <b>userid</b> (매출 ⟷ 원본 설문)<br>
-          - 기간/규모: <b>2023-01 ~ 2023-06</b>, <b>3,120행</b> (6개월 × 520명)<br>
+          - 기간/규모: <b>{period}</b>, <b>{scale}</b><br>
           - 매출 기준: <b>Premium만 유료매출</b> (Free=0원)
         </div>
         """, unsafe_allow_html=True)
 
-        na = tidy.isna().sum().sort_values(ascending=False)
-        na_top = na[na > 0].head(5).reset_index(); na_top.columns = ["column", "na_cnt"]
-        fig_na, ax_na = plt.subplots(figsize=(10, 3.6))
-        if len(na_top) > 0:
-            ax_na.barh(na_top["column"], na_top["na_cnt"], color="#BFBFBF"); ax_na.invert_yaxis()
-            ax_na.set_xlabel("Missing Values"); ax_na.set_title("Top Missing Columns", pad=6)
-            ax_na.set_xlim(0, max(na_top["na_cnt"]) * 1.15)
-            for i, v in enumerate(na_top["na_cnt"]): ax_na.text(v, i, f" {int(v):,}", va="center")
-        else:
-            ax_na.axis("off"); ax_na.text(0.5, 0.5, "결측치 없음", ha="center", va="center")
-        plt.tight_layout(); st.pyplot(fig_na, clear_figure=True, use_container_width=True)
+        show_chart(agg.fingerprint, "top_missing", lambda: charts.AGG_CHARTS["top_missing"](agg))
 
+        q = data["quality"]
+        if q is None:
+            st.info("이 데이터 원본에는 병합 품질 리포트가 없습니다. (merge.py 결과 폴더를 원본으로 쓸 때만 표시)")
+            return
+        orphans, null_cells = q["orphans"], sum(q["nulls"].values())
+        issues = q["duplicates"] + orphans["revenue_only_rows"] + orphans["survey_only_users"] + q["invalid_timestamp_rows"]
         st.markdown(f"""
         <div class="cup-card">
-          ✅ <b>정합성 요약</b><br>
-          - 중복 행: <b>0</b> · 조인 누락: <b>없음</b> (both = 3120)<br>
-          - 사용자 수: <b>{tidy['userid'].nunique():,}</b>명 · 기간: <b>{tidy['month'].min()} ~ {tidy['month'].max()}</b><br>
-          - 분석 가능 상태: <b>양호</b>
+          ✅ <b>정합성 요약</b> <small>(병합 {q['built_at'].replace('T', ' ')})</small><br>
+          - 중복 행: <b>{q['duplicates']:,}</b> · 조인 누락: <b>{"없음" if not issues else "있음"}</b>
+            (매출만 {orphans['revenue_only_rows']:,}행 · 설문만 {orphans['survey_only_users']:,}명 · 날짜 오류 {q['invalid_timestamp_rows']:,}행, both = {q['rows']:,})<br>
+          - 결측 셀: <b>{null_cells:,}</b>개 · 사용자 수: <b>{q['users']:,}</b>명 · 기간: <b>{q['months'][0]} ~ {q['months'][-1]}</b><br>
+          - 분석 가능 상태: <b>{"양호" if not issues else "확인 필요"}</b>
         </div>
         """, unsafe_allow_html=True)
-        st.success("✅ 데이터 병합 및 품질 검증 완료 — 분석에 활용 가능합니다.")
+        if issues:
+            st.warning("⚠️ 병합 중 중복/누락 행이 제외되었습니다 — 원본 매출 시트를 확인하세요.")
+        else:
+            st.success("✅ 데이터 병합 및 품질 검증 완료 — 분석에 활용 가능합니다.")
+
+    lazy_tabs({"Team Intro": tab_team_intro, "About Spotify": tab_about_spotify,
+               "Background & Objectives": tab_background, "Dataset": tab_dataset}, key="tab_overview")
 
 elif section == "DATA EXPLORATION":
-    tabs = st.tabs(["Cleaning", "EDA", "Metrics Definition"])
-    with tabs[0]:
+    def tab_cleaning():
         st.markdown('<div class="cup-h2">Data Cleaning & Preprocessing</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown('<div class="cup-card">결측/이상치 처리, 타입 정규화, 세션 집계, 파생변수 생성 기준을 명시합니다.</div>', unsafe_allow_html=True)
-    with tabs[1]:
+    def tab_eda():
         st.markdown('<div class="cup-h2">Exploratory Data Analysis (EDA)</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown('<div class="cup-card">채널별 유입 분포, 활동량 분포, 이탈 여부에 따른 차이를 탐색합니다.</div>', unsafe_allow_html=True)
-    with tabs[2]:
+    def tab_metrics():
         st.markdown('<div class="cup-h2">AARRR Metrics Definition</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown("""
 | Stage | Metric (예시) | 계산 개념 |
@@ -360,37 +629,115 @@ elif section == "DATA EXPLORATION":
 | Referral | 초대/공유율 | 공유 건수 / 활성 사용자 수 |
 """)
 
+    lazy_tabs({"Cleaning": tab_cleaning, "EDA": tab_eda, "Metrics Definition": tab_metrics}, key="tab_exploration")
+
 elif section == "AARRR DASHBOARD":
     st.markdown('<div class="cup-h2">Visual Analytics Dashboard</div>', unsafe_allow_html=True); tight_top(-36)
-    tabs = st.tabs(["Funnel", "Retention", "Cohort", "LTV"])
-    with tabs[0]:
-        st.subheader("Funnel Analysis"); st.caption("가입 → 첫 재생 → 구독 전환율을 단계별로 비교합니다.")
-        steps = ["visit","signup","first_play","subscribe"]
-        counts = [df.query("event==@s").shape[0] for s in steps]
-        conv = [100] + [round(counts[i]/counts[i-1]*100,1) if counts[i-1] else 0 for i in range(1,len(steps))]
-        fig, ax = plt.subplots(figsize=(6,3)); ax.plot(steps, conv, marker="o", color="#1DB954")
-        ax.set_ylim(0,105); ax.set_ylabel("Conversion %", color="#CFE3D8"); ax.set_facecolor("#191414"); fig.set_facecolor("#121212")
-        ax.tick_params(colors="#CFE3D8"); st.pyplot(fig, use_container_width=True)
-    with tabs[1]:
-        st.subheader("Retention Analysis"); st.caption("N-Day/Weekly 커브 예시 (실데이터로 교체 권장).")
-        daily = df.groupby("date")["event"].count().sort_index()
-        roll = (daily.rolling(7).mean() / (daily.rolling(7).max()+1e-9) * 100).fillna(0)
-        fig, ax = plt.subplots(figsize=(6,3)); ax.plot(roll.index, roll.values, color="#80DEEA")
-        ax.set_ylabel("Retention-like %", color="#CFE3D8"); ax.set_xlabel("date", color="#CFE3D8")
-        ax.set_facecolor("#191414"); fig.set_facecolor("#121212"); ax.tick_params(colors="#CFE3D8"); st.pyplot(fig, use_container_width=True)
-    with tabs[2]:
-        st.subheader("Cohort Analysis"); st.info("가입월 × 경과주 코호트 유지율 히트맵(추가 예정).")
-    with tabs[3]:
+    # 위젯이 있는 탭은 fragment → 위젯을 바꾸면 그 탭만 다시 실행
+
+    @st.fragment
+    def tab_funnel():
+        st.subheader("Funnel Analysis"); st.caption("가입 → 첫 재생 → 구독 전환율을 단계별로 비교합니다. (데모 이벤트 로그 — 사이드바 필터 미적용)")
+        win_label = st.selectbox("전환 윈도우 (첫 방문 기준)", list(funnel.WINDOWS))
+        window = funnel.WINDOWS[win_label]
+        fr = open_data()["artifacts"].get(f"funnel:{window}")
+        fr = demo_funnel(window) if fr is None else fr
+        show_chart(funnel.DEMO_FINGERPRINT, charts.funnel_spec(window), lambda: charts.funnel_chart(fr))
+        st.dataframe(fr.rename(columns={"users": "도달 유저", "conv_prev": "직전 대비 %", "conv_top": "방문 대비 %"}),
+                     hide_index=True)
+
+    def tab_retention():
+        st.subheader("Retention Analysis"); st.caption("첫 유료 결제 이후 경과 개월별 결제 유지율 (전체 코호트 가중 평균).")
+        data = open_data()
+        coh = get_cohorts(data)
+        show_chart(coh.fingerprint, "retention_curve", lambda: charts.COHORT_CHARTS["retention_curve"](coh))
+
+    @st.fragment
+    def tab_cohort():
+        st.subheader("Cohort Analysis"); st.caption("첫 유료 결제월 코호트 × 경과 개월 — 유저/매출 유지율 (%)")
+        data = open_data()
+        coh = get_cohorts(data)
+        basis = st.radio("기준", ["유저 리텐션", "매출 리텐션"], horizontal=True)
+        spec = "cohort_users" if basis == "유저 리텐션" else "cohort_revenue"
+        show_chart(coh.fingerprint, spec, lambda: charts.COHORT_CHARTS[spec](coh))
+        st.dataframe(coh.cohort_sizes().rename("코호트 크기").to_frame().T)
+
+    @st.fragment
+    def tab_ltv():
         st.subheader("LTV Analysis")
-        last30 = df[df["date"] >= (df["date"].max() - pd.Timedelta(days=30))]
-        rev = last30["amount"].sum(); active = max(int(last30["event"].nunique()*100), 1)
-        arpu = rev / active; c1, c2 = st.columns(2)
-        c1.metric("총 수익(30일, 예시)", f"${rev:,.0f}"); c2.metric("ARPU(30일, 예시)", f"${arpu:,.2f}")
-    st.caption("※ Assumptions: 관찰기간=30일, 환불/부가세 제외, 할인율 0%, 예시 값")
+        by = st.selectbox("세그먼트 기준", ["전체"] + ltv.SEGMENTS)
+        data = open_data()
+        lt = get_ltv(data, None if by == "전체" else by)
+        if lt is None:
+            st.info("대용량 모드에서는 유저별 LTV를 대시보드에서 직접 계산하지 않습니다.")
+        else:
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("ARPU (월)", f"₩{lt.overall['arpu']:,.0f}"); c2.metric("ARPPU (월)", f"₩{lt.overall['arppu']:,.0f}")
+            churn_rate, proj = lt.overall["churn"], lt.overall["projected_ltv"]  # 관측 전이가 없으면 NaN
+            c3.metric("월 이탈률 (유료)", "-" if pd.isna(churn_rate) else f"{churn_rate*100:.1f}%")
+            c4.metric("예상 LTV", "-" if pd.isna(proj) else f"₩{proj:,.0f}")
+            show_chart(lt.fingerprint, "ltv_curve", lambda: charts.LTV_CHARTS["ltv_curve"](lt))
+            st.dataframe(lt.segments[["segment", "users", "arpu", "arppu", "churn", "projected_ltv"]]
+                         .rename(columns={"segment": by}).style.format(
+                             {"arpu": "₩{:,.0f}", "arppu": "₩{:,.0f}", "churn": "{:.1%}", "projected_ltv": "₩{:,.0f}"},
+                             na_rep="-"),
+                         hide_index=True, use_container_width=True)
+
+    @st.fragment
+    def tab_segments():
+        st.subheader("Segment Analysis")
+        c1, c2 = st.columns([2, 3])
+        method = c1.radio("방법", ["설문 k-means", "RFM"], horizontal=True)
+        method = "kmeans" if method == "설문 k-means" else "rfm"
+        k = c2.slider("세그먼트 수 (k)", 2, 10, 5, disabled=method == "rfm")
+        data = open_data()
+        seg = get_segments(data, method, k)
+        if seg is None:
+            st.info("대용량 모드에서는 유저별 세그먼트를 대시보드에서 직접 계산하지 않습니다.")
+            return
+        if method == "kmeans":
+            st.caption(f"설문 응답 조합 {seg.stats['combos']:,}개 × 토큰 {seg.stats['dims']}개를 가중 미니배치 k-means로 "
+                       f"묶었습니다 (유저 {seg.stats['users']:,}명). 프로필 = 전체 대비 비중이 가장 높은 응답.")
+        else:
+            st.caption(f"R(최근 결제) · F(결제 개월) · M(누적 매출)을 유료 유저 {seg.stats['payers']:,}명 안에서 1~5점으로 매겼습니다.")
+        show_chart(seg.fingerprint, charts.segment_spec(method, k), lambda: charts.segment_chart(seg))
+        st.dataframe(seg.summary[["segment", "users", "share", "revenue", "arpu", "arppu", "churn", "projected_ltv", "profile"]]
+                     .style.format({"share": "{:.1%}", "revenue": "₩{:,.0f}", "arpu": "₩{:,.0f}", "arppu": "₩{:,.0f}",
+                                    "churn": "{:.1%}", "projected_ltv": "₩{:,.0f}"}, na_rep="-"),
+                     hide_index=True, use_container_width=True)
+
+    @st.fragment
+    def tab_churn():
+        st.subheader("Churn Prediction")
+        data = open_data()
+        cs = get_churn(data)
+        if cs is None:
+            st.info("대용량 모드에서는 유저별 이탈 점수를 대시보드에서 직접 계산하지 않습니다.")
+            return
+        paying = cs.paying()
+        stats = cs.model.stats
+        st.caption(f"{cs.last_month} 결제 유저의 다음 달 이탈 확률 — 월 이력(결제·연속 결제·요금제 전환·매출) + 설문 응답 "
+                   f"로지스틱 회귀 (학습 전이 {stats['samples']:,}건)")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("결제 유저", f"{len(paying):,}")
+        c2.metric("평균 이탈 확률", f"{paying['score'].mean()*100:.1f}%" if len(paying) else "-")
+        c3.metric("고위험 (≥50%)", f"{int((paying['score'] >= 0.5).sum()):,}")
+        c4.metric("검증 AUC", f"{stats['auc']:.2f}" if stats["auc"] is not None else "-")
+        if len(paying) == 0:
+            st.info("마지막 달에 결제한 유저가 없습니다.")
+            return
+        show_chart(cs.fingerprint, charts.churn_spec(churn.VERSION), lambda: charts.churn_chart(cs))
+        top = st.slider("이탈 위험 상위 N명", 10, 200, 50, step=10)
+        st.dataframe(cs.at_risk(top).drop(columns="paying").rename(columns={"score": "churn_prob"})
+                     .style.format({"churn_prob": "{:.1%}", "revenue_total": "₩{:,.0f}"}),
+                     hide_index=True, use_container_width=True)
+
+    lazy_tabs({"Funnel": tab_funnel, "Retention": tab_retention, "Cohort": tab_cohort, "LTV": tab_ltv,
+               "Segments": tab_segments, "Churn": tab_churn}, key="tab_dashboard")
+    st.caption("※ Assumptions: 월 단위 매출, 환불/부가세 제외, 할인율 0%, 이탈 = 유료 → 다음 달 미결제, 예상 LTV = ARPPU ÷ 이탈률")
 
 else:
-    tabs = st.tabs(["Insights", "Strategy", "Next Steps"])
-    with tabs[0]:
+    def tab_insights():
         st.markdown('<div class="cup-h2">Key Insights by AARRR Stage</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown("""
         <div class="cup-card">
@@ -399,7 +746,7 @@ else:
           • Revenue: 상위 사용자 매출 편중 → VIP 업셀링·연간 플랜 제안
         </div>
         """, unsafe_allow_html=True)
-    with tabs[1]:
+    def tab_strategy():
         st.markdown('<div class="cup-h2">Data-driven Strategy Proposal</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown("""
         <div class="cup-card">
@@ -409,10 +756,36 @@ else:
           ④ 추천·공유 인센티브 단순화
         </div>
         """, unsafe_allow_html=True)
-    with tabs[2]:
+    def tab_next_steps():
         st.markdown('<div class="cup-h2">Limitations & Next Steps</div>', unsafe_allow_html=True); tight_top(-36)
         st.markdown("""
         <div class="cup-card">
-          관찰 기간·외생 변수 제한 → 외부 데이터 결합 및 예측모델(이탈 예측·LTV 추정) 확장
+          관찰 기간·외생 변수 제한 → 외부 데이터 결합 및 예측모델(이탈 예측·LTV 추정) 확장<br>
+          ✔ 이탈 예측 베이스라인: AARRR DASHBOARD › Churn 탭 (월 이력 + 설문 로지스틱 회귀, 이탈 위험 순위)
         </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
+
+    lazy_tabs({"Insights": tab_insights, "Strategy": tab_strategy, "Next Steps": tab_next_steps}, key="tab_insights")
+
+# ================= 성능 계측 패널 (?debug=1) =================
+# fragment 탭 안의 위젯만 바꾼 재실행은 스크립트 끝까지 오지 않으므로 기록되지 않음 (전체 재실행만)
+perf_run = perf.end(section=section)
+if perf_run is not None:
+    if PERF_LOG:
+        perf.append_jsonl(PERF_LOG, perf_run)
+    history = st.session_state.setdefault("perf_runs", deque(maxlen=PERF_HISTORY))
+    history.append(perf_run)
+if DEBUG and perf_run is not None:
+    with st.sidebar.expander("⏱️ Perf", expanded=True):
+        summary = perf_run.to_dict()
+        peak = f"{summary['peak_kb']:,.0f} KB" if summary["peak_kb"] is not None else "-"
+        st.caption(f"rerun {summary['wall_ms']:,.0f} ms · peak {peak} · "
+                   f"cache hit {summary['cache']['hit']} / miss {summary['cache']['miss']}")
+        spans = pd.DataFrame(perf_run.spans, columns=["name", "kind", "depth", "ms", "alloc_kb", "peak_kb", "cache"])
+        spans["name"] = ["· " * d + n for d, n in zip(spans.pop("depth"), spans["name"])]
+        st.dataframe(spans, hide_index=True, use_container_width=True)
+        st.caption(f"figure cache · {figure_cache().stats()}")
+        st.dataframe(pd.DataFrame([{"ts": r.meta["ts"], "section": r.meta["section"], "ms": r.wall_ms}
+                                   for r in history]).iloc[::-1], hide_index=True, use_container_width=True)
+        st.download_button("JSONL 내보내기", perf.to_jsonl(history), file_name="stayorskip_perf.jsonl",
+                           mime="application/x-ndjson", use_container_width=True)
@@ -0,0 +1,202 @@
+# =============================
+# 🧪 Stay or Skip — 규모 테스트용 합성 데이터 생성기
+# =============================
+# 사용법: python StayOrSkip/synth.py --rows 10M [--events 10M] [--months 24] [--columns core|all] [--out 폴더]
+# 실데이터(520명 × 6개월)에서 요금제 비율·전환/이탈 확률·설문 응답 조합을 뽑아 두고,
+# 유저를 청크 단위로 시뮬레이션해 tidy(userid × 월) 테이블과 퍼널 이벤트 로그를 CSV로 이어 쓴다.
+# 메모리에는 청크 하나만 올라가므로 1만 ~ 1억 행까지 같은 방식으로 만든다.
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+import loader
+import merge
+from funnel import STAGES
+
+OUT_DIR = loader.CACHE_DIR / "synth"
+PREMIUM, FREE = "Premium (paid subscription)", "Free (ad-supported)"
+TIDY_COLS = ["userid", "month", "revenue", "subscription_plan", "timestamp"]
+# core: 대시보드 경로(집계·코호트·LTV·필터)가 쓰는 컬럼만 — 대용량에서 CSV 크기를 1/3 정도로
+CORE_COLS = TIDY_COLS + ["Age", "Gender", "spotify_usage_period", "spotify_listening_device", "fav_music_genre"]
+CHUNK_USERS = 200_000
+EXIT_RATE = 0.05   # 월별 서비스 이탈(행 자체가 끊김) — 실데이터는 6개월 패널이라 추정 불가 → 가정값
+GROWTH = 0.03      # 월별 신규 유입 증가율
+
+
+# ---------- 실데이터에서 분포 추정 ----------
+def fit(frame: pd.DataFrame) -> dict:
+    """요금제 초기 비율, 월간 전환(Free→Premium)/해지(Premium→Free) 확률, 가격, 설문 응답 조합"""
+    df = frame.sort_values(["userid", "month"])
+    premium = (df["subscription_plan"] == PREMIUM).to_numpy()
+    same_user = df["userid"].to_numpy()[1:] == df["userid"].to_numpy()[:-1]
+    prev, nxt = premium[:-1][same_user], premium[1:][same_user]
+    first = ~np.concatenate([[False], same_user])
+    profiles = df.loc[first, [c for c in df.columns if c not in TIDY_COLS + ["spotify_subscription_plan"]]]
+    return {
+        "p_premium": float(premium[first].mean()),
+        "p_upgrade": float(nxt[~prev].mean()),
+        "p_downgrade": float(1 - nxt[prev].mean()),
+        "price": int(df.loc[premium, "revenue"].median()),
+        "profiles": profiles.reset_index(drop=True),  # 유저 한 명 = 응답 한 줄을 복원 추출
+    }
+
+
+# ---------- 유저 청크 시뮬레이션 ----------
+def _simulate(model: dict, n_users: int, first_id: int, months: int, seed, exit_rate: float, growth: float):
+    """유저별 (가입월, 활동 개월 수)와 활동 월마다의 요금제 → 유저-월 단위 배열"""
+    rng = np.random.default_rng(seed)
+    w = (1 + growth) ** np.arange(months)
+    start = rng.choice(months, n_users, p=w / w.sum())
+    life = np.minimum(rng.geometric(exit_rate, n_users), months - start)
+    # 월마다 Free↔Premium 마르코프 전이 (유저 × 경과월 행렬, 경과월 ≤ months)
+    state = np.empty((n_users, int(life.max())), dtype=bool)
+    state[:, 0] = rng.random(n_users) < model["p_premium"]
+    for t in range(1, state.shape[1]):
+        r = rng.random(n_users)
+        state[:, t] = np.where(state[:, t - 1], r >= model["p_downgrade"], r < model["p_upgrade"])
+    user = np.repeat(np.arange(n_users), life)
+    offset = np.arange(len(user)) - np.repeat(np.cumsum(life) - life, life)
+    profile = rng.integers(0, len(model["profiles"]), n_users)
+    return {"rng": rng, "start": start, "life": life, "user": user, "offset": offset,
+            "month": start[user] + offset, "premium": state[user, offset],
+            "userid": first_id + np.arange(n_users), "profile": profile}
+
+
+def _month_labels(months: int, base: str = "2023-01") -> list:
+    return list(pd.period_range(base, periods=months, freq="M").strftime("%Y-%m"))
+
+
+def _tidy_chunk(model: dict, sim: dict, labels: list, columns: list) -> pd.DataFrame:
+    user, premium = sim["user"], sim["premium"]
+    plan = pd.Categorical.from_codes(premium.astype(np.int8), [FREE, PREMIUM])
+    out = {
+        "userid": sim["userid"][user].astype(np.int64),
+        "month": pd.Categorical.from_codes(sim["month"], labels),
+        "revenue": np.where(premium, model["price"], 0).astype(np.int64),
+        "subscription_plan": plan,
+        "timestamp": pd.Categorical.from_codes(sim["month"], [m + "-01" for m in labels]),
+    }
+    rows = sim["profile"][user]
+    for col in model["profiles"].columns:
+        if col not in columns:
+            continue
+        src = model["profiles"][col]
+        out[col] = (pd.Categorical.from_codes(src.cat.codes.to_numpy()[rows], src.cat.categories)
+                    if isinstance(src.dtype, pd.CategoricalDtype) else src.to_numpy()[rows])
+    if "spotify_subscription_plan" in columns:  # 실데이터에서는 월별 요금제와 같은 값
+        out["spotify_subscription_plan"] = plan
+    return pd.DataFrame(out)[[c for c in columns if c in out]]
+
+
+def _event_chunk(sim: dict, labels: list) -> pd.DataFrame:
+    """활동 월마다 visit, 첫 방문 뒤 signup → first_play, 첫 Premium 월에 subscribe (유저별 시간순)"""
+    rng, user, n = sim["rng"], sim["user"], len(sim["life"])
+    month_ns = pd.PeriodIndex(labels, freq="M").to_timestamp().to_numpy().astype("datetime64[s]").astype(np.int64)
+    day = 86_400
+    visit = month_ns[sim["month"]] + rng.integers(0, 28, len(user)) * day
+    first_visit = visit[np.cumsum(sim["life"]) - sim["life"]]
+    ever_premium = np.zeros(n, dtype=bool); ever_premium[user[sim["premium"]]] = True
+    first_paid = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(first_paid, user[sim["premium"]], visit[sim["premium"]])
+    signup = ever_premium | (rng.random(n) < 0.75)
+    play = signup & (ever_premium | (rng.random(n) < 0.85))
+    t_signup = first_visit + rng.integers(0, 3 * day, n)
+    t_play = t_signup + rng.integers(60, 7 * day, n)
+    t_sub = np.maximum(first_paid, t_play + 60)
+    parts = [(user, visit, 0),
+             (np.flatnonzero(signup), t_signup[signup], 1),
+             (np.flatnonzero(play), t_play[play], 2),
+             (np.flatnonzero(ever_premium), t_sub[ever_premium], 3)]
+    u = np.concatenate([p[0] for p in parts])
+    t = np.concatenate([p[1] for p in parts])
+    e = np.concatenate([np.full(len(p[0]), p[2], dtype=np.int8) for p in parts])
+    order = np.lexsort((e, t, u))  # 유저 단위로 묶고 유저 안에서는 시간순 → 청크 스트리밍 가능
+    return pd.DataFrame({"user": sim["userid"][u[order]],
+                         "timestamp": t[order].astype("datetime64[s]"),
+                         "event": pd.Categorical.from_codes(e[order], STAGES)})
+
+
+def generate(rows: int, kind: str = "tidy", months: int = 24, columns=CORE_COLS, seed: int = 0,
+             model: dict = None, chunk_users: int = CHUNK_USERS, exit_rate: float = EXIT_RATE,
+             growth: float = GROWTH):
+    """rows행(tidy) 또는 rows개 이벤트(events)에 도달할 때까지 청크 DataFrame을 내보냄
+
+    같은 인자 → 같은 결과 (청크마다 [seed, 청크 번호]로 난수 시드). 마지막 청크는 rows에 맞춰 자름.
+    """
+    model = model or fit(merge.load_dataset().frame)
+    labels = _month_labels(months)
+    done, k, first_id = 0, 0, 1
+    while done < rows:
+        sim = _simulate(model, chunk_users, first_id, months, [seed, k], exit_rate, growth)
+        chunk = _tidy_chunk(model, sim, labels, columns) if kind == "tidy" else _event_chunk(sim, labels)
+        chunk = chunk.iloc[:rows - done]
+        done += len(chunk); k += 1; first_id += chunk_users
+        yield chunk
+
+
+def write_csv(chunks, path: Path) -> int:
+    """청크를 차례로 CSV에 이어 씀 (다 쓴 뒤 이름 교체 → 만들다 만 파일이 남지 않음)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pacsv.CSVWriter(str(tmp), table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    tmp.replace(path)
+    return rows
+
+
+def ensure(rows: int, kind: str = "tidy", out_dir: Path = OUT_DIR, **kw) -> Path:
+    """.cache/synth/<kind>_<rows>.csv가 없을 때만 생성 (벤치마크에서 재사용)"""
+    path = Path(out_dir) / f"{kind}_{rows}.csv"
+    if not path.exists():
+        write_csv(generate(rows, kind, **kw), path)
+    return path
+
+
+def parse_rows(text: str) -> int:
+    """'10K', '2.5M', '100M', '1e6' 같은 표기 → 정수"""
+    mult = {"K": 10**3, "M": 10**6, "B": 10**9}.get(text[-1:].upper(), 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stay or Skip 합성 데이터 생성")
+    ap.add_argument("--rows", type=parse_rows, default=parse_rows("1M"), help="tidy 행 수 (예: 10K, 100M)")
+    ap.add_argument("--events", type=parse_rows, default=None, help="이벤트 로그 행 수 (기본: rows와 같음)")
+    ap.add_argument("--months", type=int, default=24)
+    ap.add_argument("--columns", choices=["core", "all"], default="core")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    args = ap.parse_args()
+    frame = merge.load_dataset().frame
+    model = fit(frame)
+    columns = CORE_COLS if args.columns == "core" else list(frame.columns)
+    print(f"model: premium {model['p_premium']:.1%}, upgrade {model['p_upgrade']:.1%}/월, "
+          f"downgrade {model['p_downgrade']:.1%}/월, exit {EXIT_RATE:.0%}/월, price ₩{model['price']:,}",
+          file=sys.stderr)
+    for kind, rows in [("tidy", args.rows), ("events", args.events or args.rows)]:
+        t0 = time.perf_counter()
+        path = args.out / f"{kind}_{rows}.csv"
+        n = write_csv(generate(rows, kind, args.months, columns, args.seed, model), path)
+        sec = time.perf_counter() - t0
+        print(f"{kind:6s} {n:>13,d} rows → {path} ({path.stat().st_size / 2**20:,.0f} MB, {sec:.1f} s, "
+              f"{n / sec / 1e6:.1f} M rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
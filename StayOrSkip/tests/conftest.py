@@ -0,0 +1,44 @@
+# StayOrSkip 모듈은 패키지가 아니라 평평한 스크립트 모음 → 테스트에서 바로 import 하도록 경로 추가
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import loader  # noqa: E402
+
+PLANS = ["Free (ad-supported)", "Premium (paid subscription)"]
+
+
+def tidy(months, users: int = 60) -> pd.DataFrame:
+    """작은 tidy 프레임 — 월마다 [0, 월 번호] 시드라 앞 월 내용은 months 길이와 무관하게 같음"""
+    parts = []
+    for i, month in enumerate(months):
+        rng = np.random.default_rng([0, i])
+        uid = np.flatnonzero(rng.random(users) < 0.8) + 1
+        paid = rng.random(len(uid)) < 0.6
+        parts.append(pd.DataFrame({
+            "userid": uid, "month": month, "revenue": np.where(paid, 10900, 0),
+            "subscription_plan": np.asarray(PLANS)[paid.astype(int)],
+            "Gender": rng.choice(np.array(["Male", "Female", None], dtype=object), len(uid)),
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def dataset(frame: pd.DataFrame, fingerprint: str) -> loader.Dataset:
+    table = pa.Table.from_pandas(loader.to_compact(frame), preserve_index=False)
+    return loader.Dataset(table, fingerprint)
+
+
+@pytest.fixture
+def make_tidy():
+    return tidy
+
+
+@pytest.fixture
+def make_dataset():
+    return dataset
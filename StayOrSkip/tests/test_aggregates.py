@@ -0,0 +1,11 @@
+import aggregates
+
+
+def test_restated_month_is_reflected(tmp_path, make_tidy, make_dataset):
+    store = tmp_path / "aggregates.pkl"
+    aggregates.materialize(make_dataset(make_tidy(["2023-01", "2023-02"]), "v1"), store)
+    frame = make_tidy(["2023-01", "2023-02", "2023-03"])
+    frame.loc[frame["month"] == "2023-01", "revenue"] = 0
+    got = aggregates.materialize(make_dataset(frame, "v2"), store)
+    revenue = got.monthly_revenue.set_index("month")["revenue"]
+    assert revenue.loc["2023-01"] == 0 and revenue.loc["2023-03"] > 0
@@ -0,0 +1,23 @@
+import pandas as pd
+
+import churn
+
+
+def test_broken_or_stale_store_is_retrained(tmp_path, make_tidy, make_dataset):
+    store = tmp_path / "churn_model.pkl"
+    ds = make_dataset(make_tidy(["2023-01", "2023-02", "2023-03"]), "v1")
+    hist = churn.History(ds.frame)
+    store.write_bytes(b"\x80\x05truncated")  # 다른 프로세스가 쓰다 만 파일
+    model = churn.load_or_train(hist, "v1", store)
+    assert churn.load_or_train(hist, "v1", store).fingerprint == "v1"
+    model.version = churn.VERSION - 1  # 예전 형식으로 저장된 모델
+    pd.to_pickle(model, store)
+    assert churn.load_or_train(hist, "v1", store).version == churn.VERSION
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_readonly_store_still_scores(tmp_path, make_tidy, make_dataset):
+    store = tmp_path / "missing" / "deeper" / "churn_model.pkl"  # 부모 폴더를 못 만듦 → 메모리에만
+    ds = make_dataset(make_tidy(["2023-01", "2023-02"]), "v1")
+    scores = churn.compute(ds, store)
+    assert len(scores.users) == ds.frame["userid"].nunique() and not store.exists()
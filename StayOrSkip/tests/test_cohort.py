@@ -0,0 +1,23 @@
+import numpy as np
+
+import cohort
+
+
+def test_appended_month_only_adds_its_diagonal(tmp_path, make_tidy, make_dataset):
+    store = tmp_path / "cohort.pkl"
+    before = cohort.materialize(make_dataset(make_tidy(["2023-01", "2023-02"]), "v1"), store)
+    got = cohort.materialize(make_dataset(make_tidy(["2023-01", "2023-02", "2023-03"]), "v2"), store)
+    diagonal = np.zeros((3, 3), dtype=bool)
+    diagonal[np.arange(3), 2 - np.arange(3)] = True  # 3월 행 = 코호트 c의 경과 (2 - c)개월 칸
+    for new, old in [(got.users, before.users), (got.revenue, before.revenue)]:
+        delta = new - np.pad(old, ((0, 1), (0, 1)))
+        assert not delta[~diagonal].any() and delta[diagonal].sum() > 0
+
+
+def test_restated_first_month_drops_its_cohort(tmp_path, make_tidy, make_dataset):
+    store = tmp_path / "cohort.pkl"
+    cohort.materialize(make_dataset(make_tidy(["2023-01", "2023-02"]), "v1"), store)
+    frame = make_tidy(["2023-01", "2023-02", "2023-03"])
+    frame.loc[frame["month"] == "2023-01", "revenue"] = 0  # 1월 결제 취소 → 1월 코호트가 사라짐
+    got = cohort.materialize(make_dataset(frame, "v2"), store)
+    assert got.cohort_sizes().iloc[0] == 0 and got.cohort_sizes().iloc[1:].sum() > 0
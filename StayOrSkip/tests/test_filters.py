@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import filters
+from conftest import PLANS
+
+SELECTIONS = [
+    {"Gender": ["Male"]},
+    {"month": ["2023-02"], "Age": ["20-35"]},
+    {"subscription_plan": [PLANS[1]], "Gender": ["Female"], "month": ["2023-01", "2023-03"]},
+    {"Age": ["20-35", "60+"], "month": ["2023-03"]},
+]
+
+
+def _frame(make_tidy) -> pd.DataFrame:
+    frame = make_tidy(["2023-01", "2023-02", "2023-03"])
+    frame["Age"] = np.array(["12-20", "20-35", "35-60", "60+"], dtype=object)[frame["userid"] % 4]  # 유저 단위 컬럼
+    return frame
+
+
+def _table(agg: aggregates.Aggregates) -> pd.DataFrame:
+    out = agg.by_month_plan.astype({"month": str, "subscription_plan": str})
+    return out.sort_values(["month", "subscription_plan"]).reset_index(drop=True)[
+        ["month", "subscription_plan", "revenue", "users", "rows"]]
+
+
+@pytest.mark.parametrize("max_combos", [filters.MAX_ROW_COMBOS, 0], ids=["cube", "rows"])
+@pytest.mark.parametrize("choices", SELECTIONS)
+def test_selection_matches_pandas(monkeypatch, make_tidy, make_dataset, choices, max_combos):
+    monkeypatch.setattr(filters, "MAX_ROW_COMBOS", max_combos)  # 0이면 큐브·유저 비트맵 없이 행 단위 경로
+    ds = make_dataset(_frame(make_tidy), "fp")
+    index = filters.FilterIndex(ds)
+    assert (index.cells is None) == (max_combos == 0)
+    sel = index.select(choices)
+    want = np.ones(len(ds), dtype=bool)
+    for col, values in choices.items():
+        want &= ds.frame[col].isin(values).to_numpy()
+    np.testing.assert_array_equal(sel.mask, want)
+    assert sel.count() == want.sum() and index.scoped(sel) != "fp"
+
+    got, expected = index.aggregates(sel), aggregates.compute(ds.frame[want])
+    pd.testing.assert_frame_equal(_table(got), _table(expected), check_dtype=False)
+    np.testing.assert_array_equal(got.user_ids, expected.user_ids)
+    np.testing.assert_array_equal(index.selected_users(sel), np.unique(ds.frame.loc[want, "userid"]))
+    na = expected.na_by_month.copy()
+    na.index = na.index.astype(str)
+    pd.testing.assert_frame_equal(got.na_by_month, na, check_dtype=False, check_names=False)
+    pd.testing.assert_frame_equal(index.frame(sel, ["userid", "month"]), ds.frame.loc[want, ["userid", "month"]])
+
+
+def test_empty_or_full_choice_is_no_filter(make_tidy, make_dataset):
+    index = filters.FilterIndex(make_dataset(_frame(make_tidy), "fp"))
+    # 보기를 전부 고르면 결측 행까지 포함한 "조건 없음" (Gender에는 결측이 섞여 있음)
+    for choices in [{}, {"Gender": []}, {"Gender": ["Female", "Male"]}, {"Age": ["없는 값"]}]:
+        sel = index.select(choices)
+        assert not sel.active and index.scoped(sel) == "fp" and sel.count() == index.n_rows
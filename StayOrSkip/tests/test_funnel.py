@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import funnel
+
+
+def _brute_force(events: pd.DataFrame, window=None) -> list:
+    """유저별로 이벤트를 훑으며 단계 k 도달 시각 = 단계 k-1 이후 가장 이른 단계 k 이벤트"""
+    limit = None if window is None else pd.Timedelta(window)
+    counts = np.zeros(len(funnel.STAGES), dtype=np.int64)
+    for _, rows in events.groupby("user"):
+        reached = []
+        for stage in funnel.STAGES:
+            t = rows.loc[rows["event"] == stage, "date"]
+            if reached:
+                t = t[t >= reached[-1]]
+                if limit is not None:
+                    t = t[t - reached[0] <= limit]
+            if t.empty:
+                break
+            reached.append(t.min())
+        counts[:len(reached)] += 1
+    return counts.tolist()
+
+
+@pytest.mark.parametrize("window", list(funnel.WINDOWS.values()))
+def test_matches_brute_force(window):
+    events = funnel.demo_events()
+    got = funnel.ordered_funnel(events, window=window, time="date")
+    assert got["users"].tolist() == _brute_force(events, window)
+    assert got["conv_top"].iloc[0] == 100
+
+
+def test_time_ordered_chunks_match_single_pass():
+    events = funnel.demo_events().sort_values("date", kind="stable")
+    engine = funnel.FunnelEngine(window="30D")
+    for start in range(0, len(events), 150):
+        chunk = events.iloc[start:start + 150]
+        engine.update(chunk, time="date")
+    pd.testing.assert_frame_equal(engine.result(), funnel.ordered_funnel(events, window="30D", time="date"))
+    assert engine.n_events == len(events)
+
+
+def test_string_userids_match_integer_ids():
+    events = funnel.demo_events()
+    named = events.assign(user="u" + events["user"].astype(str))
+    pd.testing.assert_frame_equal(funnel.ordered_funnel(named, time="date"), funnel.ordered_funnel(events, time="date"))
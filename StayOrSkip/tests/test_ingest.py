@@ -0,0 +1,27 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import aggregates
+import ingest
+
+
+def test_parquet_stream_matches_in_memory(tmp_path, make_tidy):
+    frame = make_tidy(["2023-01", "2023-02", "2023-03"])
+    path = tmp_path / "tidy.parquet"
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path, row_group_size=50)
+    agg, coh = ingest.stream_metrics(path, rows=40)
+    want = aggregates.compute(frame)
+    key = ["month", "subscription_plan"]
+    pd.testing.assert_frame_equal(agg.monthly_revenue.reset_index(drop=True), want.monthly_revenue)
+    assert agg.n_users == want.n_users and agg.n_rows == want.n_rows
+    got_bmp = agg.by_month_plan.sort_values(key).reset_index(drop=True)
+    assert got_bmp["users"].tolist() == want.by_month_plan.sort_values(key)["users"].tolist()
+
+
+def test_unsupported_suffix_is_rejected(tmp_path):
+    path = tmp_path / "tidy.json"
+    path.write_text("[]")
+    with pytest.raises(ValueError):
+        next(ingest.iter_chunks(path))
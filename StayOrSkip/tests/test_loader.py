@@ -0,0 +1,37 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import loader
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+def test_same_name_sources_keep_separate_snapshots(tmp_path, cache_dir, make_tidy):
+    a, b = tmp_path / "a" / "tidy.csv", tmp_path / "b" / "tidy.csv"
+    for path, months in [(a, ["2023-01"]), (b, ["2023-01", "2023-02"])]:
+        path.parent.mkdir()
+        make_tidy(months).to_csv(path, index=False)
+        loader.load_table(path)
+    assert loader.snapshot_is_fresh(a) and loader.snapshot_is_fresh(b)
+    assert len(list(cache_dir.glob("*.arrow"))) == 2
+    assert loader.load_frame(a)["month"].nunique() == 1 and loader.load_frame(b)["month"].nunique() == 2
+
+
+def test_mtime_refresh_on_read_only_cache(tmp_path, cache_dir, monkeypatch, make_tidy):
+    source = tmp_path / "tidy.csv"
+    make_tidy(["2023-01"]).to_csv(source, index=False)
+    rows = loader.load_table(source).num_rows
+    os.utime(source, ns=(1, 1))  # 내용은 같고 mtime만 바뀜 (체크아웃 등)
+
+    def read_only(self, *args, **kwargs):
+        raise PermissionError(30, "Read-only file system", str(self))
+
+    monkeypatch.setattr(Path, "write_text", read_only)
+    assert loader.snapshot_is_fresh(source)
+    assert loader.load_dataset(source).table.num_rows == rows
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+import ltv
+
+
+def test_group_without_transitions_has_no_churn(make_tidy):
+    frame = make_tidy(["2023-01", "2023-02"])
+    frame["Age"] = np.where(frame["userid"] == 1, "60+", "20-35")
+    frame.loc[frame["userid"] == 1, "month"] = "2023-01"  # 60+ 유저는 한 달만 → 다음 달 전이 없음
+    frame = frame.drop_duplicates(["userid", "month"])
+    seg = ltv.compute(frame, by="Age").segments.set_index("segment")
+    assert seg.loc["60+", "at_risk"] == 0
+    assert np.isnan(seg.loc["60+", "churn"]) and np.isnan(seg.loc["60+", "projected_ltv"])
+    assert 0 <= seg.loc["20-35", "churn"] <= 1 and np.isfinite(seg.loc["20-35", "projected_ltv"])
+
+
+def test_zero_churn_does_not_blow_up():
+    arppu, churn = np.array([10900.0, 10900.0]), np.array([0.0, 0.5])
+    got = ltv.projected_ltv(arppu, churn)
+    assert np.isnan(got[0]) and got[1] == 21800
+    capped = ltv.projected_ltv(arppu, churn, horizon=12)
+    assert capped[0] == 10900 * 12
+    assert np.isnan(ltv.projected_ltv([10900.0], [np.nan], horizon=12)[0])
+
+
+def test_rates_match_pandas():
+    df = ltv._rates(pd.DataFrame({"revenue": [100.0, 0.0], "user_months": [4, 2], "paid_months": [2, 0],
+                                  "at_risk": [2, 0], "retained": [1, 0]}))
+    assert df["churn"].iloc[0] == 0.5 and df["projected_ltv"].iloc[0] == 100.0
+    assert df["churn"].isna().iloc[1] and df["projected_ltv"].isna().iloc[1]
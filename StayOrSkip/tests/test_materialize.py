@@ -0,0 +1,87 @@
+# aggregates / cohort 저장본은 같은 갱신 규칙을 따름 — 같은 fingerprint면 그대로,
+# 기존 월이 그대로고 뒤에 월만 붙었으면 그 월만, 아니면 전체 재계산, 예전 형식 저장본은 무시
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import cohort
+
+
+def _same_aggregates(got: aggregates.Aggregates, want: aggregates.Aggregates):
+    key = ["month", "subscription_plan"]
+    pd.testing.assert_frame_equal(got.by_month_plan.sort_values(key).reset_index(drop=True),
+                                  want.by_month_plan.sort_values(key).reset_index(drop=True))
+    pd.testing.assert_frame_equal(got.na_by_month.sort_index(), want.na_by_month.sort_index())
+    np.testing.assert_array_equal(got.user_ids, want.user_ids)
+
+
+def _same_cohort(got: cohort.CohortEngine, want: cohort.CohortEngine):
+    pd.testing.assert_series_equal(got.cohort_sizes(), want.cohort_sizes())
+    pd.testing.assert_frame_equal(got.user_retention(), want.user_retention())
+    pd.testing.assert_frame_equal(got.revenue_retention(), want.revenue_retention())
+
+
+# (모듈, 전체 재계산, 결과 비교, 월 행을 받아 집계하는 내부 함수)
+ENGINES = [
+    pytest.param(aggregates, aggregates.compute, _same_aggregates, (aggregates, "partials"), id="aggregates"),
+    pytest.param(cohort, lambda frame: cohort.CohortEngine().update(frame), _same_cohort,
+                 (cohort.CohortEngine, "update"), id="cohort"),
+]
+
+
+def _months_seen(monkeypatch, target) -> list:
+    """target이 받은 프레임의 월 목록을 호출마다 기록"""
+    owner, name = target
+    fn, seen = getattr(owner, name), []
+
+    def call(*args, **kwargs):
+        frame = next(a for a in args if isinstance(a, pd.DataFrame))
+        seen.append(sorted(frame["month"].astype(str).unique()))
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, call)
+    return seen
+
+
+@pytest.mark.parametrize("engine, full, same, target", ENGINES)
+def test_append_only_is_incremental_and_matches_full(tmp_path, monkeypatch, make_tidy, make_dataset,
+                                                     engine, full, same, target):
+    store = tmp_path / "store.pkl"
+    engine.materialize(make_dataset(make_tidy(["2023-01", "2023-02"]), "v1"), store)
+    seen = _months_seen(monkeypatch, target)
+    ds = make_dataset(make_tidy(["2023-01", "2023-02", "2023-03"]), "v2")
+    got = engine.materialize(ds, store)
+    assert engine.materialize(ds, store).fingerprint == "v2"  # 같은 fingerprint → 저장본 그대로
+    assert seen == [["2023-03"]]
+    same(got, full(ds.frame))
+    assert list(got.month_hashes.index) == ["2023-01", "2023-02", "2023-03"]
+
+
+@pytest.mark.parametrize("engine, full, same, target", ENGINES)
+def test_restate_plus_append_matches_full(tmp_path, monkeypatch, make_tidy, make_dataset,
+                                          engine, full, same, target):
+    store = tmp_path / "store.pkl"
+    engine.materialize(make_dataset(make_tidy(["2023-01", "2023-02"]), "v1"), store)
+    frame = make_tidy(["2023-01", "2023-02", "2023-03"])
+    frame.loc[frame["month"] == "2023-01", "revenue"] = 0  # 1월 정정 + 3월 추가를 한 번에
+    seen = _months_seen(monkeypatch, target)
+    ds = make_dataset(frame, "v2")
+    got = engine.materialize(ds, store)
+    assert seen == [["2023-01", "2023-02", "2023-03"]]
+    same(got, full(ds.frame))
+
+
+@pytest.mark.parametrize("engine, full, same, target", ENGINES)
+def test_old_store_layout_is_ignored(tmp_path, make_tidy, make_dataset, engine, full, same, target):
+    store = tmp_path / "store.pkl"
+    ds = make_dataset(make_tidy(["2023-01"]), "v1")
+    stale = full(ds.frame)
+    stale.fingerprint = "v1"
+    del stale.version  # 버전 필드가 없던 예전 pickle
+    pd.to_pickle(stale, store)
+    assert engine.read_store(store, engine.VERSION) is None
+    got = engine.materialize(ds, store)
+    assert got.version == engine.VERSION and got.month_hashes is not None
+    same(got, stale)
+    assert engine.read_store(store, engine.VERSION).fingerprint == "v1"
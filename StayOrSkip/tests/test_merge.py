@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import merge
+
+N_USERS = 40
+
+
+def _inputs(tmp_path, months):
+    rng = np.random.default_rng(1)
+    survey = pd.DataFrame({"Age": rng.choice(["12-20", "20-35", None], N_USERS),
+                           "Gender": rng.choice(["Male", "Female"], N_USERS),
+                           "spotify_subscription_plan": "Free"})  # 실제 설문처럼 — 병합 때 월별 값으로 덮임
+    parts = []
+    for i, month in enumerate(months):
+        uid = rng.choice(np.arange(1, N_USERS + 1), 30, replace=False).astype(object)
+        paid = rng.random(30) < 0.5
+        parts.append(pd.DataFrame({"userid": uid,
+                                   "spotify_subscription_plan": np.where(paid, "Premium", "Free"),
+                                   "revenue": np.where(paid, 10900, 0).astype(object),
+                                   "timestamp": f"{month}-0{i % 9 + 1}"}))
+    revenue = pd.concat(parts, ignore_index=True)
+    revenue.loc[1, "revenue"] = None                                          # 매출 결측
+    extra = revenue.iloc[[0, 2]].assign(revenue=[1, 2])                       # (userid, 월) 중복 → 뒤의 행 버림
+    bad = pd.DataFrame({"userid": [0, N_USERS + 5, "abc", 2.5, 3],            # 설문에 없는 키 4개 + 날짜 오류 1개
+                        "spotify_subscription_plan": "Free", "revenue": 0,
+                        "timestamp": [f"{months[0]}-01"] * 4 + ["not a date"]})
+    revenue = pd.concat([revenue, extra, bad], ignore_index=True)
+    survey.to_csv(tmp_path / "survey.csv", index=False)
+    revenue.to_csv(tmp_path / "revenue.csv", index=False)
+    return tmp_path / "survey.csv", tmp_path / "revenue.csv"
+
+
+def _expected(survey_path, revenue_path):
+    """같은 규칙을 pandas merge로 — 날짜 오류·비정수/범위 밖 userid 제외, (userid, 월) 첫 행만"""
+    survey = pd.read_csv(survey_path)
+    survey.insert(0, "userid", np.arange(1, len(survey) + 1))
+    rev = pd.read_csv(revenue_path)
+    ts = pd.to_datetime(rev["timestamp"], errors="coerce")
+    uid = pd.to_numeric(rev["userid"], errors="coerce")
+    rev = pd.DataFrame({"userid": uid, "month": ts.dt.strftime("%Y-%m"), "revenue": pd.to_numeric(rev["revenue"]),
+                        "subscription_plan": rev["spotify_subscription_plan"]})
+    rev = rev[ts.notna()]
+    known = rev["userid"].isin(survey["userid"])
+    merged = (rev[known].drop_duplicates(["userid", "month"])
+              .merge(survey.drop(columns="spotify_subscription_plan"), on="userid")
+              .assign(spotify_subscription_plan=lambda d: d["subscription_plan"]))  # 월별 요금제가 기준
+    return merged, int((~known).sum()), int(known.sum() - len(merged))
+
+
+def _check(report, out, survey_path, revenue_path):
+    merged, orphans, duplicates = _expected(survey_path, revenue_path)
+    assert report["rows"] == len(merged) and report["duplicates"] == duplicates
+    assert report["orphans"] == {"revenue_only_rows": orphans,
+                                 "survey_only_users": N_USERS - merged["userid"].nunique()}
+    assert report["users"] == merged["userid"].nunique() and report["invalid_timestamp_rows"] == 1
+    assert report["months"] == sorted(merged["month"].unique())
+    got = pq.read_table(out).to_pandas()
+    assert {c: n for c, n in report["nulls"].items() if n} == {c: n for c, n in got.isna().sum().items() if n}
+    key = ["userid", "month"]
+    def rows(df):  # 결측 표기(None/NaN)는 파일 형식마다 달라서 맞춰 비교
+        out = df[merged.columns].sort_values(key).reset_index(drop=True).astype(object)
+        return out.where(out.notna(), "<NA>")
+    pd.testing.assert_frame_equal(rows(got), rows(merged), check_dtype=False)
+
+
+def test_report_matches_pandas_merge(tmp_path):
+    survey_path, revenue_path = _inputs(tmp_path, ["2023-01", "2023-02"])
+    out = tmp_path / "merged"
+    report = merge.update(survey_path, revenue_path, out)
+    _check(report, out, survey_path, revenue_path)
+    assert merge.read_report(out)["rows"] == report["rows"]
+
+
+def test_appended_month_joins_only_that_month(tmp_path):
+    out = tmp_path / "merged"
+    merge.update(*_inputs(tmp_path, ["2023-01", "2023-02"]), out)
+    survey_path, revenue_path = _inputs(tmp_path, ["2023-01", "2023-02", "2023-03"])
+    report = merge.update(survey_path, revenue_path, out)
+    assert report["joined"] == ["2023-03"]
+    _check(report, out, survey_path, revenue_path)
+    assert merge.update(survey_path, revenue_path, out)["joined"] == []
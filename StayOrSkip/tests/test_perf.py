@@ -0,0 +1,54 @@
+import threading
+import tracemalloc
+
+import perf
+
+
+def _in_thread(fn):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.start()
+    t.join()
+    return out[0] if out else None
+
+
+def test_unfinished_run_is_released_by_next_run_on_another_thread():
+    state = {}  # 앱에서는 st.session_state — 재실행마다 스크립트 스레드가 새로 생김
+    _in_thread(lambda: perf.begin(True, memory=True, state=state))  # st.stop으로 end() 없이 끝남
+    assert tracemalloc.is_tracing() and perf._tracing["users"] == 1
+    _in_thread(lambda: perf.begin(False, state=state))
+    assert not tracemalloc.is_tracing() and perf._tracing["users"] == 0
+    assert perf.PENDING not in state
+
+
+def test_late_end_of_superseded_run_does_not_release_twice():
+    state = {}
+
+    def first():
+        perf.begin(True, memory=True, state=state)
+        started.set()
+        resume.wait()
+        return perf.end()
+
+    started, resume = threading.Event(), threading.Event()
+    t = threading.Thread(target=first)
+    t.start()
+    started.wait()
+    _in_thread(lambda: perf.begin(True, memory=True, state=state))  # 재실행이 앞 실행을 끊음
+    resume.set()
+    t.join()
+    assert tracemalloc.is_tracing() and perf._tracing["users"] == 1  # 새 실행은 계속 추적
+    run = _in_thread(perf.end)
+    assert run is None  # end()는 begin()한 스레드에서만
+    perf.begin(False, state=state)
+    assert not tracemalloc.is_tracing() and perf._tracing["users"] == 0
+
+
+def test_finished_run_releases_tracing():
+    state = {}
+    perf.begin(True, memory=True, state=state)
+    with perf.span("work"):
+        bytearray(1 << 16)
+    run = perf.end()
+    assert run.peak_kb is not None and run.spans[0]["alloc_kb"] is not None
+    assert not tracemalloc.is_tracing() and perf.PENDING not in state